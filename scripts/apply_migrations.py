@@ -1,40 +1,28 @@
 import asyncio
-import asyncpg
-import os
-from src.config.settings import settings
+import sys
+from src.persistence.migration_runner import MigrationError, MigrationRunner
 
-async def apply_migrations():
+async def apply_migrations() -> int:
     print("--- Applying Database Migrations ---")
     
-    # Connect to DB
     try:
-        conn = await asyncpg.connect(settings.DATABASE_URL)
-        print("✅ Connected to PostgreSQL")
+        result = await MigrationRunner().run()
+    except MigrationError as e:
+        print(f"❌ {e}")
+        return 1
     except Exception as e:
         print(f"❌ Failed to connect to DB: {e}")
-        return
+        return 1
 
-    migrations_dir = "src/persistence/migrations"
-    migration_files = sorted([f for f in os.listdir(migrations_dir) if f.endswith(".sql")])
-    
-    for filename in migration_files:
-        print(f"Running migration: {filename}...")
-        filepath = os.path.join(migrations_dir, filename)
-        with open(filepath, "r") as f:
-            sql = f.read()
-            
-        try:
-            await conn.execute(sql)
-            print(f"✅ Applied {filename}")
-        except Exception as e:
-            # Ignore "already exists" errors for idempotency
-            if "already exists" in str(e):
-                print(f"⚠️  Skipping {filename} (already exists)")
-            else:
-                print(f"❌ Error applying {filename}: {e}")
+    for version in result.applied:
+        print(f"✅ Applied {version}")
+    for version in result.skipped:
+        print(f"⏭️  Already applied {version}")
+    for version in result.modified:
+        print(f"⚠️  {version} was modified after being applied (add a new migration instead)")
                 
-    await conn.close()
     print("--- Migrations Complete ---")
+    return 1 if result.modified else 0
 
 if __name__ == "__main__":
-    asyncio.run(apply_migrations())
+    sys.exit(asyncio.run(apply_migrations()))
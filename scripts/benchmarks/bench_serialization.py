@@ -0,0 +1,100 @@
+"""
+Micro-benchmark: JSON backends on typical LiteLLM request payloads.
+
+Builds OpenAI-format payloads with 50-200 messages (system prompt, user and
+assistant turns, tool calls and tool results) plus the Project Lead's tool
+list, then times encode and decode for every installed backend.
+
+Usage:
+    python -m scripts.benchmarks.bench_serialization [--rounds 200]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+from src.utils import serialization
+
+BACKENDS = ("json", "msgspec", "orjson")
+
+
+def build_payload(n_messages: int) -> Dict[str, Any]:
+    """A chat payload shaped like the ones agents send to LiteLLM."""
+    messages: List[Dict[str, Any]] = [{
+        "role": "system",
+        "content": "You are the Project Lead. Break goals into domain tasks. " * 20
+    }]
+    for i in range(n_messages - 1):
+        kind = i % 4
+        if kind == 0:
+            messages.append({"role": "user", "content": f"Step {i}: implement the next module. " * 8})
+        elif kind == 1:
+            messages.append({
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{i}",
+                    "type": "function",
+                    "function": {"name": "read_file", "arguments": json.dumps({"path": f"src/module_{i}.py"})}
+                }]
+            })
+        elif kind == 2:
+            messages.append({"role": "tool", "tool_call_id": f"call_{i - 1}", "content": "def handler():\n    pass\n" * 30})
+        else:
+            messages.append({"role": "assistant", "content": f"Done with step {i - 3}. Résumé: ✓ tests pass. " * 6})
+
+    tools = [{
+        "type": "function",
+        "function": {
+            "name": f"tool_{t}",
+            "description": "Performs an operation on the workspace. " * 3,
+            "parameters": {
+                "type": "object",
+                "properties": {"path": {"type": "string"}, "content": {"type": "string"}},
+                "required": ["path"]
+            }
+        }
+    } for t in range(20)]
+    return {"model": "maf-default", "messages": messages, "tools": tools, "temperature": 0.2}
+
+
+def bench(payload: Dict[str, Any], rounds: int) -> Dict[str, float]:
+    """Mean microseconds per encode and decode for the active backend."""
+    encoded = serialization.dumps(payload)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        serialization.dumps(payload)
+    encode_us = (time.perf_counter() - started) / rounds * 1e6
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        serialization.loads(encoded)
+    decode_us = (time.perf_counter() - started) / rounds * 1e6
+    return {"encode_us": encode_us, "decode_us": decode_us, "bytes": len(encoded)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'messages':>8} {'backend':>8} {'bytes':>8} {'encode µs':>10} {'decode µs':>10} {'speedup':>8}")
+    for n_messages in (50, 100, 200):
+        payload = build_payload(n_messages)
+        baseline = None
+        for name in BACKENDS:
+            if serialization.set_backend(name) != name:
+                continue  # not installed
+            result = bench(payload, args.rounds)
+            total = result["encode_us"] + result["decode_us"]
+            baseline = baseline or total
+            print(
+                f"{n_messages:>8} {name:>8} {result['bytes']:>8} "
+                f"{result['encode_us']:>10.1f} {result['decode_us']:>10.1f} {baseline / total:>7.1f}x"
+            )
+    serialization.set_backend("auto")
+
+
+if __name__ == "__main__":
+    main()
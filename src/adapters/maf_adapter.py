@@ -1,6 +1,7 @@
 from typing import Any, MutableSequence, AsyncIterable
 from agent_framework import BaseChatClient, ChatResponse, ChatMessage, ChatOptions, ChatResponseUpdate, FunctionCallContent, FunctionResultContent
 from src.clients.litellm_client import LiteLLMChatClient
+from src.clients.tool_schemas import tool_schema_cache
 import json
 
 # Import universal tools
@@ -85,21 +86,8 @@ class LiteLLMModelClient(BaseChatClient):
                     "content": msg.text if hasattr(msg, 'text') else str(msg.content)
                 })
 
-        # 2. Get tools in LiteLLM format - convert MAF AIFunctions directly
-        litellm_tools = None
-        if chat_options.tools:
-            litellm_tools = []
-            for tool in chat_options.tools:
-                # Each tool is already an AIFunction from @ai_function decorator
-                tool_schema = tool.to_dict()
-                litellm_tools.append({
-                    "type": "function",
-                    "function": {
-                        "name": tool_schema.get("name"),
-                        "description": tool_schema.get("description", ""),
-                        "parameters": tool_schema.get("input_schema", {})
-                    }
-                })
+        # 2. Get tools in LiteLLM format (compiled once per tool list)
+        litellm_tools = tool_schema_cache.compile(chat_options.tools)
         
         # 3. Get tool_choice from chat_options
         tool_choice = None
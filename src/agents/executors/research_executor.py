@@ -7,8 +7,9 @@ and answering questions based on available knowledge.
 
 from src.agents.executors.base_executor import BaseExecutor
 from src.models.data_contracts import ExecutorReport
+from src.services.research_cache import ResearchCache, get_research_cache
 from agent_framework import AgentThread
-from typing import Dict, Any
+from typing import Optional
 
 class ResearchExecutor(BaseExecutor):
     """Executor for research tasks (Tier 4).
@@ -19,19 +20,20 @@ class ResearchExecutor(BaseExecutor):
     - Return structured findings
     """
     
-    def __init__(self, chat_client, tools: list = None):
+    def __init__(self, chat_client, tools: list = None, cache: Optional[ResearchCache] = None):
         """Initialize ResearchExecutor.
         
         Args:
             chat_client: MAF chat client
             tools: List of tools (e.g., search tools)
+            cache: Result cache (defaults to the process-wide research cache)
         """
         super().__init__(
             chat_client=chat_client,
             executor_type="Research",
             tools=tools
         )
-        self._cache: Dict[str, str] = {}
+        self._cache = cache if cache is not None else get_research_cache()
         
     async def execute_task(
         self, 
@@ -50,13 +52,14 @@ class ResearchExecutor(BaseExecutor):
         task_id = task.get("task_id", "unknown")
         description = task.get("description", "")
         
-        # Check cache
-        if description in self._cache:
+        # Check cache (memory, shared store, then paraphrase match)
+        cached = await self._cache.aget(description)
+        if cached is not None:
             return ExecutorReport(
                 executor_task_id=task_id,
                 executor_name=self.name,
                 status="Completed",
-                outputs={"artifact": self._cache[description]},
+                outputs={"artifact": cached},
                 metadata={"executor_type": self.executor_type, "cached": True}
             )
             
@@ -65,7 +68,7 @@ class ResearchExecutor(BaseExecutor):
         
         # Cache successful results
         if report.status == "Completed" and "artifact" in report.outputs:
-            self._cache[description] = report.outputs["artifact"]
+            await self._cache.aset(description, report.outputs["artifact"])
             
         return report
 
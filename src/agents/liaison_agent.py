@@ -1,9 +1,23 @@
 from agent_framework import ChatAgent
 from src.agents.project_lead_agent import ProjectLeadAgent
+from src.config.settings import settings
+from src.services.intent_classifier import IntentClassifier, parse_intent
+from src.services.project_context_service import ProjectContextProvider
 from src.utils import get_logger
+from typing import Optional
 
 logger = get_logger(__name__)
 
+CLASSIFICATION_PROMPT = """Analyze the following user message and classify its intent.
+User Message: "{message}"
+
+Is this message:
+1. A QUESTION about the project, the system, or the agent itself? (e.g. "What is this project?", "Who are you?")
+2. A PROJECT IDEA or instruction to start work? (e.g. "Let's build a game", "Create a new workflow")
+3. GREETING or CHIT-CHAT? (e.g. "Hello", "How are you?")
+
+Respond with ONLY one word: QUESTION, IDEA, or CHIT_CHAT."""
+
 class LiaisonAgent(ChatAgent):
     """
     Tier 1: User interface layer
@@ -11,85 +25,50 @@ class LiaisonAgent(ChatAgent):
     - No technical decisions
     - Hands off to Project Lead
     """
-    def __init__(self, project_lead: ProjectLeadAgent, chat_client):
+    def __init__(self, project_lead: ProjectLeadAgent, chat_client, intent_classifier: Optional[IntentClassifier] = None):
         self.project_lead = project_lead
+        self.intent_classifier = intent_classifier or IntentClassifier()
         
         logger.debug("LiaisonAgent initializing...")
         
-        # Dynamic Project Context Loading
-        context = ""
-        project_root = "/app/project_root"
-        
-        try:
-            import os
-            
-            if os.path.exists(project_root):
-                logger.debug(f"Scanning project root at {project_root}")
-                
-                # 1. Generate File Tree (max depth 2 to avoid noise)
-                tree_str = "Project Structure:\n"
-                for root, dirs, files in os.walk(project_root):
-                    # Skip hidden directories and __pycache__
-                    dirs[:] = [d for d in dirs if not d.startswith('.') and d != '__pycache__']
-                    
-                    level = root.replace(project_root, '').count(os.sep)
-                    if level > 2: continue
-                    
-                    indent = ' ' * 4 * (level)
-                    tree_str += f"{indent}{os.path.basename(root)}/\n"
-                    subindent = ' ' * 4 * (level + 1)
-                    for f in files:
-                        if not f.startswith('.'):
-                            tree_str += f"{subindent}{f}\n"
-                
-                context += f"\n\n{tree_str}"
-                
-                # 2. Load README.md if it exists
-                readme_path = os.path.join(project_root, "README.md")
-                if os.path.exists(readme_path):
-                    logger.debug("Found README.md")
-                    with open(readme_path, "r") as f:
-                        context += f"\n\nProject README:\n{f.read()}"
-                else:
-                    logger.debug("No README.md found in project root")
-                    
-            else:
-                logger.warning(f"Project root not found at {project_root}")
-                
-        except Exception as e:
-            logger.warning(f"Could not load project context: {e}")
-            import traceback
-            traceback.print_exc()
-
-        logger.debug(f"Context length: {len(context)}")
-        self.context = context
-        
+        # Project tree and README come from the shared, cached snapshot and are
+        # added to the instructions on every run (no filesystem scan here)
         super().__init__(
             name="Liaison",
-            instructions=f"Capture user intent. Ask clarifying questions. No technical decisions. Once intent is clear, forward to Project Lead.\n\nCurrent Project Context:{context}",
+            instructions="Capture user intent. Ask clarifying questions. No technical decisions. Once intent is clear, forward to Project Lead.",
             tools=[],  # No tools, just conversation
-            chat_client=chat_client
+            chat_client=chat_client,
+            context_providers=ProjectContextProvider(include_tree=True, docs=("README.md",))
         )
 
     async def _classify_intent(self, message: str) -> str:
-        """Classify the user's intent."""
-        from agent_framework import AgentThread
-        
-        temp_thread = AgentThread()
-        classification_prompt = f"""
-        Analyze the following user message and classify its intent.
-        User Message: "{message}"
-        
-        Is this message:
-        1. A QUESTION about the project, the system, or the agent itself? (e.g. "What is this project?", "Who are you?")
-        2. A PROJECT IDEA or instruction to start work? (e.g. "Let's build a game", "Create a new workflow")
-        3. GREETING or CHIT-CHAT? (e.g. "Hello", "How are you?")
-        
-        Respond with ONLY one word: QUESTION, IDEA, or CHIT_CHAT.
+        """Classify the user's intent (QUESTION, IDEA or CHIT_CHAT).
+
+        Greetings, build instructions and familiar messages are answered by
+        the local classifier; only uncertain messages cost an LLM call.
         """
-        
-        classification = await self.run(classification_prompt, thread=temp_thread)
-        return str(classification).strip().upper()
+        if not settings.INTENT_CLASSIFIER_ENABLED:
+            return parse_intent(await self._classify_intent_llm(message))
+        result = await self.intent_classifier.classify(message, llm_fallback=self._classify_intent_llm)
+        return result.intent
+
+    async def _classify_intent_llm(self, message: str) -> str:
+        """Ask the model directly (no thread, no project context) for a one-word label."""
+        response = await self.chat_client.get_response(
+            CLASSIFICATION_PROMPT.format(message=message),
+            temperature=0.0,
+            max_tokens=8
+        )
+        return response.text if hasattr(response, "text") else str(response)
+
+    def _build_answer_prompt(self, message: str) -> str:
+        """Prompt used to answer questions and chit-chat locally."""
+        # The Project Context is already part of the instructions
+        return f"""
+                Using the Project Context in your instructions, answer the user's question.
+                
+                User Question: "{message}"
+                """
 
     async def handle_user_message(self, message: str):
         """
@@ -112,21 +91,53 @@ class LiaisonAgent(ChatAgent):
                 # Handle locally (Questions, Chit-chat)
                 # Use a new thread for the actual conversation to avoid context pollution
                 response_thread = AgentThread()
-                
-                # Explicitly include context in the prompt to ensure awareness
-                augmented_prompt = f"""
-                Using the following Project Context, answer the user's question.
-                
-                Project Context:
-                {self.context}
-                
-                User Question: "{message}"
-                """
-                
-                response = await self.run(augmented_prompt, thread=response_thread)
+                response = await self.run(self._build_answer_prompt(message), thread=response_thread)
                 return str(response)
                 
         except Exception as e:
             import traceback
             traceback.print_exc()
             return f"Error in Liaison Agent: {str(e)}"
+
+    async def stream_user_message(self, message: str):
+        """
+        Streaming variant of handle_user_message.
+        
+        Yields event dictionaries as work progresses:
+        - {"type": "intent", ...} once the message is classified
+        - {"type": "token" | "tool_call" | "tool_result", ...} from the answering agent
+        - {"type": "done", "response": <full text>} at the end
+        - {"type": "error", "message": ...} on failure
+        
+        Cancelling the consumer cancels the in-flight LLM request.
+        """
+        from agent_framework import AgentThread
+        from src.middleware.event_stream import update_to_events
+        
+        try:
+            intent = await self._classify_intent(message)
+            logger.debug(f"User intent classified as: {intent}")
+            yield {"type": "intent", "agent": self.name, "intent": intent}
+            
+            chunks = []
+            if "IDEA" in intent:
+                preface = "I've forwarded your idea to the Project Lead.\n\n"
+                chunks.append(preface)
+                yield {"type": "token", "agent": self.name, "text": preface}
+                agent_name = self.project_lead.name
+                updates = self.project_lead.stream_idea(message)
+            else:
+                agent_name = self.name
+                updates = self.run_stream(self._build_answer_prompt(message), thread=AgentThread())
+            
+            async for update in updates:
+                for event in update_to_events(update, agent_name):
+                    if event["type"] == "token":
+                        chunks.append(event["text"])
+                    yield event
+            
+            yield {"type": "done", "response": "".join(chunks)}
+        
+        except Exception as e:
+            logger.error(f"Error streaming Liaison response: {e}")
+            yield {"type": "error", "message": f"Error in Liaison Agent: {str(e)}"}
@@ -2,9 +2,9 @@ from agent_framework import ChatAgent, ai_function, AgentThread
 from src.tools import ALL_TOOLS
 from src.workflows.olb_workflow import OLBWorkflow
 from src.models.data_contracts import StrategicPlan, TaskDefinition
+from src.services.project_context_service import ProjectContextProvider
 from src.utils import get_logger
 from typing import List, Optional
-import os
 import uuid
 
 logger = get_logger(__name__)
@@ -17,39 +17,6 @@ class ProjectLeadAgent(ChatAgent):
     - Outputs STRATEGIC PLANS
     """
     def __init__(self, chat_client, olb_workflow: Optional[OLBWorkflow] = None):
-        # Dynamic Project Context Loading
-        context = ""
-        context_paths = [
-            "/app/project_root/README.md",
-            "/app/project_root/.meta/project_brief.md",
-            "/app/project_root/.ai/project_guidelines.md"
-        ]
-        
-        for path in context_paths:
-            try:
-                if os.path.exists(path):
-                    with open(path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        context += f"\n\n# {os.path.basename(path)}\n{content}"
-            except Exception as e:
-                logger.warning(f"Could not load {path}: {e}")
-        
-        # Alternative: Try relative paths
-        if not context:
-            alt_paths = [
-                "README.md",
-                ".meta/project_brief.md",
-                ".ai/project_guidelines.md"
-            ]
-            for path in alt_paths:
-                try:
-                    if os.path.exists(path):
-                        with open(path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            context += f"\n\n# {os.path.basename(path)}\n{content}"
-                except Exception as e:
-                    logger.warning(f"Could not load project context: {e}")
-
         self.olb_workflow = olb_workflow
 
         # Define the strategy tool bound to this instance
@@ -68,6 +35,8 @@ class ProjectLeadAgent(ChatAgent):
                        - description: What to do
                        - domain: "Development", "QA", or "Docs"
                        - task_id: Unique ID (optional, will be generated if missing)
+                       - dependencies: task_ids that must complete first (optional;
+                         tasks without dependencies run concurrently)
                 plan_context: Context/rationale for the plan
             """
             if not self.olb_workflow:
@@ -81,6 +50,7 @@ class ProjectLeadAgent(ChatAgent):
                     task_id=t_id,
                     domain=t.get("domain", "Development"),
                     description=t.get("description", "No description"),
+                    dependencies=t.get("dependencies") or [],
                     assigned_to=f"{t.get('domain', 'Dev')}DL"
                 ))
 
@@ -111,7 +81,7 @@ class ProjectLeadAgent(ChatAgent):
         # Initialize MAF ChatAgent via inheritance
         super().__init__(
             name="ProjectLead",
-            instructions=f"""You are the Project Lead. 
+            instructions="""You are the Project Lead. 
 
 Your Goal: Convert user requests into executed software via Strategic Plans.
 
@@ -120,11 +90,13 @@ Responsibilities:
 2. CREATE a Strategic Plan using the `submit_strategic_plan` tool.
    - Break work into tasks for "Development", "QA", or "Docs" domains.
    - Be specific in task descriptions.
-3. REVIEW the execution results returned by the tool.
-
-Current Project Context:{context}""",
+   - Give each task a task_id and list the task_ids it depends on in `dependencies`
+     (e.g. QA depends on the Development task). Independent tasks run in parallel.
+3. REVIEW the execution results returned by the tool.""",
             tools=agent_tools,
-            chat_client=chat_client
+            chat_client=chat_client,
+            # README, project brief and guidelines from the shared, cached snapshot
+            context_providers=ProjectContextProvider(include_tree=False)
         )
 
     async def receive_idea(self, idea: str):
@@ -138,3 +110,17 @@ Current Project Context:{context}""",
         logger.info(f"Finished processing: {idea[:50]}...")
         
         return f"**Project Lead Execution Report:**\n\n{response_text}"
+
+    async def stream_idea(self, idea: str):
+        """Streaming variant of receive_idea.
+        
+        Yields AgentRunResponseUpdate objects (text deltas, tool calls and tool
+        results) as the Project Lead plans and executes.
+        """
+        logger.info(f"Received idea (streaming): {idea}")
+        
+        thread = AgentThread()
+        async for update in self.run_stream(idea, thread=thread):
+            yield update
+
+        logger.info(f"Finished processing: {idea[:50]}...")
@@ -1,14 +1,27 @@
 """
 FastAPI endpoint to expose the Liaison Agent for UI communication.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from typing import Optional, Dict, Any, List
 import asyncio
+import json
 from datetime import datetime
 
-app = FastAPI(title="MAF Agent API")
+from src.config.settings import settings
+from src.utils import serialization
+from src.middleware.event_stream import EventStream, bind_event_stream
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the fast serialization backend."""
+
+    def render(self, content: Any) -> bytes:
+        return serialization.dumps(content)
+
+
+app = FastAPI(title="MAF Agent API", default_response_class=FastJSONResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -45,6 +58,17 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "service": "maf-agent-api"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the hierarchy exists and background warm-up finished."""
+    report = agent_hierarchy.get("startup") if agent_hierarchy else None
+    if report is None or not report.ready:
+        return FastJSONResponse(
+            status_code=503,
+            content={"status": "starting", "startup": report.as_dict() if report else None}
+        )
+    return {"status": "ready", "startup": report.as_dict()}
+
 # Global active context for visualization (Project/Session)
 active_context = {
     "project_id": 0,
@@ -110,8 +134,9 @@ async def get_agent_status():
         connections.append({"from": "liaison", "to": "pl", "active": False})
 
     # 3. Domain Leads
+    # Iterate names only: Domain Leads and Executors are constructed on first use
     dls = agent_hierarchy.get("domain_leads", {})
-    for key, dl in dls.items():
+    for key in dls:
         node_id = f"dl-{key}"
         add_node(node_id, f"{key.capitalize()} DL", "domain-lead", "idle")
         if pl:
@@ -119,7 +144,7 @@ async def get_agent_status():
             
     # 4. Executors
     execs = agent_hierarchy.get("executors", {})
-    for key, exc in execs.items():
+    for key in execs:
         node_id = f"exec-{key}"
         add_node(node_id, f"{key.capitalize()}", "executor", "idle")
         # Connect executors to Dev DL for now as default, or based on logic
@@ -156,6 +181,157 @@ async def chat(request: ChatRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Agent error: {str(e)}")
 
+async def _produce_chat_events(liaison_agent, message: str, stream: EventStream):
+    """Run the Liaison in streaming mode, publishing every event to ``stream``.
+    
+    OLB/TLB progress events are emitted into the same stream because it is
+    bound to this task's context.
+    """
+    with bind_event_stream(stream):
+        try:
+            async for event in liaison_agent.stream_user_message(message):
+                event_type = event.pop("type")
+                await stream.emit(event_type, **event)
+        finally:
+            await stream.close()
+
+
+def _start_chat_stream(message: str) -> tuple[EventStream, asyncio.Task]:
+    """Create the event stream and the producer task for a chat request."""
+    if agent_hierarchy is None or "liaison" not in agent_hierarchy:
+        raise HTTPException(status_code=503, detail="Agent system not initialized")
+    
+    stream = EventStream(maxsize=settings.STREAM_QUEUE_MAXSIZE)
+    producer = asyncio.create_task(
+        _produce_chat_events(agent_hierarchy["liaison"], message, stream)
+    )
+    return stream, producer
+
+
+async def _cancel_and_wait(task: asyncio.Task) -> None:
+    """Cancel ``task`` and wait for it to finish, ignoring its outcome.
+    
+    Used for chat producers (cancellation propagates to in-flight LLM
+    requests) and WebSocket watchers. Only the task's own cancellation is
+    suppressed: if the caller itself is being cancelled (server shutdown, an
+    outer timeout) CancelledError is re-raised.
+    """
+    if not task.done():
+        task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        current = asyncio.current_task()
+        if current is not None and current.cancelling():
+            raise
+    except Exception:
+        pass
+
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    """Encode an event dictionary as a Server-Sent Events frame."""
+    return f"event: {event['type']}\ndata: {serialization.dumps_str(event)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """
+    Stream a Liaison response as Server-Sent Events.
+    
+    Emits token deltas, tool calls/results and OLB/TLB progress as they
+    happen. Idle periods are filled with keep-alive comments so proxies do
+    not time out. If the client disconnects, the in-flight work is cancelled.
+    """
+    stream, producer = _start_chat_stream(request.message)
+
+    async def event_source():
+        try:
+            while True:
+                try:
+                    event = await stream.next(timeout=settings.STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await http_request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                event.setdefault("session_id", request.session_id)
+                yield _format_sse(event)
+        finally:
+            await _cancel_and_wait(producer)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _wait_for_ws_cancel(websocket: WebSocket) -> None:
+    """Return when the client disconnects or sends {"type": "cancel"}.
+    
+    Other messages received while a response is streaming are ignored.
+    """
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        try:
+            data = serialization.loads(message.get("text") or "{}")
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict) and data.get("type") == "cancel":
+            return
+
+
+@app.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket):
+    """
+    Bidirectional chat over WebSocket.
+    
+    Client sends {"message": "...", "session_id": "..."}; the server pushes
+    the same events as /chat/stream as JSON frames. Sending {"type": "cancel"}
+    or disconnecting cancels the in-flight request.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                request = ChatRequest(**(await websocket.receive_json()))
+            except (json.JSONDecodeError, TypeError, ValidationError) as e:
+                await websocket.send_json({"type": "error", "message": f"Invalid chat request: {e}"})
+                continue
+            try:
+                stream, producer = _start_chat_stream(request.message)
+            except HTTPException as e:
+                await websocket.send_json({"type": "error", "message": e.detail})
+                continue
+
+            watcher = asyncio.create_task(_wait_for_ws_cancel(websocket))
+            try:
+                while True:
+                    next_event = asyncio.create_task(stream.next())
+                    done, _ = await asyncio.wait(
+                        {next_event, watcher}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if watcher in done:
+                        next_event.cancel()
+                        watcher.result()  # Re-raise WebSocketDisconnect
+                        await websocket.send_json({"type": "cancelled", "session_id": request.session_id})
+                        break
+                    event = next_event.result()
+                    if event is None:
+                        break
+                    event.setdefault("session_id", request.session_id)
+                    await websocket.send_json(event)
+            finally:
+                await _cancel_and_wait(watcher)
+                await _cancel_and_wait(producer)
+    except WebSocketDisconnect:
+        pass
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -164,7 +340,10 @@ async def root():
         "version": "2.0.0",
         "endpoints": {
             "health": "/health",
+            "ready": "/ready",
             "chat": "/chat (POST)",
+            "chat_stream": "/chat/stream (POST, SSE)",
+            "chat_ws": "/ws/chat (WebSocket)",
             "status": "/api/agents/status",
             "context": "/api/context (POST)"
         }
@@ -3,8 +3,13 @@ Standalone entry point for the FastAPI Agent API server.
 This initializes the agent hierarchy and starts the server.
 """
 import asyncio
+import contextlib
+import logging
+import os
 from src.services.agent_factory import AgentFactory
 from src.api.agent_api import app, set_agent_hierarchy
+from src.persistence.db_pool import db_pool
+from src.persistence.checkpoint_storage import get_checkpoint_storage
 from src.config.settings import settings
 import uvicorn
 
@@ -16,8 +21,11 @@ logger = logging.getLogger(__name__)
 # import src.tools.code_tools  <-- REMOVED: Imported via src.tools re-export
 
 def startup():
-    """Initialize agent hierarchy before starting the server."""
-    logger.info("Startup complete. Server ready.")
+    """Initialize agent hierarchy before starting the server.
+
+    Only the Liaison and Project Lead are built here; Domain Leads and
+    Executors are constructed on first use.
+    """
     logger.info(f"Environment: {os.getenv('MAF_ENV', 'development')}")
     logger.info("Initializing agent hierarchy...")
     hierarchy = AgentFactory.create_hierarchy()
@@ -25,14 +33,34 @@ def startup():
     # Inject hierarchy into the API
     set_agent_hierarchy(hierarchy)
     
-    logger.info(f"Active Agents: Liaison, ProjectLead")
+    logger.info(f"Active Agents: Liaison, ProjectLead ({hierarchy['startup'].summary()})")
     logger.info(f"Starting API server on http://0.0.0.0:8002")
+    return hierarchy
 
 # Register startup event
 @app.on_event("startup")
 async def on_startup():
-    """Run startup initialization."""
-    startup()
+    """Run startup initialization.
+
+    The database pool, project context and tool schemas warm up in the
+    background; /ready reports when they are done. Checkpoint retention
+    runs periodically until shutdown.
+    """
+    app.state.hierarchy = startup()
+    app.state.warm_up = asyncio.create_task(AgentFactory.warm_up(app.state.hierarchy))
+    get_checkpoint_storage().start_background_pruning()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stop background work and close shared resources (LLM and database connection pools)."""
+    warm_up = getattr(app.state, "warm_up", None)
+    if warm_up is not None and not warm_up.done():
+        warm_up.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await warm_up
+    await get_checkpoint_storage().stop_background_pruning()
+    await AgentFactory.shutdown(getattr(app.state, "hierarchy", None))
+    await db_pool.close()
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8002)
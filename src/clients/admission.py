@@ -0,0 +1,298 @@
+"""
+LLM Admission Control
+
+Bounds how many completions run concurrently against each model so a single
+local GPU is not driven into timeouts by TLB/OLB fan-out plus interactive
+users.
+
+- Per-model controllers share one limit across every client instance.
+- The limit adapts with AIMD: it grows by ~1 per round trip while the model
+  is saturated and latency stays near the observed baseline, and is cut
+  multiplicatively when latency exceeds baseline * tolerance or the backend
+  times out / returns 429 or 5xx.
+- Callers wait in a bounded priority queue: interactive turns (Liaison) are
+  admitted before background work (workflow executors and Domain Leads).
+- A caller whose deadline cannot be met is rejected up front instead of
+  waiting to time out; when the queue is full a newcomer displaces the
+  newest waiter of a lower priority class, otherwise it is rejected.
+
+The priority of the current task is set with ``llm_priority()`` or per call
+via ``additional_properties={"priority": "background"}``.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Union
+
+import httpx
+
+from src.config.settings import settings
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+PRIORITY_NAMES = {"interactive": PRIORITY_INTERACTIVE, "background": PRIORITY_BACKGROUND}
+
+_current_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request is not admitted (queue full or deadline unreachable)."""
+
+    def __init__(self, model: str, reason: str):
+        super().__init__(f"LLM admission rejected for {model}: {reason}")
+        self.model = model
+        self.reason = reason
+
+
+def resolve_priority(priority: Union[int, str, None] = None) -> int:
+    """Map a priority name or number to its class (defaults to the current context)."""
+    if priority is None:
+        return _current_priority.get()
+    if isinstance(priority, str):
+        return PRIORITY_NAMES[priority]
+    return priority
+
+
+@contextmanager
+def llm_priority(priority: Union[int, str]) -> Iterator[None]:
+    """Run LLM calls made inside the block (and tasks spawned from it) at ``priority``."""
+    token = _current_priority.set(resolve_priority(priority))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def is_overload(error: BaseException) -> bool:
+    """Whether an upstream error signals an overloaded backend."""
+    if isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+class AdmissionController:
+    """Adaptive concurrency limit and priority wait queue for one model."""
+
+    def __init__(
+        self,
+        model: str,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        max_queue: int = 100,
+        adaptive: bool = True,
+        latency_tolerance: float = 3.0,
+        backoff: float = 0.7
+    ):
+        """
+        Args:
+            model: Model name (used for metrics and errors)
+            initial_limit: Starting concurrency limit
+            min_limit: Lower bound for the adaptive limit
+            max_limit: Upper bound for the adaptive limit (defaults to initial_limit)
+            max_queue: Maximum number of waiting requests
+            adaptive: Adjust the limit from observed latency (AIMD)
+            latency_tolerance: Latency above baseline * tolerance counts as congestion
+            backoff: Multiplicative decrease factor applied on congestion
+        """
+        self.model = model
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit or initial_limit, min_limit)
+        self.max_queue = max_queue
+        self.adaptive = adaptive
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+
+        self._limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self._in_flight = 0
+        self._waiters: List[tuple] = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._baseline: Optional[float] = None
+        self._avg_latency: Optional[float] = None
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        priority: Union[int, str, None] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        """Hold a concurrency slot for the duration of the block.
+
+        Args:
+            priority: Priority class (defaults to the current llm_priority())
+            timeout: Maximum seconds to wait for a slot
+
+        Raises:
+            AdmissionRejected: If no slot can be obtained in time
+        """
+        await self._acquire(resolve_priority(priority), timeout)
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self._release(time.perf_counter() - started, overloaded=is_overload(e), sample=False)
+            raise
+        self._release(time.perf_counter() - started, overloaded=False, sample=True)
+
+    async def _acquire(self, priority: int, timeout: Optional[float]) -> None:
+        if self._in_flight < self.limit and self.queue_depth == 0:
+            self._in_flight += 1
+            self._record_state()
+            return
+
+        ahead = sum(1 for p, _, f in self._waiters if p <= priority and not f.done())
+        if timeout is not None and self._avg_latency is not None:
+            expected_wait = (ahead + 1) / self.limit * self._avg_latency
+            if expected_wait > timeout:
+                self._reject("deadline")
+
+        if self.queue_depth >= self.max_queue and not self._displace(priority):
+            self._reject("queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._record_state()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._abandon(future)
+            self._reject("timeout")
+        except BaseException:
+            self._abandon(future)
+            raise
+        self._record_wait(time.perf_counter() - started)
+
+    def _displace(self, priority: int) -> bool:
+        """Reject the newest lowest-priority waiter to make room for ``priority``."""
+        pending = [entry for entry in self._waiters if not entry[2].done()]
+        victim = max(pending, key=lambda entry: (entry[0], entry[1]), default=None)
+        if victim is None or victim[0] <= priority:
+            return False
+        victim[2].set_exception(AdmissionRejected(self.model, "displaced"))
+        self._record_rejection("displaced")
+        return True
+
+    def _abandon(self, future: asyncio.Future) -> None:
+        """Clean up after a waiter gave up; pass on a slot it was already granted."""
+        if future.done() and not future.cancelled() and future.exception() is None:
+            self._in_flight -= 1
+            self._wake()
+        else:
+            future.cancel()
+        self._record_state()
+
+    def _release(self, latency: float, overloaded: bool, sample: bool) -> None:
+        self._in_flight -= 1
+        if self.adaptive and (sample or overloaded):
+            self._adjust(latency, overloaded)
+        self._wake()
+        self._record_state()
+
+    def _adjust(self, latency: float, overloaded: bool) -> None:
+        """AIMD update of the concurrency limit."""
+        saturated = self._in_flight + 1 >= self.limit
+        if not overloaded:
+            self._avg_latency = latency if self._avg_latency is None else 0.8 * self._avg_latency + 0.2 * latency
+            if self._baseline is None or latency < self._baseline:
+                self._baseline = latency
+            else:
+                # Drift upwards slowly so the baseline follows real changes in load
+                self._baseline = 0.99 * self._baseline + 0.01 * latency
+
+        congested = overloaded or latency > self._baseline * self.latency_tolerance
+        now = time.monotonic()
+        if congested:
+            # At most one decrease per round trip: samples finishing together
+            # all reflect the same congestion episode
+            if now - self._last_decrease >= (self._avg_latency or latency):
+                self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                self._last_decrease = now
+                logger.info(f"[Admission:{self.model}] Congestion, limit -> {self.limit}")
+        elif saturated and self._limit < self.max_limit:
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+
+    def _wake(self) -> None:
+        """Hand free slots to the highest-priority waiters."""
+        while self._waiters and self._in_flight < self.limit:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._in_flight += 1
+            future.set_result(None)
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+    def _reject(self, reason: str) -> None:
+        self._record_rejection(reason)
+        raise AdmissionRejected(self.model, reason)
+
+    def _record_state(self) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().record_llm_admission_state(self.model, self.limit, self._in_flight, self.queue_depth)
+        except Exception:
+            pass
+
+    def _record_wait(self, seconds: float) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().observe_llm_admission_wait(self.model, seconds)
+        except Exception:
+            pass
+
+    def _record_rejection(self, reason: str) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().record_llm_admission_rejected(self.model, reason)
+        except Exception:
+            pass
+
+
+_controllers: Dict[str, AdmissionController] = {}
+
+
+def get_admission_controller(model: str) -> AdmissionController:
+    """Return the process-wide controller for ``model`` (created from settings)."""
+    controller = _controllers.get(model)
+    if controller is None:
+        initial = settings.LLM_ADMISSION_MODEL_LIMITS.get(model, settings.LLM_MAX_PARALLEL_REQUESTS)
+        controller = AdmissionController(
+            model,
+            initial_limit=initial,
+            min_limit=settings.LLM_ADMISSION_MIN_LIMIT,
+            max_limit=max(settings.LLM_ADMISSION_MAX_LIMIT, initial),
+            max_queue=settings.LLM_ADMISSION_MAX_QUEUE,
+            adaptive=settings.LLM_ADMISSION_ADAPTIVE,
+            latency_tolerance=settings.LLM_ADMISSION_LATENCY_TOLERANCE
+        )
+        _controllers[model] = controller
+    return controller
+
+
+def reset_admission_controllers() -> None:
+    """Forget all per-model controllers (for tests)."""
+    _controllers.clear()
@@ -1,5 +1,8 @@
 import httpx
-from typing import Any, MutableSequence
+import json
+import time
+from contextlib import aclosing, asynccontextmanager, nullcontext
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Dict, MutableSequence, Optional
 from collections.abc import AsyncIterable
 
 from agent_framework import (
@@ -11,11 +14,20 @@ from agent_framework import (
     FunctionCallContent,
     Role,
     TextContent,
-    use_function_invocation,
-    AIFunction
+    UsageContent,
+    UsageDetails,
+    use_function_invocation
 )
 
+from src.clients.admission import AdmissionRejected, get_admission_controller, resolve_priority
+from src.clients.response_cache import ResponseCache, canonical_key
+from src.clients.single_flight import SingleFlight
+from src.clients.token_budget import ContextBudget
+from src.clients.tool_schemas import CompiledTools, tool_schema_cache
 from src.config.settings import settings
+from src.utils import get_logger, serialization
+
+logger = get_logger(__name__)
 
 
 @use_function_invocation
@@ -25,28 +37,207 @@ class LiteLLMChatClient(BaseChatClient):
     
     This client extends BaseChatClient and uses the @use_function_invocation
     decorator to enable automatic tool execution through MAF's framework.
+    
+    The client owns a long-lived, pooled httpx.AsyncClient (keep-alive and
+    optional HTTP/2) that is created lazily on first use and shared by every
+    agent holding this client. Call aclose() on shutdown to release it.
+    
+    Completions are served from a ResponseCache when LLM_CACHE_ENABLED is set;
+    pass ``additional_properties={"cache": False}`` to bypass it for one call.
+    Concurrent identical non-streaming requests are coalesced into a single
+    upstream call when LLM_SINGLE_FLIGHT_ENABLED is set (opt out per call with
+    ``additional_properties={"coalesce": False}``).
+    
+    Upstream calls pass through the per-model admission controller when
+    LLM_ADMISSION_ENABLED is set; calls are admitted by priority class
+    (``additional_properties={"priority": "background"}`` or llm_priority()).
+    
+    Message histories are deduplicated and compacted to fit the model's
+    context window (see ContextBudget) before they are sent.
     """
     
-    def __init__(self, model_name: str = "maf-default", **kwargs):
+    def __init__(
+        self,
+        model_name: str = "maf-default",
+        http_client: Optional[httpx.AsyncClient] = None,
+        response_cache: Optional[ResponseCache] = None,
+        **kwargs
+    ):
         super().__init__(**kwargs)
         self.base_url = settings.LITELLM_URL
         self.model_name = model_name
         self.api_key = settings.LITELLM_MASTER_KEY
+        self._http_client = http_client
+        self._owns_http_client = http_client is None
+        if response_cache is None and settings.LLM_CACHE_ENABLED:
+            response_cache = ResponseCache()
+        self.response_cache = response_cache
+        self._single_flight = SingleFlight() if settings.LLM_SINGLE_FLIGHT_ENABLED else None
+        self.context_budget = ContextBudget() if settings.LLM_CONTEXT_BUDGET_ENABLED else None
+        # Pool usage tracked from our own requests (see pool_stats)
+        self._pool_queued = 0
+        self._pool_in_use = 0
+        self._pool_connections = 0
 
-    async def _inner_get_response(
-        self,
-        *,
-        messages: MutableSequence[ChatMessage],
-        chat_options: ChatOptions,
-        **kwargs: Any,
-    ) -> ChatResponse:
+    def _create_http_client(self) -> httpx.AsyncClient:
+        """Build the pooled HTTP client used for all LiteLLM requests."""
+        http2 = settings.LITELLM_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("LITELLM_HTTP2 is enabled but 'h2' is not installed. Falling back to HTTP/1.1.")
+                http2 = False
+
+        limits = httpx.Limits(
+            max_connections=settings.LITELLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LITELLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LITELLM_KEEPALIVE_EXPIRY
+        )
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=limits,
+            timeout=settings.LITELLM_TIMEOUT,
+            http2=http2,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+        )
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The shared pooled HTTP client (created on first access)."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = self._create_http_client()
+            self._owns_http_client = True
+        return self._http_client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and release all connections."""
+        if self._http_client is not None and self._owns_http_client and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._pool_connections = 0
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Snapshot of the connection pool: connections in use, idle and queued requests.
+        
+        Counts come from this client's own requests and httpcore's public
+        ``trace`` events rather than pool internals: a request is queued until
+        its first connection-level event and in use until its response is
+        closed. Idle is the number of connections opened by our requests (and
+        not seen closed) minus those in use, so it is an estimate.
         """
-        Internal method to get a response from LiteLLM.
+        if self._http_client is None or self._http_client.is_closed:
+            return {"in_use": 0, "idle": 0, "queued": 0}
+        return {
+            "in_use": self._pool_in_use,
+            "idle": max(self._pool_connections - self._pool_in_use, 0),
+            "queued": self._pool_queued
+        }
+
+    @asynccontextmanager
+    async def _tracked_request(self) -> AsyncIterator[Callable[[str, Dict[str, Any]], Any]]:
+        """Track one request's pool usage; yields the httpcore ``trace`` callback.
         
-        This method is called by BaseChatClient.get_response() and by the
-        @use_function_invocation decorator. It converts MAF objects to OpenAI
-        format for LiteLLM and converts the response back to M AF format.
+        Pool wait time is the delay between submitting the request and the
+        first connection-level trace event (i.e. when the pool hands out a
+        connection). Metrics are published when the request finishes.
         """
+        started = time.perf_counter()
+        acquired: Dict[str, float] = {}
+        self._pool_queued += 1
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if "wait" not in acquired:
+                acquired["wait"] = time.perf_counter() - started
+                self._pool_queued -= 1
+                self._pool_in_use += 1
+            if event_name == "connection.connect_tcp.complete":
+                self._pool_connections += 1
+            elif event_name == "connection.close.complete":
+                self._pool_connections = max(self._pool_connections - 1, 0)
+
+        try:
+            yield trace
+        finally:
+            if "wait" in acquired:
+                self._pool_in_use -= 1
+            else:
+                self._pool_queued -= 1
+            self._record_pool_metrics(acquired.get("wait"))
+
+    def _record_pool_metrics(self, wait_seconds: Optional[float] = None) -> None:
+        """Publish pool stats (and optionally a pool wait sample) to Prometheus."""
+        try:
+            from src.services.metrics_service import MetricsService
+            metrics = MetricsService()
+            metrics.record_http_pool_stats(**self.pool_stats())
+            if wait_seconds is not None:
+                metrics.observe_http_pool_wait(wait_seconds)
+        except Exception:
+            pass
+
+    def _cache_for(self, chat_options: ChatOptions) -> Optional[ResponseCache]:
+        """The response cache to use for this call, or None if bypassed."""
+        if self.response_cache is None:
+            return None
+        if (chat_options.additional_properties or {}).get("cache") is False:
+            return None
+        return self.response_cache
+
+    def _admission(self, payload: Dict[str, Any], chat_options: ChatOptions) -> AsyncContextManager:
+        """Admission slot for this call (a no-op when admission control is off)."""
+        if not settings.LLM_ADMISSION_ENABLED:
+            return nullcontext()
+        priority = resolve_priority((chat_options.additional_properties or {}).get("priority"))
+        return get_admission_controller(payload["model"]).admit(
+            priority,
+            settings.LLM_ADMISSION_MAX_WAIT_SECONDS
+        )
+
+    async def _fetch_completion(
+        self,
+        payload: Dict[str, Any],
+        cache: Optional[ResponseCache],
+        admission: AsyncContextManager
+    ) -> Dict[str, Any]:
+        """Call LiteLLM under admission control and cache the body (if a cache is in use)."""
+        started = time.perf_counter()
+        async with admission:
+            data = await self._post_completion(payload)
+        if cache is not None:
+            await cache.set(payload, data, time.perf_counter() - started)
+        return data
+
+    @staticmethod
+    def _encode_payload(payload: Dict[str, Any]) -> bytes:
+        """Serialize a payload, splicing in the pre-serialized tool specs."""
+        tools = payload.get("tools")
+        if not isinstance(tools, CompiledTools):
+            return serialization.dumps(payload)
+        rest = serialization.dumps({k: v for k, v in payload.items() if k != "tools"})
+        return rest[:-1] + b',"tools":' + tools.json_bytes + b"}"
+
+    async def _post_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a completion request over the shared pool and return the JSON body."""
+        async with self._tracked_request() as trace:
+            response = await self.http_client.post(
+                "/chat/completions",
+                content=self._encode_payload(payload),
+                headers={"Content-Type": "application/json"},
+                extensions={"trace": trace}
+            )
+            response.raise_for_status()
+            return serialization.loads(response.content)
+
+    def _build_payload(
+        self,
+        messages: MutableSequence[ChatMessage],
+        chat_options: ChatOptions
+    ) -> Dict[str, Any]:
+        """Convert MAF messages and chat options into an OpenAI-format payload."""
         # 1. Convert MAF ChatMessages to OpenAI format
         history = []
         for msg in messages:
@@ -83,27 +274,9 @@ class LiteLLMChatClient(BaseChatClient):
             
             history.append(msg_dict)
         
-        # 2. Convert MAF tools (AIFunction or callables) to OpenAI format
-        api_tools = None
-        if chat_options.tools:
-            from agent_framework import ai_function
-            api_tools = []
-            for tool in chat_options.tools:
-                # Convert callables to AIFunction
-                if callable(tool) and not isinstance(tool, AIFunction):
-                    tool = ai_function(tool)
-                
-                if isinstance(tool, AIFunction):
-                    # Extract schema from AIFunction
-                    tool_schema = tool.to_dict()
-                    api_tools.append({
-                        "type": "function",
-                        "function": {
-                            "name": tool_schema.get("name"),
-                            "description": tool_schema.get("description", ""),
-                            "parameters": tool_schema.get("input_schema", {})
-                        }
-                    })
+        # 2. Convert MAF tools (AIFunction or callables) to OpenAI format,
+        # compiled once per tool list and reused across turns
+        api_tools = tool_schema_cache.compile(chat_options.tools)
         
         # 3. Prepare payload for LiteLLM
         payload = {
@@ -122,29 +295,15 @@ class LiteLLMChatClient(BaseChatClient):
         if chat_options.max_tokens is not None:
             payload["max_tokens"] = chat_options.max_tokens
         
-        # 4. Call LiteLLM
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    json=payload,
-                    headers=headers,
-                    timeout=60.0
-                )
-                response.raise_for_status()
-                data = response.json()
-        except httpx.HTTPStatusError as e:
-            error_detail = e.response.json().get('error', {}).get('message', str(e))
-            raise RuntimeError(f"LiteLLM HTTP Error: {error_detail}")
-        except Exception as e:
-            raise RuntimeError(f"LiteLLM request failed: {e}")
+        # 4. Deduplicate and compact the history to fit the context window
+        if self.context_budget is not None:
+            payload = self.context_budget.fit(payload)
         
-        # 5. Convert OpenAI response back to MAF ChatResponse
+        return payload
+
+    @staticmethod
+    def _parse_completion(data: Dict[str, Any]) -> ChatResponse:
+        """Convert an OpenAI-format completion body into a MAF ChatResponse."""
         try:
             choice = data['choices'][0]
             message_data = choice['message']
@@ -182,6 +341,109 @@ class LiteLLMChatClient(BaseChatClient):
         except (KeyError, IndexError) as e:
             raise RuntimeError(f"Error parsing LiteLLM response: {e}")
 
+    @staticmethod
+    def _http_error_detail(error: httpx.HTTPStatusError) -> str:
+        """Extract the LiteLLM error message from an HTTP error response."""
+        try:
+            return error.response.json().get('error', {}).get('message', str(error))
+        except Exception:
+            return str(error)
+
+    async def _inner_get_response(
+        self,
+        *,
+        messages: MutableSequence[ChatMessage],
+        chat_options: ChatOptions,
+        **kwargs: Any,
+    ) -> ChatResponse:
+        """
+        Internal method to get a response from LiteLLM.
+        
+        This method is called by BaseChatClient.get_response() and by the
+        @use_function_invocation decorator. It converts MAF objects to OpenAI
+        format for LiteLLM and converts the response back to MAF format.
+        """
+        payload = self._build_payload(messages, chat_options)
+        cache = self._cache_for(chat_options)
+        if cache is not None:
+            cached = await cache.get(payload)
+            if cached is not None:
+                return self._parse_completion(cached)
+        
+        # Call LiteLLM over the shared connection pool, sharing the call with
+        # concurrent identical requests
+        coalesce = (chat_options.additional_properties or {}).get("coalesce") is not False
+        admission = self._admission(payload, chat_options)
+        try:
+            if self._single_flight is not None and coalesce:
+                data = await self._single_flight.do(
+                    canonical_key(payload),
+                    lambda: self._fetch_completion(payload, cache, admission)
+                )
+            else:
+                data = await self._fetch_completion(payload, cache, admission)
+        except AdmissionRejected:
+            raise
+        except httpx.HTTPStatusError as e:
+            raise RuntimeError(f"LiteLLM HTTP Error: {self._http_error_detail(e)}")
+        except Exception as e:
+            raise RuntimeError(f"LiteLLM request failed: {e}")
+        
+        # Convert OpenAI response back to MAF ChatResponse
+        return self._parse_completion(data)
+
+    async def _stream_completion(self, payload: Dict[str, Any]) -> AsyncIterable[Dict[str, Any]]:
+        """POST a streaming completion and yield each decoded SSE chunk.
+        
+        If the upstream ignores ``stream=true`` and answers with a plain JSON
+        body, that body is yielded once as-is.
+        """
+        async with self._tracked_request() as trace:
+            async with self.http_client.stream(
+                "POST",
+                "/chat/completions",
+                content=self._encode_payload({**payload, "stream": True}),
+                headers={"Content-Type": "application/json"},
+                extensions={"trace": trace}
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+
+                if response.headers.get("content-type", "").startswith("application/json"):
+                    await response.aread()
+                    yield serialization.loads(response.content)
+                    return
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if not data:
+                        continue
+                    if data == "[DONE]":
+                        break
+                    yield serialization.loads(data)
+
+    @staticmethod
+    async def _admitted(
+        chunks: AsyncIterable[Dict[str, Any]],
+        admission: AsyncContextManager
+    ) -> AsyncIterable[Dict[str, Any]]:
+        """Hold an admission slot for the whole duration of a stream.
+
+        The caller must close this generator (e.g. with ``aclosing``) when it
+        stops early; the upstream stream is closed before the slot is released.
+        """
+        async with admission, aclosing(chunks):
+            async for chunk in chunks:
+                yield chunk
+
+    @staticmethod
+    async def _replay(body: Dict[str, Any]) -> AsyncIterable[Dict[str, Any]]:
+        """Yield a cached completion body as a one-chunk stream."""
+        yield body
+
     async def _inner_get_streaming_response(
         self,
         *,
@@ -190,17 +452,105 @@ class LiteLLMChatClient(BaseChatClient):
         **kwargs: Any,
     ) -> AsyncIterable[ChatResponseUpdate]:
         """
-        Streaming is not yet implemented for LiteLLM.
+        Stream a response from LiteLLM using Server-Sent Events.
+        
+        Text deltas are yielded as soon as they arrive. Tool-call fragments are
+        assembled per call index and yielded as one complete FunctionCallContent
+        when the model finishes the turn, so @use_function_invocation receives
+        well-formed arguments it can dispatch.
+        
+        Cached completions are replayed as a single non-streaming body; streamed
+        responses themselves are not written to the cache.
         """
-        # For now, fall back to non-streaming
-        response = await self._inner_get_response(
-            messages=messages,
-            chat_options=chat_options,
-            **kwargs
-        )
-        # Yield the complete response as a single update
-        for msg in response.messages:
-            yield ChatResponseUpdate(
-                role=msg.role,
-                contents=msg.contents
-            )
+        payload = self._build_payload(messages, chat_options)
+        cache = self._cache_for(chat_options)
+        cached = await cache.get(payload) if cache is not None else None
+        pending_calls: Dict[Any, Dict[str, Any]] = {}
+        response_id = None
+
+        def flush_tool_calls(**update_fields: Any) -> Optional[ChatResponseUpdate]:
+            if not pending_calls:
+                return None
+            contents = [
+                FunctionCallContent(
+                    call_id=call["id"] or f"call_{key}",
+                    name=call["name"],
+                    arguments=call["arguments"]
+                )
+                for key, call in pending_calls.items()
+            ]
+            pending_calls.clear()
+            return ChatResponseUpdate(role=Role.ASSISTANT, contents=contents, **update_fields)
+
+        try:
+            if cached is not None:
+                chunks = self._replay(cached)
+            else:
+                chunks = self._admitted(self._stream_completion(payload), self._admission(payload, chat_options))
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    response_id = chunk.get("id", response_id)
+                    model_id = chunk.get("model")
+
+                    # Non-streaming fallback body
+                    if chunk.get("choices") and "message" in chunk["choices"][0]:
+                        for msg in self._parse_completion(chunk).messages:
+                            yield ChatResponseUpdate(
+                                role=msg.role,
+                                contents=msg.contents,
+                                response_id=response_id,
+                                model_id=model_id
+                            )
+                        continue
+
+                    if chunk.get("usage"):
+                        yield ChatResponseUpdate(
+                            role=Role.ASSISTANT,
+                            contents=[UsageContent(details=UsageDetails(
+                                input_token_count=chunk["usage"].get("prompt_tokens"),
+                                output_token_count=chunk["usage"].get("completion_tokens"),
+                                total_token_count=chunk["usage"].get("total_tokens")
+                            ))],
+                            response_id=response_id
+                        )
+
+                    for choice in chunk.get("choices", []):
+                        delta = choice.get("delta") or {}
+
+                        if delta.get("content"):
+                            yield ChatResponseUpdate(
+                                role=Role.ASSISTANT,
+                                contents=[TextContent(text=delta["content"])],
+                                response_id=response_id,
+                                model_id=model_id
+                            )
+
+                        for tc in delta.get("tool_calls") or []:
+                            key = tc.get("index", tc.get("id"))
+                            call = pending_calls.setdefault(key, {"id": None, "name": None, "arguments": ""})
+                            func = tc.get("function") or {}
+                            call["id"] = tc.get("id") or call["id"]
+                            call["name"] = func.get("name") or call["name"]
+                            call["arguments"] += func.get("arguments") or ""
+
+                        if choice.get("finish_reason"):
+                            update = flush_tool_calls(
+                                response_id=response_id,
+                                model_id=model_id,
+                                finish_reason=choice["finish_reason"]
+                            )
+                            if update:
+                                yield update
+        except httpx.HTTPStatusError as e:
+            raise RuntimeError(f"LiteLLM HTTP Error: {self._http_error_detail(e)}")
+        except (json.JSONDecodeError, KeyError, IndexError) as e:
+            raise RuntimeError(f"Error parsing LiteLLM stream: {e}")
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"LiteLLM request failed: {e}")
+
+        # Stream ended without a finish_reason: emit whatever calls were assembled
+        update = flush_tool_calls(response_id=response_id)
+        if update:
+            yield update
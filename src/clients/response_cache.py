@@ -0,0 +1,390 @@
+"""
+LLM Response Cache
+
+Caches completion bodies returned by LiteLLM so byte-identical requests
+(Liaison intent classification, repeated Domain Lead breakdowns, research
+prompts) skip the model entirely.
+
+Entries are keyed by a SHA-256 over the canonical JSON of the request payload
+(model, messages, tools, tool_choice, temperature, max_tokens) and looked up
+in up to three tiers:
+
+1. memory     - in-process LRU with TTL (always on)
+2. sqlite     - optional persistent tier surviving restarts, size-bounded
+3. semantic   - optional near-duplicate tier: the final user message is
+                embedded in ChromaDB and matched against earlier prompts that
+                share the exact same context (model, tools, prior messages)
+
+Hits from slower tiers are promoted into memory. Callers opt out per call
+with ``additional_properties={"cache": False}``.
+"""
+
+import asyncio
+import copy
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.clients.tool_schemas import CompiledTools
+from src.config.settings import settings
+from src.utils import get_logger, serialization
+
+logger = get_logger(__name__)
+
+# Cached value: {"response": completion body, "latency": seconds the call took}
+CacheEntry = Dict[str, Any]
+
+
+def canonical_key(payload: Dict[str, Any]) -> str:
+    """Stable hash of a completion payload (key order and whitespace agnostic)."""
+    body = {k: v for k, v in payload.items() if k != "stream"}
+    if isinstance(body.get("tools"), CompiledTools):
+        # Precompiled tool lists carry their own digest; skip re-serializing them
+        body["tools"] = body["tools"].digest
+    return hashlib.sha256(serialization.dumps(body, sort_keys=True)).hexdigest()
+
+
+def split_prompt(payload: Dict[str, Any]) -> Tuple[Optional[str], str]:
+    """Split a payload into (final user prompt, hash of everything else).
+
+    Returns (None, "") when the last message is not a plain-text user turn,
+    in which case near-duplicate matching does not apply.
+    """
+    messages = payload.get("messages") or []
+    if not messages:
+        return None, ""
+    last = messages[-1]
+    if last.get("role") != "user" or not isinstance(last.get("content"), str):
+        return None, ""
+    context = {**payload, "messages": messages[:-1]}
+    return last["content"], canonical_key(context)
+
+
+class MemoryTier:
+    """In-process LRU cache with per-entry TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float]):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, CacheEntry]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        stored_at, entry = item
+        if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry, stored_at: Optional[float] = None) -> None:
+        self._entries[key] = (stored_at or time.time(), entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteTier:
+    """Persistent tier in a local SQLite file, evicting least recently used rows."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: Optional[float]):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_response_cache (
+                key TEXT PRIMARY KEY,
+                entry TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_response_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    async def get(self, key: str) -> Optional[Tuple[float, CacheEntry]]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        await asyncio.to_thread(self._set, key, entry)
+
+    def _get(self, key: str) -> Optional[Tuple[float, CacheEntry]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT entry, created_at FROM llm_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return row[1], serialization.loads(row[0])
+
+    def _set(self, key: str, entry: CacheEntry) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (key, entry, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, serialization.dumps_str(entry), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE key IN ("
+                "SELECT key FROM llm_response_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_response_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SemanticTier:
+    """Near-duplicate prompt matching backed by a ChromaDB collection.
+
+    Only prompts with an identical context hash (same model, tools, options
+    and earlier messages) are compared, so a match differs from the request
+    in the wording of the final user message alone.
+    """
+
+    name = "semantic"
+
+    def __init__(
+        self,
+        similarity: float,
+        ttl_seconds: Optional[float],
+        collection: Any = None,
+        collection_name: str = "llm_response_cache"
+    ):
+        self.max_distance = 1.0 - similarity
+        self.ttl_seconds = ttl_seconds
+        self.collection_name = collection_name
+        self._collection = collection
+
+    @property
+    def collection(self) -> Any:
+        if self._collection is None:
+            import chromadb
+            url = urlparse(settings.CHROMA_URL)
+            client = chromadb.HttpClient(host=url.hostname or "localhost", port=url.port or 8000)
+            self._collection = client.get_or_create_collection(
+                name=self.collection_name,
+                metadata={"hnsw:space": "cosine"}
+            )
+        return self._collection
+
+    async def get(self, prompt: str, context: str) -> Optional[CacheEntry]:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            None,
+            lambda: self.collection.query(
+                query_texts=[prompt],
+                n_results=1,
+                where={"context": context},
+                include=["metadatas", "distances"]
+            )
+        )
+        metadatas = (result.get("metadatas") or [[]])[0]
+        distances = (result.get("distances") or [[]])[0]
+        if not metadatas or distances[0] > self.max_distance:
+            return None
+        metadata = metadatas[0]
+        if self.ttl_seconds is not None and time.time() - metadata["created_at"] > self.ttl_seconds:
+            return None
+        return serialization.loads(metadata["entry"])
+
+    async def set(self, key: str, prompt: str, context: str, entry: CacheEntry) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None,
+            lambda: self.collection.upsert(
+                ids=[key],
+                documents=[prompt],
+                metadatas=[{
+                    "context": context,
+                    "created_at": time.time(),
+                    "entry": serialization.dumps_str(entry)
+                }]
+            )
+        )
+
+
+class ResponseCache:
+    """Tiered cache of LiteLLM completion bodies.
+
+    Failures in the persistent or semantic tiers are logged and treated as
+    misses; the cache never fails a completion.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        persistent: Optional[bool] = None,
+        path: Optional[str] = None,
+        semantic: Optional[bool] = None,
+        similarity: Optional[float] = None,
+        semantic_collection: Any = None
+    ):
+        """
+        Args:
+            max_entries: Entries kept in memory (and in the SQLite tier)
+            ttl_seconds: Entry lifetime; None keeps entries until evicted
+            persistent: Enable the SQLite tier
+            path: SQLite database file
+            semantic: Enable near-duplicate matching through ChromaDB
+            similarity: Minimum cosine similarity for a near-duplicate hit
+            semantic_collection: Pre-built ChromaDB collection (for tests)
+        """
+        max_entries = max_entries or settings.LLM_CACHE_MAX_ENTRIES
+        ttl = settings.LLM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        persistent = settings.LLM_CACHE_PERSISTENT if persistent is None else persistent
+        semantic = settings.LLM_CACHE_SEMANTIC if semantic is None else semantic
+
+        self.memory = MemoryTier(max_entries, ttl)
+        self.sqlite: Optional[SQLiteTier] = None
+        if persistent:
+            self.sqlite = SQLiteTier(
+                path or settings.LLM_CACHE_PATH,
+                settings.LLM_CACHE_PERSISTENT_MAX_ENTRIES,
+                ttl
+            )
+        self.semantic: Optional[SemanticTier] = None
+        if semantic:
+            self.semantic = SemanticTier(
+                similarity if similarity is not None else settings.LLM_CACHE_SIMILARITY,
+                ttl,
+                collection=semantic_collection
+            )
+
+    async def get(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached completion body for ``payload``, or None.
+
+        Args:
+            payload: The OpenAI-format request payload
+
+        Returns:
+            A deep copy of the cached completion body, or None on a miss
+        """
+        key = canonical_key(payload)
+        tier, entry = self.memory.name, self.memory.get(key)
+
+        if entry is None and self.sqlite is not None:
+            tier = self.sqlite.name
+            try:
+                found = await self.sqlite.get(key)
+            except Exception as e:
+                logger.warning(f"[ResponseCache] SQLite lookup failed: {e}")
+                found = None
+            if found is not None:
+                stored_at, entry = found
+                self.memory.set(key, entry, stored_at)
+
+        if entry is None and self.semantic is not None:
+            prompt, context = split_prompt(payload)
+            if prompt is not None:
+                tier = self.semantic.name
+                try:
+                    entry = await self.semantic.get(prompt, context)
+                except Exception as e:
+                    logger.warning(f"[ResponseCache] Semantic lookup failed: {e}")
+                if entry is not None:
+                    self.memory.set(key, entry)
+
+        if entry is None:
+            self._record_lookup("miss", "none")
+            return None
+
+        self._record_lookup("hit", tier, entry)
+        return copy.deepcopy(entry["response"])
+
+    async def set(self, payload: Dict[str, Any], response: Dict[str, Any], latency: float = 0.0) -> None:
+        """Store a completion body in every enabled tier.
+
+        Args:
+            payload: The OpenAI-format request payload
+            response: Completion body returned by LiteLLM
+            latency: Seconds the upstream call took (reported as saved on hits)
+        """
+        key = canonical_key(payload)
+        entry = {"response": copy.deepcopy(response), "latency": latency}
+        self.memory.set(key, entry)
+
+        if self.sqlite is not None:
+            try:
+                await self.sqlite.set(key, entry)
+            except Exception as e:
+                logger.warning(f"[ResponseCache] SQLite write failed: {e}")
+
+        if self.semantic is not None:
+            prompt, context = split_prompt(payload)
+            if prompt is not None:
+                try:
+                    await self.semantic.set(key, prompt, context, entry)
+                except Exception as e:
+                    logger.warning(f"[ResponseCache] Semantic write failed: {e}")
+
+    def clear(self) -> None:
+        """Drop all entries from the memory and SQLite tiers."""
+        self.memory.clear()
+        if self.sqlite is not None:
+            self.sqlite.clear()
+
+    @staticmethod
+    def _record_lookup(result: str, tier: str, entry: Optional[CacheEntry] = None) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            tokens = 0
+            latency = 0.0
+            if entry is not None:
+                tokens = (entry["response"].get("usage") or {}).get("total_tokens") or 0
+                latency = entry.get("latency") or 0.0
+            MetricsService().record_llm_cache_lookup(result, tier, tokens, latency)
+        except Exception:
+            pass
@@ -0,0 +1,86 @@
+"""
+Single-Flight Request Coalescing
+
+Concurrent callers asking for the same key share one in-flight call: the
+first caller starts it, later callers attach to it, and everybody receives
+the same result (or exception).
+
+Cancellation is reference counted. A waiter that is cancelled (e.g. its
+client disconnected) only detaches itself; the shared call keeps running
+for the remaining waiters and is cancelled once the last one has gone.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Call:
+    """An in-flight call and the number of callers awaiting it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls by key."""
+
+    def __init__(self, name: str = "llm"):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``factory()`` once for all concurrent callers using ``key``.
+
+        Args:
+            key: Identity of the call (e.g. a canonical request hash)
+            factory: Zero-argument coroutine function performing the call
+
+        Returns:
+            The shared call's result
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finish(key, call))
+        else:
+            self._record_coalesced()
+
+        call.waiters += 1
+        try:
+            # Shielded: cancelling one waiter must not cancel the shared call
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                logger.debug(f"[SingleFlight:{self.name}] Last waiter left, cancelling shared call")
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _finish(self, key: str, call: _Call) -> None:
+        self._forget(key, call)
+        # Mark the exception as retrieved when nobody was left to await it
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _record_coalesced(self) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().record_llm_coalesced(self.name)
+        except Exception:
+            pass
@@ -0,0 +1,297 @@
+"""
+Context-Window Budget
+
+Makes every request fit the model's context window (LiteLLM's ``num_ctx``
+silently truncates anything longer, usually cutting off the system prompt).
+Applied to the OpenAI-format payload right before it is sent:
+
+1. Deduplicate: paragraphs of at least LLM_CONTEXT_DEDUP_MIN_CHARS that
+   already appeared in an earlier message (e.g. project context inlined
+   into both the instructions and the user prompt) are replaced by a short
+   marker.
+2. Compact: if the request is still over budget, the oldest turns are
+   dropped (an assistant tool call stays together with its tool results)
+   and replaced by a short extractive summary. System messages and the
+   latest turn are always kept.
+3. Truncate: as a last resort the longest remaining message is cut in the
+   middle until the request fits.
+
+The budget is the model window minus the response reserve (max_tokens or
+LLM_RESPONSE_TOKEN_RESERVE) minus the tool schemas. Token counts use
+tiktoken when installed and a character heuristic otherwise; counts are
+cached per message.
+"""
+
+import math
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from src.clients.tool_schemas import CompiledTools
+from src.config.settings import settings
+from src.utils import get_logger, serialization
+
+logger = get_logger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency
+    tiktoken = None
+
+# Per-message framing overhead (role, separators) in chat templates
+MESSAGE_OVERHEAD_TOKENS = 4
+DUPLICATE_MARKER = "[Duplicate context omitted - see earlier message]"
+
+_PARAGRAPH_SPLIT = re.compile(r"(\n[ \t]*\n)")
+
+
+class TokenCounter:
+    """Estimates tokens per message, memoizing results by message content."""
+
+    def __init__(self, chars_per_token: float = 3.5, max_cached: int = 8192):
+        """
+        Args:
+            chars_per_token: Heuristic ratio used when tiktoken is unavailable
+            max_cached: Messages whose counts are remembered (LRU)
+        """
+        self.chars_per_token = chars_per_token
+        self.max_cached = max_cached
+        self._encoding = tiktoken.get_encoding("cl100k_base") if tiktoken is not None else None
+        self._cache: "OrderedDict[Any, int]" = OrderedDict()
+
+    def count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        content = message.get("content")
+        if isinstance(content, str) and len(message) <= 2:
+            key = (message.get("role"), content)
+        else:
+            key = serialization.dumps(message)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        tokens = MESSAGE_OVERHEAD_TOKENS + self.count_text(content if isinstance(content, str) else "")
+        for call in message.get("tool_calls") or []:
+            function = call.get("function") or {}
+            tokens += self.count_text(function.get("name") or "") + self.count_text(function.get("arguments") or "")
+
+        self._cache[key] = tokens
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return tokens
+
+    def count_messages(self, messages: List[Dict[str, Any]]) -> int:
+        return sum(self.count_message(m) for m in messages)
+
+
+class ContextBudget:
+    """Fits OpenAI-format payloads into the model's context window."""
+
+    def __init__(self, counter: Optional[TokenCounter] = None):
+        self.counter = counter or TokenCounter()
+
+    def budget_for(self, payload: Dict[str, Any]) -> int:
+        """Prompt tokens available for messages in ``payload``."""
+        window = settings.LLM_CONTEXT_WINDOWS.get(payload.get("model"), settings.LLM_CONTEXT_WINDOW)
+        reserve = payload.get("max_tokens") or settings.LLM_RESPONSE_TOKEN_RESERVE
+        tools = payload.get("tools")
+        if isinstance(tools, CompiledTools):
+            tool_tokens = self.counter.count_text(tools.json_bytes.decode("utf-8"))
+        elif tools:
+            tool_tokens = self.counter.count_text(serialization.dumps_str(tools))
+        else:
+            tool_tokens = 0
+        return max(window - reserve - tool_tokens, 0)
+
+    def fit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Return ``payload`` with its messages deduplicated and compacted to fit.
+
+        The input payload and its message dicts are not modified.
+
+        Args:
+            payload: OpenAI-format request payload
+
+        Returns:
+            The payload (a shallow copy if messages changed)
+        """
+        messages = payload.get("messages") or []
+        if not messages:
+            return payload
+        budget = self.budget_for(payload)
+
+        fitted = self._deduplicate(messages)
+        if self.counter.count_messages(fitted) > budget:
+            fitted = self._compact(fitted, budget)
+        if self.counter.count_messages(fitted) > budget:
+            fitted = self._truncate(fitted, budget)
+
+        self._record(self.counter.count_messages(fitted))
+        if fitted is messages:
+            return payload
+        return {**payload, "messages": fitted}
+
+    def _deduplicate(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Replace long paragraphs already sent in an earlier message."""
+        min_chars = settings.LLM_CONTEXT_DEDUP_MIN_CHARS
+        seen = set()
+        result = []
+        changed = False
+        for message in messages:
+            content = message.get("content")
+            if not isinstance(content, str) or len(content) < min_chars:
+                result.append(message)
+                continue
+
+            new_parts = []
+            removed = False  # previous block was a duplicate (collapse runs into one marker)
+            modified = False
+            for part in _PARAGRAPH_SPLIT.split(content):
+                block = part.strip()
+                if len(block) >= min_chars:
+                    if block in seen:
+                        if not removed:
+                            new_parts.append(DUPLICATE_MARKER)
+                            removed = True
+                        modified = True
+                        continue
+                    seen.add(block)
+                removed = removed and not block
+                new_parts.append(part)
+
+            if modified:
+                changed = True
+                result.append({**message, "content": "".join(new_parts)})
+                self._record_action("dedup")
+            else:
+                result.append(message)
+        return result if changed else messages
+
+    def _compact(self, messages: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+        """Drop the oldest turns (keeping the leading system messages and the latest turn)."""
+        split = next((i for i, m in enumerate(messages) if m.get("role") != "system"), len(messages))
+        head = messages[:split]
+        units = self._group_turns(messages[split:])
+        if not units:
+            return messages
+        last = units.pop()
+
+        fixed = self.counter.count_messages(head) + self.counter.count_messages(last)
+        summary_budget = settings.LLM_CONTEXT_SUMMARY_TOKENS
+        kept: List[List[Dict[str, Any]]] = []
+        used = fixed + summary_budget
+        for unit in reversed(units):
+            cost = self.counter.count_messages(unit)
+            if used + cost > budget:
+                break
+            kept.insert(0, unit)
+            used += cost
+
+        dropped = units[:len(units) - len(kept)]
+        if not dropped:
+            return messages
+        self._record_action("compact")
+        logger.info(f"[ContextBudget] Dropped {sum(len(u) for u in dropped)} older messages to fit {budget} tokens")
+        summary = self._summarize(dropped, summary_budget)
+        return head + [summary] + [m for unit in kept for m in unit] + last
+
+    @staticmethod
+    def _group_turns(messages: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Group messages so tool results stay attached to the call that produced them.
+        
+        A system message inside the conversation is grouped with the message
+        that follows it, so the note is kept (or dropped) with its turn and
+        stays in place.
+        """
+        units: List[List[Dict[str, Any]]] = []
+        notes: List[Dict[str, Any]] = []
+        for message in messages:
+            role = message.get("role")
+            if role == "system":
+                notes.append(message)
+            elif role == "tool" and units and not notes:
+                units[-1].append(message)
+            else:
+                units.append(notes + [message])
+                notes = []
+        if notes:
+            units.append(notes)
+        return units
+
+    def _summarize(self, units: List[List[Dict[str, Any]]], max_tokens: int) -> Dict[str, Any]:
+        """Extractive summary of dropped turns: the first line of each user/assistant text."""
+        count = sum(len(unit) for unit in units)
+        header = (
+            f"[{count} earlier messages were compacted to fit the context window]\n"
+            "Summary of earlier conversation:"
+        )
+        lines = [header]
+        # Leave room for the framing overhead and a trailing "- ..."
+        used = MESSAGE_OVERHEAD_TOKENS + self.counter.count_text(header) + 4
+        for unit in units:
+            message = unit[0]
+            content = message.get("content")
+            if not isinstance(content, str) or not content.strip():
+                continue
+            line = f"- {message.get('role')}: {content.strip().splitlines()[0][:100]}"
+            cost = self.counter.count_text(line) + 1
+            if used + cost > max_tokens:
+                lines.append("- ...")
+                break
+            lines.append(line)
+            used += cost
+        return {"role": "system", "content": "\n".join(lines)}
+
+    def _truncate(self, messages: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+        """Cut the longest text messages in the middle until the request fits."""
+        result = list(messages)
+        self._record_action("truncate")
+        for _ in range(4 * len(result)):
+            excess = self.counter.count_messages(result) - budget
+            if excess <= 0:
+                return result
+            candidates = [
+                (self.counter.count_message(m), i) for i, m in enumerate(result)
+                if isinstance(m.get("content"), str) and m["content"]
+            ]
+            if not candidates:
+                return result
+            tokens, index = max(candidates)
+            content = result[index]["content"]
+            # Overshoot a little so the truncation marker cannot stall progress
+            keep_chars = max(int(len(content) * (1 - (excess + 32) / max(tokens, 1))), 0)
+            result[index] = {**result[index], "content": self._cut_middle(content, keep_chars)}
+            if keep_chars == 0:
+                return result
+        return result
+
+    @staticmethod
+    def _cut_middle(text: str, keep_chars: int) -> str:
+        removed = len(text) - keep_chars
+        if removed <= 0:
+            return text
+        half = keep_chars // 2
+        tail = text[len(text) - (keep_chars - half):] if keep_chars > half else ""
+        return f"{text[:half]}\n[... {removed} characters truncated ...]\n{tail}"
+
+    @staticmethod
+    def _record(prompt_tokens: int) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().observe_llm_prompt_tokens(prompt_tokens)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _record_action(action: str) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().record_llm_context_compaction(action)
+        except Exception:
+            pass
@@ -0,0 +1,117 @@
+"""
+Compiled Tool Schemas
+
+Converting tools to the OpenAI function-calling format means wrapping plain
+callables with ai_function and generating a JSON schema from each tool's
+Pydantic input model. Agents send the same tool list on every turn (the
+Project Lead carries ALL_TOOLS), so the chat clients compile each tool list
+once and reuse both the spec dicts and their serialized JSON bytes.
+
+Entries are keyed by tool identity plus a cheap fingerprint (name,
+description, input model), so a tool that is redefined is recompiled
+automatically. Per-tool entries only hold weak references (they disappear
+with their tool) and the per-list cache is bounded, so dynamically created
+tools do not accumulate. Registering or removing tools through
+``src.tools.register_tool``/``unregister_tool`` invalidates the cache.
+"""
+
+import hashlib
+import weakref
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from agent_framework import AIFunction
+
+from src.utils import get_logger, serialization
+
+logger = get_logger(__name__)
+
+
+class CompiledTools(list):
+    """OpenAI-format tool specs with their JSON encoding and digest precomputed."""
+
+    def __init__(self, specs: List[Dict[str, Any]]):
+        super().__init__(specs)
+        self.json_bytes = serialization.dumps(specs, sort_keys=True)
+        self.digest = hashlib.sha256(self.json_bytes).hexdigest()
+
+
+class ToolSchemaCache:
+    """Memoizes tool conversion per tool and per tool list."""
+
+    def __init__(self, max_lists: int = 256):
+        """
+        Args:
+            max_lists: Distinct tool lists kept before the list cache is reset
+        """
+        self.max_lists = max_lists
+        # id(tool) -> (weakref to tool, fingerprint, spec); entries are removed when the tool dies
+        self._specs: Dict[int, Tuple[weakref.ref, Hashable, Optional[Dict[str, Any]]]] = {}
+        # (id, fingerprint) per tool -> (tools, compiled); the tools keep the ids valid
+        self._lists: Dict[Tuple[Tuple[int, Hashable], ...], Tuple[Tuple[Any, ...], CompiledTools]] = {}
+
+    def compile(self, tools: Any) -> Optional[CompiledTools]:
+        """Return the OpenAI-format spec list for ``tools``.
+
+        Args:
+            tools: AIFunction objects and/or plain callables (a single tool or a sequence)
+
+        Returns:
+            CompiledTools (shared between calls, do not mutate), or None if
+            no tool could be converted
+        """
+        if not tools:
+            return None
+        if not isinstance(tools, (list, tuple)):
+            tools = [tools]
+
+        list_key = tuple((id(tool), self._fingerprint(tool)) for tool in tools)
+        cached = self._lists.get(list_key)
+        if cached is not None and all(a is b for a, b in zip(cached[0], tools)):
+            return cached[1]
+
+        specs = [spec for spec in (self._spec(tool, fp) for tool, (_, fp) in zip(tools, list_key)) if spec]
+        if not specs:
+            return None
+        compiled = CompiledTools(specs)
+        if len(self._lists) >= self.max_lists:
+            self._lists.clear()
+        self._lists[list_key] = (tuple(tools), compiled)
+        return compiled
+
+    def invalidate(self) -> None:
+        """Drop every compiled schema (called when the tool registry changes)."""
+        self._specs.clear()
+        self._lists.clear()
+
+    @staticmethod
+    def _fingerprint(tool: Any) -> Hashable:
+        if isinstance(tool, AIFunction):
+            return (tool.name, tool.description, id(tool.input_model))
+        return getattr(tool, "__qualname__", type(tool).__name__)
+
+    def _spec(self, tool: Any, fingerprint: Hashable) -> Optional[Dict[str, Any]]:
+        cached = self._specs.get(id(tool))
+        if cached is not None and cached[0]() is tool and cached[1] == fingerprint:
+            return cached[2]
+
+        spec = None
+        function = tool
+        if callable(tool) and not isinstance(tool, AIFunction):
+            from agent_framework import ai_function
+            function = ai_function(tool)
+        if isinstance(function, AIFunction):
+            spec = function.to_json_schema_spec()
+        else:
+            logger.debug(f"[ToolSchemas] Skipping unsupported tool {tool!r}")
+
+        key = id(tool)
+        try:
+            ref = weakref.ref(tool, lambda _, key=key: self._specs.pop(key, None))
+        except TypeError:
+            return spec  # Not weak-referenceable; only the list cache applies
+        self._specs[key] = (ref, fingerprint, spec)
+        return spec
+
+
+# Global instance shared by the chat clients
+tool_schema_cache = ToolSchemaCache()
@@ -8,6 +8,8 @@ from rich.status import Status
 from src.clients.litellm_client import LiteLLMChatClient
 from src.persistence.audit_log import AuditLogProvider
 from src.persistence.message_store import MessageStoreProvider
+from src.persistence.db_pool import db_pool
+from src.persistence.checkpoint_storage import get_checkpoint_storage
 from src.config.settings import settings
 from src.services.agent_factory import AgentFactory
 
@@ -82,6 +84,11 @@ async def main():
         console.print(f"[bold red]System Error:[/bold red] {e}")
         sys.exit(1)
 
+    # Open the shared database pool (providers fall back to direct connections if it fails)
+    await db_pool.open()
+    # Apply checkpoint retention periodically while the studio runs
+    get_checkpoint_storage().start_background_pruning()
+
     audit_log = AuditLogProvider()
     message_store = MessageStoreProvider()
     message_store.session_id = session_id
@@ -92,7 +99,7 @@ async def main():
 
     # Initialize the Agent Hierarchy
     console.print("[System] Initializing Agent Hierarchy...")
-    hierarchy = AgentFactory.create_hierarchy(message_store=message_store)
+    hierarchy = await AgentFactory.create_hierarchy_async(message_store=message_store)
     
     liaison = hierarchy["liaison"]
     project_lead = hierarchy["project_lead"]
@@ -104,10 +111,16 @@ async def main():
     console.print(f"[System] Active Agents: Liaison, ProjectLead, DomainLeads (Dev/QA/Docs), Executors, Governance, Context, ArtifactManager")
     
     # Run both API server and interactive mode concurrently
-    await asyncio.gather(
-        run_api_server(hierarchy),
-        run_interactive_mode(liaison, audit_log, session_id)
-    )
+    try:
+        await asyncio.gather(
+            run_api_server(hierarchy),
+            run_interactive_mode(liaison, audit_log, session_id)
+        )
+    finally:
+        await get_checkpoint_storage().stop_background_pruning()
+        await AgentFactory.shutdown(hierarchy)
+        await audit_log.aclose()
+        await db_pool.close()
 
 if __name__ == "__main__":
     try: asyncio.run(main())
@@ -0,0 +1,120 @@
+"""
+Event Stream Middleware
+
+Per-request channel for pushing progress events (token deltas, tool calls,
+OLB/TLB task progress) from deep inside the agent hierarchy to a streaming
+API client.
+
+The active stream is bound to a ContextVar, so any coroutine running in the
+request's context (including tasks spawned from it) can call emit_event()
+without the stream being threaded through every call signature. When no
+stream is bound, emit_event() is a no-op.
+
+Backpressure: the stream is a bounded queue and emit() awaits when it is full,
+so a slow client slows the producer down instead of growing memory. close()
+never waits, so a cancelled producer always finishes.
+"""
+
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from agent_framework import FunctionCallContent, FunctionResultContent, TextContent
+
+_active_stream: contextvars.ContextVar[Optional["EventStream"]] = contextvars.ContextVar(
+    "active_event_stream", default=None
+)
+
+_CLOSED = object()
+
+
+class EventStream:
+    """Bounded async channel of event dictionaries for a single client request."""
+
+    def __init__(self, maxsize: int = 256):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._closed = False
+
+    async def emit(self, event_type: str, **data: Any) -> None:
+        """Publish an event, waiting while the consumer is behind."""
+        if self._closed:
+            return
+        await self._queue.put({"type": event_type, **data})
+
+    async def close(self) -> None:
+        """Signal the consumer that no more events will follow.
+
+        Never waits: close() runs in the producer's ``finally`` (also when it
+        is cancelled because the client went away), so if the queue is full
+        the oldest pending event is dropped to make room for the sentinel.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        while True:
+            try:
+                self._queue.put_nowait(_CLOSED)
+                return
+            except asyncio.QueueFull:
+                self._queue.get_nowait()
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the next event, or None once the stream is closed.
+
+        Raises:
+            asyncio.TimeoutError: If no event arrives within ``timeout`` seconds.
+        """
+        item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        return None if item is _CLOSED else item
+
+    def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            event = await self.next()
+            if event is None:
+                return
+            yield event
+
+
+@contextmanager
+def bind_event_stream(stream: EventStream):
+    """Bind ``stream`` as the destination for emit_event() in this context."""
+    token = _active_stream.set(stream)
+    try:
+        yield stream
+    finally:
+        _active_stream.reset(token)
+
+
+async def emit_event(event_type: str, **data: Any) -> None:
+    """Emit a progress event to the stream bound to the current context, if any."""
+    stream = _active_stream.get()
+    if stream is not None:
+        await stream.emit(event_type, **data)
+
+
+def update_to_events(update: Any, agent: str) -> List[Dict[str, Any]]:
+    """Translate a ChatResponseUpdate/AgentRunResponseUpdate into event dicts."""
+    events = []
+    for content in getattr(update, "contents", None) or []:
+        if isinstance(content, TextContent) and content.text:
+            events.append({"type": "token", "agent": agent, "text": content.text})
+        elif isinstance(content, FunctionCallContent):
+            events.append({
+                "type": "tool_call",
+                "agent": agent,
+                "call_id": content.call_id,
+                "name": content.name,
+                "arguments": content.arguments
+            })
+        elif isinstance(content, FunctionResultContent):
+            events.append({
+                "type": "tool_result",
+                "agent": agent,
+                "call_id": content.call_id,
+                "result": str(content.result)[:2000]
+            })
+    return events
@@ -1,44 +1,75 @@
-import asyncpg
-from datetime import datetime
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
 from src.config.settings import settings
-from typing import Optional
-from src.utils import get_logger
+from src.persistence.db_pool import DatabasePool, db_pool
+from src.persistence.migration_runner import ensure_schema
+from typing import List, Optional, Tuple
+from src.utils import get_logger, serialization
 
 logger = get_logger(__name__)
 
+# (timestamp, agent_name, session_id, operation, details)
+AuditRecord = Tuple[datetime, str, Optional[str], str, str]
+
+AUDIT_COLUMNS = ["timestamp", "agent_name", "session_id", "operation", "details"]
+OVERFLOW_POLICIES = ("block", "drop_oldest", "spill")
+
+
 class AuditLogProvider:
     """
     Persistence Provider for the Agent Audit Log.
     Uses asyncpg for high-performance, asynchronous PostgreSQL access.
+
+    By default writes are buffered: log() only enqueues the event and a
+    background task flushes batches with COPY when the batch size or flush
+    interval is reached. When the bounded queue is full the overflow policy
+    decides what happens:
+
+    - "block": the caller waits for space (no loss, caller pays latency)
+    - "drop_oldest": the oldest queued event is discarded
+    - "spill": the event is appended to a local JSONL file, replayed into
+      the database after the next successful flush
+
+    Call flush() to force a write and aclose() on shutdown to drain the queue.
     """
 
-    def __init__(self, db_url: str = settings.DATABASE_URL):
+    def __init__(
+        self,
+        db_url: str = settings.DATABASE_URL,
+        pool: Optional[DatabasePool] = None,
+        buffered: Optional[bool] = None,
+        max_queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        overflow_policy: Optional[str] = None,
+        spill_path: Optional[str] = None
+    ):
         self.db_url = db_url
+        self.pool = pool or db_pool
+        self.buffered = settings.AUDIT_LOG_BUFFERED if buffered is None else buffered
+        self.batch_size = batch_size or settings.AUDIT_LOG_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.AUDIT_LOG_FLUSH_INTERVAL
+        self.overflow_policy = overflow_policy or settings.AUDIT_LOG_OVERFLOW_POLICY
+        self.spill_path = spill_path or settings.AUDIT_LOG_SPILL_PATH
+        self._spill_lock = threading.Lock()  # Spill file work runs on worker threads
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy: {self.overflow_policy}")
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size or settings.AUDIT_LOG_QUEUE_SIZE)
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._closed = False
 
     async def _init_db(self):
-        """Initializes the audit_log table if it does not exist."""
-        conn = None
+        """Ensure the schema is migrated (runs the migrations once per process)."""
         try:
-            conn = await asyncpg.connect(self.db_url)
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS audit_log (
-                    id SERIAL PRIMARY KEY,
-                    timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                    agent_name VARCHAR(255) NOT NULL,
-                    session_id VARCHAR(255),
-                    operation VARCHAR(255) NOT NULL,
-                    details TEXT
-                );
-                """
-            )
-            logger.info("[AuditLog] Audit log table initialized successfully.")
+            await ensure_schema(self.db_url, self.pool)
         except Exception as e:
             logger.info(f"[AuditLog] Error initializing database: {e}")
             raise
-        finally:
-            if conn:
-                await conn.close()
 
     async def log(
         self,
@@ -47,39 +78,18 @@ class AuditLogProvider:
         details: str,
         session_id: Optional[str] = None
     ) -> None:
-        """Logs an event to the audit_log table."""
-        conn = None
+        """Logs an event to the audit_log table (buffered unless disabled)."""
+        record = (datetime.now(timezone.utc), agent_name, session_id, operation, details)
         try:
-            # Lazy initialize the table on first log attempt if it hasn't been done
-            await self._init_db()
-            
-            conn = await asyncpg.connect(self.db_url)
-            await conn.execute(
-                """
-                INSERT INTO audit_log 
-                    (agent_name, session_id, operation, details)
-                VALUES 
-                    ($1, $2, $3, $4);
-                """,
-                agent_name,
-                session_id,
-                operation,
-                details,
-            )
+            if self.buffered and not self._closed:
+                await self._enqueue(record)
+            else:
+                await self._write_batch([record])
         except Exception as e:
             # Crucial: Audit logging should not crash the main application
             logger.info(f"[AuditLog] WARNING: Failed to log event for {agent_name} ({operation}). Error: {e}")
-            
-            # Record error metric
-            try:
-                from src.services.metrics_service import MetricsService
-                MetricsService().record_error(agent_name, "audit_log_failure")
-            except:
-                pass
+            self._record_error(agent_name)
         finally:
-            if conn:
-                await conn.close()
-                
             # Record action metric (success or fail, we tried)
             try:
                 from src.services.metrics_service import MetricsService
@@ -87,6 +97,211 @@ class AuditLogProvider:
             except:
                 pass
 
+    async def flush(self) -> None:
+        """Write everything currently queued."""
+        while not self._queue.empty():
+            await self._flush_batch(self._drain(self.batch_size))
+
+    async def aclose(self) -> None:
+        """Stop the background flusher and drain the queue."""
+        self._closed = True
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def _enqueue(self, record: AuditRecord) -> None:
+        self._ensure_flusher()
+        if self._queue.full():
+            if self.overflow_policy == "drop_oldest":
+                self._queue.get_nowait()
+                self._record_overflow("dropped")
+            elif self.overflow_policy == "spill":
+                await self._spill([record])
+                return
+        # "block" waits here until the flusher frees space
+        await self._queue.put(record)
+        self._record_queue_depth()
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Flush whenever batch_size events are queued or flush_interval elapses."""
+        loop = asyncio.get_running_loop()
+        batch: List[AuditRecord] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    if not self._queue.empty():
+                        batch.extend(self._drain(self.batch_size - len(batch)))
+                        continue
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                to_flush, batch = batch, []
+                # Shielded so shutdown never loses a batch that is mid-write
+                await asyncio.shield(self._flush_batch(to_flush))
+        except asyncio.CancelledError:
+            if batch:
+                await self._flush_batch(batch)
+            raise
+
+    def _drain(self, limit: int) -> List[AuditRecord]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush_batch(self, batch: List[AuditRecord]) -> None:
+        """Write a batch; failed batches are spilled (spill policy) or dropped."""
+        if not batch:
+            return
+        async with self._flush_lock:
+            started = time.perf_counter()
+            try:
+                await self._write_batch(batch)
+            except Exception as e:
+                logger.info(f"[AuditLog] WARNING: Failed to flush {len(batch)} events. Error: {e}")
+                self._record_error("AuditLog")
+                if self.overflow_policy == "spill":
+                    await self._spill(batch)
+                else:
+                    self._record_overflow("flush_failure", len(batch))
+                return
+            finally:
+                self._record_queue_depth()
+            self._record_flush(time.perf_counter() - started, len(batch))
+            await self._replay_spill()
+
+    async def _write_batch(self, batch: List[AuditRecord]) -> None:
+        await self._init_db()
+        async with self.pool.acquire(self.db_url) as conn:
+            await conn.copy_records_to_table("audit_log", records=batch, columns=AUDIT_COLUMNS)
+
+    async def _spill(self, batch: List[AuditRecord], record_overflow: bool = True) -> None:
+        """Append records to the local spill file (JSON lines) off the event loop."""
+        await asyncio.to_thread(self._append_spill, batch)
+        if record_overflow:
+            self._record_overflow("spilled", len(batch))
+
+    def _append_spill(self, batch: List[AuditRecord]) -> None:
+        lines = "".join(
+            serialization.dumps_str({
+                "timestamp": ts.isoformat(),
+                "agent_name": agent_name,
+                "session_id": session_id,
+                "operation": operation,
+                "details": details
+            }) + "\n"
+            for ts, agent_name, session_id, operation, details in batch
+        )
+        with self._spill_lock:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+    def _take_spill(self, replay_path: str) -> Optional[Tuple[List[AuditRecord], int]]:
+        """Move the spill file aside and parse it.
+
+        Returns:
+            (records, number of unreadable lines skipped), or None if there is
+            nothing to replay
+        """
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return None
+            os.replace(self.spill_path, replay_path)
+        records = []
+        skipped = 0
+        with open(replay_path, encoding="utf-8") as f:
+            for line in filter(str.strip, f):
+                try:
+                    e = serialization.loads(line)
+                    records.append((
+                        datetime.fromisoformat(e["timestamp"]),
+                        e["agent_name"],
+                        e["session_id"],
+                        e["operation"],
+                        e["details"]
+                    ))
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1
+        return records, skipped
+
+    async def _replay_spill(self) -> None:
+        """Move spilled events into the database once it accepts writes again."""
+        if self.overflow_policy != "spill":
+            return
+        replay_path = f"{self.spill_path}.replay"
+        taken = await asyncio.to_thread(self._take_spill, replay_path)
+        if taken is None:
+            return
+        records, skipped = taken
+        if skipped:
+            logger.warning(f"[AuditLog] Skipped {skipped} unreadable lines in {self.spill_path}")
+        written = 0
+        try:
+            for i in range(0, len(records), self.batch_size):
+                batch = records[i:i + self.batch_size]
+                await self._write_batch(batch)
+                written += len(batch)
+        except Exception as e:
+            logger.info(
+                f"[AuditLog] WARNING: Spill replay failed after {written} events, "
+                f"keeping {len(records) - written} in the spill file. Error: {e}"
+            )
+            await self._spill(records[written:], record_overflow=False)
+            await asyncio.to_thread(os.remove, replay_path)
+            return
+        await asyncio.to_thread(os.remove, replay_path)
+        logger.info(f"[AuditLog] Replayed {written} spilled events into audit_log")
+
+    def _record_queue_depth(self) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().record_audit_queue_depth(self._queue.qsize())
+        except Exception:
+            pass
+
+    def _record_flush(self, seconds: float, count: int) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().observe_audit_flush(seconds, count)
+        except Exception:
+            pass
+
+    def _record_overflow(self, reason: str, count: int = 1) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().record_audit_overflow(reason, count)
+        except Exception:
+            pass
+
+    def _record_error(self, agent_name: str) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().record_error(agent_name, "audit_log_failure")
+        except Exception:
+            pass
+
 
 # Example of how to integrate this into src/main.py for demonstration:
 async def test_audit_log():
@@ -98,8 +313,8 @@ async def test_audit_log():
         details="CoreAgent initialization successful with LiteLLM client.",
         session_id="session-xyz-123"
     )
+    await audit_log.aclose()
     logger.info("--- AuditLog Test Complete ---")
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(test_audit_log())
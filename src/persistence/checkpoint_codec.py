@@ -0,0 +1,141 @@
+"""
+Checkpoint Codec
+
+Binary encoding for workflow checkpoint state stored in
+workflow_checkpoints.state (BYTEA):
+
+    b"MCK1" | codec id (1 byte) | kind (1 byte) | compressed JSON payload
+
+kind is either a full snapshot (keyframe) or a structural delta against the
+previous checkpoint of the same workflow. Blobs without the magic prefix are
+legacy rows holding plain UTF-8 JSON and are decoded as full snapshots.
+
+Compression codecs are pluggable: zlib is always available; zstd and lz4 are
+used when the optional 'zstandard' / 'lz4' packages are installed.
+"""
+
+import zlib
+from typing import Any, Callable, Dict, Tuple
+
+from src.utils import get_logger, serialization
+
+logger = get_logger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # Optional dependency
+    lz4_frame = None
+
+MAGIC = b"MCK1"
+KIND_FULL = 0
+KIND_DELTA = 1
+
+# name -> (header id, compress, decompress)
+_CODECS: Dict[str, Tuple[int, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "none": (0, lambda data: data, lambda data: data),
+    "zlib": (1, lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+if zstandard is not None:
+    _CODECS["zstd"] = (
+        2,
+        lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data)
+    )
+if lz4_frame is not None:
+    _CODECS["lz4"] = (3, lz4_frame.compress, lz4_frame.decompress)
+
+_CODECS_BY_ID = {codec_id: name for name, (codec_id, _, _) in _CODECS.items()}
+
+
+def available_codecs() -> list:
+    """Names of the compression codecs usable in this environment."""
+    return list(_CODECS)
+
+
+def resolve_codec(name: str) -> str:
+    """Return ``name`` if available, otherwise fall back to zlib."""
+    if name in _CODECS:
+        return name
+    logger.warning(f"[CheckpointCodec] Codec '{name}' unavailable, falling back to zlib")
+    return "zlib"
+
+
+def encode(payload: Dict[str, Any], codec: str = "zlib", delta: bool = False) -> bytes:
+    """Serialize and compress a checkpoint dict (or delta) into a state blob."""
+    codec_id, compress, _ = _CODECS[codec]
+    raw = serialization.dumps(payload)
+    header = MAGIC + bytes([codec_id, KIND_DELTA if delta else KIND_FULL])
+    return header + compress(raw)
+
+
+def decode(blob: bytes) -> Tuple[Dict[str, Any], bool]:
+    """Decode a state blob.
+
+    Returns:
+        Tuple of (payload dict, is_delta)
+    """
+    blob = bytes(blob)
+    if not blob.startswith(MAGIC):
+        return serialization.loads(blob), False
+    codec_id, kind = blob[len(MAGIC)], blob[len(MAGIC) + 1]
+    name = _CODECS_BY_ID.get(codec_id)
+    if name is None:
+        raise ValueError(f"Checkpoint uses codec id {codec_id}, which is not installed")
+    _, _, decompress = _CODECS[name]
+    payload = serialization.loads(decompress(blob[len(MAGIC) + 2:]))
+    return payload, kind == KIND_DELTA
+
+
+# --- Structural delta -------------------------------------------------------
+# A delta is a dict with any of:
+#   "set":    {key: new value}          keys added or replaced
+#   "del":    [key, ...]                keys removed
+#   "sub":    {key: nested delta}       dict values changed in place
+#   "append": [item, ...]               (list deltas) items appended to a list
+
+def diff(old: Any, new: Any) -> Any:
+    """Compute a delta turning ``old`` into ``new``, or None if equal."""
+    if old == new:
+        return None
+    if isinstance(old, dict) and isinstance(new, dict):
+        delta: Dict[str, Any] = {}
+        removed = [key for key in old if key not in new]
+        if removed:
+            delta["del"] = removed
+        for key, value in new.items():
+            if key not in old:
+                delta.setdefault("set", {})[key] = value
+                continue
+            child = diff(old[key], value)
+            if child is None:
+                continue
+            if "replace" in child:
+                delta.setdefault("set", {})[key] = child["replace"]
+            else:
+                delta.setdefault("sub", {})[key] = child
+        return delta
+    if isinstance(old, list) and isinstance(new, list) and len(new) > len(old) and new[:len(old)] == old:
+        return {"append": new[len(old):]}
+    return {"replace": new}
+
+
+def apply(base: Any, delta: Any) -> Any:
+    """Apply a delta produced by diff() to ``base``."""
+    if delta is None:
+        return base
+    if "replace" in delta:
+        return delta["replace"]
+    if "append" in delta:
+        return list(base) + delta["append"]
+    result = dict(base)
+    for key in delta.get("del", []):
+        result.pop(key, None)
+    result.update(delta.get("set", {}))
+    for key, child in delta.get("sub", {}).items():
+        result[key] = apply(result.get(key), child)
+    return result
@@ -1,8 +1,11 @@
-import asyncpg
-import json
-from typing import List, Optional
+import asyncio
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from agent_framework import WorkflowCheckpoint
 from src.config.settings import settings
+from src.persistence import checkpoint_codec
+from src.persistence.db_pool import DatabasePool, db_pool
+from src.persistence.migration_runner import ensure_schema
 from src.utils import get_logger
 
 logger = get_logger(__name__)
@@ -11,54 +14,102 @@ class PostgreSQLCheckpointStorage:
     """
     MAF-compliant checkpoint storage using PostgreSQL.
     Implements agent_framework.CheckpointStorage protocol.
+
+    State blobs are compressed (see checkpoint_codec). With delta encoding
+    enabled, each checkpoint stores only its difference from the previous
+    checkpoint of the same workflow, with a full keyframe every
+    ``keyframe_interval`` saves. Retention keeps the newest N checkpoints per
+    workflow and/or those younger than a maximum age; prune() never removes a
+    checkpoint that a retained delta still depends on.
     """
-    def __init__(self, db_url: str = None):
+    def __init__(
+        self,
+        db_url: str = None,
+        pool: Optional[DatabasePool] = None,
+        codec: Optional[str] = None,
+        delta_encoding: Optional[bool] = None,
+        keyframe_interval: Optional[int] = None,
+        retention_count: Optional[int] = None,
+        retention_seconds: Optional[float] = None
+    ):
         self.db_url = db_url or settings.DATABASE_URL
+        self.pool = pool or db_pool
+        self.codec = checkpoint_codec.resolve_codec(codec or settings.CHECKPOINT_CODEC)
+        self.delta_encoding = settings.CHECKPOINT_DELTA_ENCODING if delta_encoding is None else delta_encoding
+        self.keyframe_interval = max(
+            1, settings.CHECKPOINT_KEYFRAME_INTERVAL if keyframe_interval is None else keyframe_interval
+        )
+        self.retention_count = settings.CHECKPOINT_RETENTION_COUNT if retention_count is None else retention_count
+        self.retention_seconds = (
+            settings.CHECKPOINT_RETENTION_SECONDS if retention_seconds is None else retention_seconds
+        )
+
+        # workflow_id -> (checkpoint_id, state dict, deltas since last keyframe)
+        self._last_saved: Dict[str, Tuple[str, Dict[str, Any], int]] = {}
+        self._prune_task: Optional[asyncio.Task] = None
+
+    async def _init_db(self):
+        """Ensure the schema is migrated (runs the migrations once per process)."""
+        await ensure_schema(self.db_url, self.pool)
 
     async def save_checkpoint(self, checkpoint: WorkflowCheckpoint) -> str:
         """Save a checkpoint and return its ID."""
         logger.info(f"[Checkpoint] Saving checkpoint {checkpoint.checkpoint_id} for workflow {checkpoint.workflow_id}")
-        
-        # Serialize to JSON
+        await self._init_db()
+
         data = checkpoint.to_dict()
-        serialized_state = json.dumps(data)
-        
-        conn = await asyncpg.connect(self.db_url)
-        try:
-            await conn.execute(
+        workflow_id = str(checkpoint.workflow_id)
+
+        # Delta against the previous checkpoint of this workflow, keyframe every N
+        previous = self._last_saved.get(workflow_id) if self.delta_encoding else None
+        base_id = None
+        chain_length = 0
+        payload = data
+        if previous is not None and previous[2] + 1 < self.keyframe_interval:
+            base_id = previous[0]
+            chain_length = previous[2] + 1
+            payload = checkpoint_codec.diff(previous[1], data) or {}
+        blob = checkpoint_codec.encode(payload, self.codec, delta=base_id is not None)
+
+        async with self.pool.acquire(self.db_url) as conn:
+            status = await conn.execute(
                 """
-                INSERT INTO workflow_checkpoints (checkpoint_id, workflow_id, state, created_at)
-                VALUES ($1, $2, $3, CURRENT_TIMESTAMP)
+                INSERT INTO workflow_checkpoints
+                    (checkpoint_id, workflow_id, state, created_at,
+                     codec, is_delta, base_checkpoint_id, size_bytes, iteration_count)
+                VALUES ($1, $2, $3, CURRENT_TIMESTAMP, $4, $5, $6, $7, $8)
                 ON CONFLICT (checkpoint_id) DO NOTHING
                 """,
                 str(checkpoint.checkpoint_id),
-                str(checkpoint.workflow_id),
-                serialized_state.encode('utf-8') # Store as bytes if column is BYTEA, or string if JSONB/TEXT
+                workflow_id,
+                blob,
+                self.codec,
+                base_id is not None,
+                base_id,
+                len(blob),
+                checkpoint.iteration_count
             )
-            # Note: My migration used BYTEA for state, so encoding is correct.
-            return checkpoint.checkpoint_id
-        finally:
-            await conn.close()
+
+        if status == "INSERT 0 1":
+            self._last_saved[workflow_id] = (str(checkpoint.checkpoint_id), data, chain_length)
+        else:
+            # The id already existed and nothing was written; the stored row may
+            # not match ``data``, so the next save of this workflow is a keyframe
+            logger.warning(f"[Checkpoint] Checkpoint {checkpoint.checkpoint_id} already exists; not overwritten")
+            self._last_saved.pop(workflow_id, None)
+        return checkpoint.checkpoint_id
 
     async def load_checkpoint(self, checkpoint_id: str) -> Optional[WorkflowCheckpoint]:
         """Load a checkpoint by ID."""
-        conn = await asyncpg.connect(self.db_url)
-        try:
-            row = await conn.fetchrow(
-                "SELECT state FROM workflow_checkpoints WHERE checkpoint_id = $1",
-                str(checkpoint_id)
-            )
-            if row:
-                data = json.loads(row['state'].decode('utf-8'))
-                return WorkflowCheckpoint.from_dict(data)
-            return None
-        finally:
-            await conn.close()
+        await self._init_db()
+        async with self.pool.acquire(self.db_url) as conn:
+            data = await self._load_state(conn, str(checkpoint_id))
+        return WorkflowCheckpoint.from_dict(data) if data is not None else None
 
     async def list_checkpoint_ids(self, workflow_id: str | None = None) -> List[str]:
         """List checkpoint IDs. If workflow_id is provided, filter by that workflow."""
-        conn = await asyncpg.connect(self.db_url)
-        try:
+        await self._init_db()
+        async with self.pool.acquire(self.db_url) as conn:
             if workflow_id:
                 rows = await conn.fetch(
                     "SELECT checkpoint_id FROM workflow_checkpoints WHERE workflow_id = $1 ORDER BY created_at DESC",
@@ -69,39 +120,399 @@ class PostgreSQLCheckpointStorage:
                     "SELECT checkpoint_id FROM workflow_checkpoints ORDER BY created_at DESC"
                 )
             return [str(row['checkpoint_id']) for row in rows]
-        finally:
-            await conn.close()
+
+    async def list_checkpoint_metadata(self, workflow_id: str | None = None) -> List[Dict[str, Any]]:
+        """List checkpoint metadata without reading or decoding state blobs.
+
+        Returns:
+            Newest-first dicts with checkpoint_id, workflow_id, created_at,
+            iteration_count, codec, is_delta, base_checkpoint_id and size_bytes.
+        """
+        await self._init_db()
+        async with self.pool.acquire(self.db_url) as conn:
+            query = """
+                SELECT checkpoint_id, workflow_id, created_at, iteration_count,
+                       codec, is_delta, base_checkpoint_id, size_bytes
+                FROM workflow_checkpoints
+                {where}
+                ORDER BY created_at DESC
+            """
+            if workflow_id:
+                rows = await conn.fetch(query.format(where="WHERE workflow_id = $1"), str(workflow_id))
+            else:
+                rows = await conn.fetch(query.format(where=""))
+        return [self._metadata(row) for row in rows]
 
     async def list_checkpoints(self, workflow_id: str | None = None) -> List[WorkflowCheckpoint]:
         """List checkpoint objects. If workflow_id is provided, filter by that workflow."""
-        conn = await asyncpg.connect(self.db_url)
-        try:
+        await self._init_db()
+        async with self.pool.acquire(self.db_url) as conn:
             if workflow_id:
                 rows = await conn.fetch(
-                    "SELECT state FROM workflow_checkpoints WHERE workflow_id = $1 ORDER BY created_at DESC",
+                    "SELECT checkpoint_id, base_checkpoint_id, state FROM workflow_checkpoints WHERE workflow_id = $1 ORDER BY created_at DESC",
                     str(workflow_id)
                 )
             else:
                 rows = await conn.fetch(
-                    "SELECT state FROM workflow_checkpoints ORDER BY created_at DESC"
+                    "SELECT checkpoint_id, base_checkpoint_id, state FROM workflow_checkpoints ORDER BY created_at DESC"
                 )
-            
+
+            # Decode oldest-first so delta bases are already resolved
+            decoded: Dict[str, Dict[str, Any]] = {}
+            blobs = {str(row['checkpoint_id']): row for row in rows}
             checkpoints = []
-            for row in rows:
-                data = json.loads(row['state'].decode('utf-8'))
-                checkpoints.append(WorkflowCheckpoint.from_dict(data))
+            for row in reversed(rows):
+                data = await self._resolve(conn, str(row['checkpoint_id']), blobs, decoded)
+                if data is not None:
+                    checkpoints.append(WorkflowCheckpoint.from_dict(data))
+            checkpoints.reverse()
             return checkpoints
-        finally:
-            await conn.close()
+
+    async def list_checkpoints_page(
+        self,
+        workflow_id: str | None = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List checkpoint metadata newest-first, one keyset page at a time.
+
+        Args:
+            workflow_id: Optional workflow filter
+            limit: Page size
+            cursor: Opaque cursor from the previous page (None for the first)
+
+        Returns:
+            Tuple of (metadata dicts, cursor for the next page or None)
+        """
+        await self._init_db()
+        conditions = []
+        params: List[Any] = []
+        if workflow_id:
+            params.append(str(workflow_id))
+            conditions.append(f"workflow_id = ${len(params)}")
+        if cursor:
+            created_at, checkpoint_id = self._decode_cursor(cursor)
+            params.extend([created_at, checkpoint_id])
+            conditions.append(f"(created_at, checkpoint_id) < (${len(params) - 1}, ${len(params)}::uuid)")
+        params.append(limit)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        async with self.pool.acquire(self.db_url) as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT checkpoint_id, workflow_id, created_at, iteration_count,
+                       codec, is_delta, base_checkpoint_id, size_bytes
+                FROM workflow_checkpoints
+                {where}
+                ORDER BY created_at DESC, checkpoint_id DESC
+                LIMIT ${len(params)}
+                """,
+                *params
+            )
+        items = [self._metadata(row) for row in rows]
+        next_cursor = None
+        if len(items) == limit:
+            next_cursor = self._encode_cursor(rows[-1]['created_at'], str(rows[-1]['checkpoint_id']))
+        return items, next_cursor
+
+    async def iter_checkpoints(
+        self,
+        workflow_id: str | None = None,
+        newest_first: bool = True,
+        prefetch: int = 20
+    ) -> AsyncIterator[WorkflowCheckpoint]:
+        """Stream checkpoints from a server-side cursor.
+
+        Only ``prefetch`` rows are held in memory at a time; delta bases are
+        decoded on demand and cached for at most one keyframe interval.
+        """
+        await self._init_db()
+        order = "DESC" if newest_first else "ASC"
+        where = "WHERE workflow_id = $1" if workflow_id else ""
+        args = [str(workflow_id)] if workflow_id else []
+        decoded: Dict[str, Dict[str, Any]] = {}
+
+        async with self.pool.acquire(self.db_url) as conn:
+            async with conn.transaction():
+                async for row in conn.cursor(
+                    f"""
+                    SELECT checkpoint_id, base_checkpoint_id, state
+                    FROM workflow_checkpoints
+                    {where}
+                    ORDER BY created_at {order}, checkpoint_id {order}
+                    """,
+                    *args,
+                    prefetch=prefetch
+                ):
+                    if len(decoded) > 2 * self.keyframe_interval:
+                        decoded.clear()
+                    checkpoint_id = str(row['checkpoint_id'])
+                    data = await self._resolve(conn, checkpoint_id, {checkpoint_id: row}, decoded)
+                    if data is not None:
+                        yield WorkflowCheckpoint.from_dict(data)
+
+    async def get_latest_checkpoint(self, workflow_id: str) -> Optional[WorkflowCheckpoint]:
+        """Load the newest checkpoint of a workflow (index-only lookup + one chain read)."""
+        await self._init_db()
+        async with self.pool.acquire(self.db_url) as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT checkpoint_id FROM workflow_checkpoints
+                WHERE workflow_id = $1
+                ORDER BY created_at DESC, checkpoint_id DESC
+                LIMIT 1
+                """,
+                str(workflow_id)
+            )
+            if row is None:
+                return None
+            data = await self._load_state(conn, str(row['checkpoint_id']))
+        return WorkflowCheckpoint.from_dict(data) if data is not None else None
+
+    async def list_latest_per_workflow(self) -> List[Dict[str, Any]]:
+        """Metadata of the newest checkpoint of every workflow."""
+        await self._init_db()
+        async with self.pool.acquire(self.db_url) as conn:
+            rows = await conn.fetch(
+                """
+                SELECT DISTINCT ON (workflow_id)
+                       checkpoint_id, workflow_id, created_at, iteration_count,
+                       codec, is_delta, base_checkpoint_id, size_bytes
+                FROM workflow_checkpoints
+                ORDER BY workflow_id, created_at DESC, checkpoint_id DESC
+                """
+            )
+        return [self._metadata(row) for row in rows]
 
     async def delete_checkpoint(self, checkpoint_id: str) -> bool:
-        """Delete a checkpoint by ID."""
-        conn = await asyncpg.connect(self.db_url)
-        try:
-            result = await conn.execute(
-                "DELETE FROM workflow_checkpoints WHERE checkpoint_id = $1",
-                str(checkpoint_id)
+        """Delete a checkpoint by ID.
+
+        Deltas based on it are rewritten as full snapshots first, so they
+        remain loadable.
+        """
+        await self._init_db()
+        checkpoint_id = str(checkpoint_id)
+        async with self.pool.acquire(self.db_url) as conn:
+            async with conn.transaction():
+                await self._rebase_dependents(conn, checkpoint_id)
+                result = await conn.execute(
+                    "DELETE FROM workflow_checkpoints WHERE checkpoint_id = $1",
+                    checkpoint_id
+                )
+        self._forget(checkpoint_id)
+        return "DELETE 1" in result
+
+    async def prune(self, workflow_id: str | None = None) -> int:
+        """Apply the retention policy.
+
+        A checkpoint is kept if it is among the newest ``retention_count`` of
+        its workflow and younger than ``retention_seconds`` (when set). The
+        newest checkpoint of each workflow and every base a kept delta needs
+        are always kept.
+
+        Returns:
+            Number of checkpoints deleted
+        """
+        if self.retention_count is None and self.retention_seconds is None:
+            return 0
+        await self._init_db()
+        params: List[Any] = []
+        where = ""
+        if workflow_id:
+            params.append(str(workflow_id))
+            where = "WHERE workflow_id = $1"
+        within_age = "TRUE"
+        if self.retention_seconds is not None:
+            # Compared in SQL: created_at and LOCALTIMESTAMP share the session time zone
+            params.append(float(self.retention_seconds))
+            within_age = f"created_at >= LOCALTIMESTAMP - make_interval(secs => ${len(params)})"
+
+        async with self.pool.acquire(self.db_url) as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT checkpoint_id, workflow_id, base_checkpoint_id,
+                       {within_age} AS within_age
+                FROM workflow_checkpoints
+                {where}
+                ORDER BY workflow_id, created_at DESC
+                """,
+                *params
+            )
+
+            base_of = {str(r['checkpoint_id']): r['base_checkpoint_id'] for r in rows}
+            keep = set()
+            rank: Dict[str, int] = {}
+            for row in rows:
+                cp_id = str(row['checkpoint_id'])
+                position = rank.get(row['workflow_id'], 0)
+                rank[row['workflow_id']] = position + 1
+                within_count = self.retention_count is None or position < self.retention_count
+                if position == 0 or (within_count and row['within_age']):
+                    keep.add(cp_id)
+
+            # Keep the base chain of every retained delta
+            for cp_id in list(keep):
+                base = base_of.get(cp_id)
+                while base is not None and str(base) not in keep:
+                    keep.add(str(base))
+                    base = base_of.get(str(base))
+
+            doomed = [cp_id for cp_id in base_of if cp_id not in keep]
+            if doomed:
+                await conn.execute(
+                    "DELETE FROM workflow_checkpoints WHERE checkpoint_id = ANY($1::uuid[])",
+                    doomed
+                )
+        for cp_id in doomed:
+            self._forget(cp_id)
+        if doomed:
+            logger.info(f"[Checkpoint] Pruned {len(doomed)} checkpoints")
+        return len(doomed)
+
+    def start_background_pruning(self, interval: Optional[float] = None) -> None:
+        """Run prune() periodically on the current event loop (no-op without a retention policy)."""
+        if self.retention_count is None and self.retention_seconds is None:
+            return
+        if self._prune_task is None or self._prune_task.done():
+            self._prune_task = asyncio.create_task(
+                self._prune_loop(interval or settings.CHECKPOINT_PRUNE_INTERVAL_SECONDS)
             )
-            return "DELETE 1" in result
-        finally:
-            await conn.close()
+
+    async def stop_background_pruning(self) -> None:
+        """Cancel the background pruning task."""
+        if self._prune_task is not None:
+            self._prune_task.cancel()
+            try:
+                await self._prune_task
+            except asyncio.CancelledError:
+                pass
+            self._prune_task = None
+
+    async def _prune_loop(self, interval: float) -> None:
+        while True:
+            try:
+                await self.prune()
+            except Exception as e:
+                logger.warning(f"[Checkpoint] Background prune failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def _load_state(self, conn, checkpoint_id: str) -> Optional[Dict[str, Any]]:
+        """Load a checkpoint's full state, following its delta chain in one query."""
+        rows = await conn.fetch(
+            """
+            WITH RECURSIVE chain AS (
+                SELECT checkpoint_id, base_checkpoint_id, state, 0 AS depth
+                FROM workflow_checkpoints WHERE checkpoint_id = $1
+                UNION ALL
+                SELECT w.checkpoint_id, w.base_checkpoint_id, w.state, c.depth + 1
+                FROM workflow_checkpoints w
+                JOIN chain c ON w.checkpoint_id = c.base_checkpoint_id
+            )
+            SELECT checkpoint_id, base_checkpoint_id, state FROM chain ORDER BY depth DESC
+            """,
+            checkpoint_id
+        )
+        if not rows:
+            return None
+
+        state = None
+        for index, row in enumerate(rows):
+            payload, is_delta = checkpoint_codec.decode(row['state'])
+            if not is_delta:
+                state = payload
+            elif index == 0:
+                logger.error(f"[Checkpoint] Base of checkpoint {checkpoint_id} is missing")
+                return None
+            else:
+                state = checkpoint_codec.apply(state, payload)
+        return state
+
+    async def _resolve(
+        self,
+        conn,
+        checkpoint_id: str,
+        rows: Dict[str, Any],
+        decoded: Dict[str, Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Decode a listed row, reusing already-decoded bases."""
+        if checkpoint_id in decoded:
+            return decoded[checkpoint_id]
+        row = rows.get(checkpoint_id)
+        if row is None:
+            # Base outside the listed set: load its chain directly
+            state = await self._load_state(conn, checkpoint_id)
+        else:
+            payload, is_delta = checkpoint_codec.decode(row['state'])
+            if not is_delta:
+                state = payload
+            else:
+                base = await self._resolve(conn, str(row['base_checkpoint_id']), rows, decoded)
+                state = checkpoint_codec.apply(base, payload) if base is not None else None
+        if state is not None:
+            decoded[checkpoint_id] = state
+        return state
+
+    async def _rebase_dependents(self, conn, checkpoint_id: str) -> None:
+        """Rewrite deltas based on ``checkpoint_id`` as full snapshots."""
+        dependents = await conn.fetch(
+            "SELECT checkpoint_id FROM workflow_checkpoints WHERE base_checkpoint_id = $1",
+            checkpoint_id
+        )
+        for row in dependents:
+            dependent_id = str(row['checkpoint_id'])
+            state = await self._load_state(conn, dependent_id)
+            if state is None:
+                continue
+            blob = checkpoint_codec.encode(state, self.codec)
+            await conn.execute(
+                """
+                UPDATE workflow_checkpoints
+                SET state = $2, codec = $3, is_delta = false, base_checkpoint_id = NULL, size_bytes = $4
+                WHERE checkpoint_id = $1
+                """,
+                dependent_id,
+                blob,
+                self.codec,
+                len(blob)
+            )
+
+    def _forget(self, checkpoint_id: str) -> None:
+        """Drop a deleted checkpoint from the delta bookkeeping."""
+        for workflow_id, (last_id, _, _) in list(self._last_saved.items()):
+            if last_id == checkpoint_id:
+                del self._last_saved[workflow_id]
+
+    @staticmethod
+    def _metadata(row) -> Dict[str, Any]:
+        return {
+            "checkpoint_id": str(row['checkpoint_id']),
+            "workflow_id": row['workflow_id'],
+            "created_at": row['created_at'],
+            "iteration_count": row['iteration_count'],
+            "codec": row['codec'],
+            "is_delta": bool(row['is_delta']),
+            "base_checkpoint_id": str(row['base_checkpoint_id']) if row['base_checkpoint_id'] else None,
+            "size_bytes": row['size_bytes']
+        }
+
+    @staticmethod
+    def _encode_cursor(created_at: datetime, checkpoint_id: str) -> str:
+        return f"{created_at.isoformat()}|{checkpoint_id}"
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        created_at, _, checkpoint_id = cursor.partition("|")
+        if not checkpoint_id:
+            raise ValueError(f"Invalid checkpoint cursor: {cursor!r}")
+        return datetime.fromisoformat(created_at), checkpoint_id
+
+
+_shared_storage: Optional[PostgreSQLCheckpointStorage] = None
+
+
+def get_checkpoint_storage() -> PostgreSQLCheckpointStorage:
+    """Process-wide checkpoint storage; the app starts its background pruning at startup."""
+    global _shared_storage
+    if _shared_storage is None:
+        _shared_storage = PostgreSQLCheckpointStorage()
+    return _shared_storage
@@ -0,0 +1,231 @@
+"""
+ChromaDB Write-Ahead Queue
+
+Durable local queue for ChromaDBContextProvider writes made while ChromaDB
+is unreachable. Entries are appended to a SQLite file (WAL mode) with the
+document ID the caller already received, and replayed in batches with
+``upsert`` once the provider reconnects - replaying an entry twice is
+harmless, so a crash between the upsert and the acknowledgement cannot
+duplicate memories.
+
+Disk usage is bounded by CHROMA_WRITE_QUEUE_MAX_BYTES; when full, the oldest
+entries are dropped (and counted in maf_chroma_write_queue_dropped_total).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.config.settings import settings
+from src.utils import get_logger, serialization
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class QueuedWrite:
+    """A pending document write."""
+    seq: int
+    doc_id: str
+    document: str
+    metadata: Dict[str, Any]
+
+
+class ChromaWriteQueue:
+    """Append-only SQLite queue of pending ChromaDB writes, per collection."""
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        """
+        Args:
+            path: SQLite file (created on first write)
+            max_bytes: Total size of queued documents and metadata
+        """
+        self.path = path
+        self.max_bytes = max_bytes or settings.CHROMA_WRITE_QUEUE_MAX_BYTES
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chroma_write_queue (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    collection TEXT NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    document TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    UNIQUE (collection, doc_id)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chroma_queue_collection ON chroma_write_queue (collection, seq)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def enqueue(
+        self,
+        collection: str,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]]
+    ) -> int:
+        """Append writes (a repeated ID replaces the queued entry).
+
+        New entries are never evicted by their own insert: only older entries
+        are dropped to make room.
+
+        Returns:
+            Number of older entries dropped to stay within max_bytes
+
+        Raises:
+            ValueError: If the writes alone exceed max_bytes (nothing is queued)
+        """
+        now = time.time()
+        rows = []
+        for doc_id, document, metadata in zip(ids, documents, metadatas):
+            encoded = serialization.dumps_str(metadata)
+            rows.append((collection, doc_id, document, encoded, len(document.encode("utf-8")) + len(encoded), now))
+        size = sum(row[4] for row in rows)
+        if size > self.max_bytes:
+            self._record(self.pending(), len(rows))
+            raise ValueError(f"{len(rows)} writes ({size} bytes) exceed the queue limit of {self.max_bytes} bytes")
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO chroma_write_queue "
+                "(collection, doc_id, document, metadata, size, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            dropped = self._enforce_limit(conn)
+            conn.commit()
+            depth = self._depth(conn)
+        self._record(depth, dropped)
+        if dropped:
+            logger.warning(f"[ChromaWriteQueue] Queue full ({self.max_bytes} bytes), dropped {dropped} oldest writes")
+        return dropped
+
+    def peek(self, collection: str, limit: int) -> List[QueuedWrite]:
+        """Oldest pending writes for ``collection``."""
+        with self._lock:
+            if self._conn is None and not os.path.exists(self.path):
+                return []
+            rows = self._connection().execute(
+                "SELECT seq, doc_id, document, metadata FROM chroma_write_queue "
+                "WHERE collection = ? ORDER BY seq LIMIT ?",
+                (collection, limit)
+            ).fetchall()
+        return [QueuedWrite(seq, doc_id, document, serialization.loads(metadata)) for seq, doc_id, document, metadata in rows]
+
+    def ack(self, seqs: Sequence[int]) -> None:
+        """Remove replayed writes."""
+        if not seqs:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.executemany("DELETE FROM chroma_write_queue WHERE seq = ?", [(seq,) for seq in seqs])
+            conn.commit()
+            depth = self._depth(conn)
+        self._record(depth, 0)
+
+    def discard(self, collection: str, ids: Sequence[str]) -> int:
+        """Drop queued writes of ``ids`` (documents deleted before replay).
+
+        Returns:
+            Number of queued writes removed
+        """
+        if not ids:
+            return 0
+        with self._lock:
+            if self._conn is None and not os.path.exists(self.path):
+                return 0
+            conn = self._connection()
+            removed = conn.executemany(
+                "DELETE FROM chroma_write_queue WHERE collection = ? AND doc_id = ?",
+                [(collection, doc_id) for doc_id in ids]
+            ).rowcount
+            conn.commit()
+            depth = self._depth(conn)
+        self._record(depth, 0)
+        return removed
+
+    def pending(self, collection: Optional[str] = None) -> int:
+        """Number of queued writes (for one collection or all)."""
+        with self._lock:
+            if self._conn is None and not os.path.exists(self.path):
+                return 0
+            conn = self._connection()
+            if collection is None:
+                return self._depth(conn)
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM chroma_write_queue WHERE collection = ?", (collection,)
+            ).fetchone()
+            return count
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            if self._conn is None and not os.path.exists(self.path):
+                return 0
+            (size,) = self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM chroma_write_queue").fetchone()
+            return size
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _enforce_limit(self, conn: sqlite3.Connection) -> int:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM chroma_write_queue").fetchone()
+        dropped = 0
+        while total > self.max_bytes:
+            rows = conn.execute("SELECT seq, size FROM chroma_write_queue ORDER BY seq LIMIT 100").fetchall()
+            if not rows:
+                break
+            doomed = []
+            for seq, size in rows:
+                if total <= self.max_bytes:
+                    break
+                doomed.append((seq,))
+                total -= size
+            conn.executemany("DELETE FROM chroma_write_queue WHERE seq = ?", doomed)
+            dropped += len(doomed)
+        return dropped
+
+    @staticmethod
+    def _depth(conn: sqlite3.Connection) -> int:
+        (count,) = conn.execute("SELECT COUNT(*) FROM chroma_write_queue").fetchone()
+        return count
+
+    @staticmethod
+    def _record(depth: int, dropped: int) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().record_chroma_write_queue(depth, dropped)
+        except Exception:
+            pass
+
+
+_queues: Dict[str, ChromaWriteQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_write_queue(path: Optional[str] = None) -> ChromaWriteQueue:
+    """Process-wide queue for ``path`` (default CHROMA_WRITE_QUEUE_PATH), shared by all providers."""
+    path = os.path.abspath(path or settings.CHROMA_WRITE_QUEUE_PATH)
+    with _queues_lock:
+        queue = _queues.get(path)
+        if queue is None:
+            queue = _queues[path] = ChromaWriteQueue(path)
+        return queue
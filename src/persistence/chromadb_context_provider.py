@@ -5,15 +5,103 @@ This module implements the MAF SDK Context Provider interface for persistent
 agent memory using ChromaDB as the underlying vector store.
 """
 
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Sequence, TypeVar
 import uuid
 import asyncio
+import random
+import threading
+import time
 import chromadb
+import httpx
 from chromadb.config import Settings
+from src.config.settings import settings
+from src.persistence.chroma_write_queue import ChromaWriteQueue, get_write_queue
 from src.utils import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+_DEFAULT_QUEUE: Any = object()
+
+# Chroma's HTTP client is synchronous; its calls run on this bounded pool
+# instead of the loop's default executor shared with everything else.
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def chroma_executor() -> ThreadPoolExecutor:
+    """Process-wide thread pool for ChromaDB calls (CHROMA_MAX_WORKERS threads)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.CHROMA_MAX_WORKERS,
+                thread_name_prefix="chroma"
+            )
+        return _executor
+
+
+# OSError covers ConnectionError and socket failures; httpx.TransportError
+# covers connect/read/write errors and timeouts of the Chroma HTTP client.
+_CONNECTION_ERRORS = (TimeoutError, OSError, httpx.TransportError)
+
+
+def _is_connection_error(error: BaseException) -> bool:
+    """Errors after which the client should reconnect before the next call.
+
+    chromadb re-raises httpx.ConnectError as a ValueError ("Could not connect
+    to a Chroma server") inside its except block, so the exception chain is
+    checked as well.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, _CONNECTION_ERRORS):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def chunk_text(text: str, chunk_size: int, overlap: int = 0) -> List[str]:
+    """
+    Split text into chunks of at most chunk_size characters.
+    
+    Cuts at the last paragraph break, line break or space inside each window
+    (hard cut if there is none); consecutive chunks share up to ``overlap``
+    characters so a sentence cut at a boundary is still embedded whole.
+    
+    Args:
+        text: Text to split
+        chunk_size: Maximum characters per chunk (0 or less disables chunking)
+        overlap: Characters repeated at the start of the next chunk
+        
+    Returns:
+        List[str]: Non-empty chunks in order
+    """
+    if chunk_size <= 0 or len(text) <= chunk_size:
+        return [text]
+    overlap = max(0, min(overlap, chunk_size // 2))
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            window = text[start:end]
+            for separator in ("\n\n", "\n", " "):
+                cut = window.rfind(separator)
+                if cut > overlap:
+                    end = start + cut + len(separator)
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
 
 class ChromaDBContextProvider:
     """
@@ -26,42 +114,266 @@ class ChromaDBContextProvider:
     follows its patterns (async operations, type hints, standard methods)
     without importing from microsoft_agents directly, as the actual package
     may not be available in all environments.
+    
+    All Chroma calls run on a dedicated, bounded thread pool with
+    per-operation timeouts; the connection is opened lazily and re-opened
+    with exponential backoff after failures. Writes made while ChromaDB is
+    unreachable go to a durable local queue and are replayed on reconnect.
     """
     
     def __init__(
         self,
         host: str = "localhost",
         port: int = 8000,
-        collection_name: str = "maf_knowledge"
+        collection_name: str = "maf_knowledge",
+        operation_timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        write_queue: Optional[ChromaWriteQueue] = _DEFAULT_QUEUE
     ):
         """
-        Initialize ChromaDB client and collection.
+        Configure the provider. The connection is opened lazily by the first
+        operation (or connect()), never on the event loop.
         
         Args:
             host: ChromaDB server host (default: localhost)
             port: ChromaDB server port (default: 8000)
             collection_name: Name of the collection to use (default: maf_knowledge)
+            operation_timeout: Seconds per Chroma call (default CHROMA_OPERATION_TIMEOUT)
+            connect_timeout: Seconds per connection attempt (default CHROMA_CONNECT_TIMEOUT)
+            executor: Thread pool for Chroma calls (default: shared chroma_executor())
+            write_queue: Queue for writes made while disconnected (default: the
+                shared get_write_queue() if CHROMA_WRITE_QUEUE_ENABLED; None disables)
         """
         self.host = host
         self.port = port
         self.collection_name = collection_name
+        self.operation_timeout = operation_timeout or settings.CHROMA_OPERATION_TIMEOUT
+        self.connect_timeout = connect_timeout or settings.CHROMA_CONNECT_TIMEOUT
+        self._executor = executor
         self._client: Optional[chromadb.HttpClient] = None
         self._collection = None
-        self._initialize_client()
-    
-    def _initialize_client(self) -> None:
-        """Initialize ChromaDB HTTP client and ensure collection exists."""
+        self._max_batch_size: Optional[int] = None
+        self._connect_lock = asyncio.Lock()
+        self._failures = 0
+        self._retry_at = 0.0
+        if write_queue is _DEFAULT_QUEUE:
+            write_queue = get_write_queue() if settings.CHROMA_WRITE_QUEUE_ENABLED else None
+        self._write_queue = write_queue
+        self._replay_task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> bool:
+        """
+        Connect to ChromaDB if not connected yet.
+        
+        After a failed attempt further attempts are skipped until an
+        exponential backoff (CHROMA_RECONNECT_BACKOFF_BASE doubling up to
+        CHROMA_RECONNECT_BACKOFF_MAX, with jitter) has elapsed.
+        
+        Returns:
+            bool: True if the collection is available
+        """
+        if self.is_connected:
+            return True
+        async with self._connect_lock:
+            if self.is_connected:
+                return True
+            if time.monotonic() < self._retry_at:
+                return False
+            try:
+                client, collection, max_batch_size = await self._call(self._connect_sync, self.connect_timeout)
+            except Exception as e:
+                self._failures += 1
+                delay = min(
+                    settings.CHROMA_RECONNECT_BACKOFF_BASE * 2 ** (self._failures - 1),
+                    settings.CHROMA_RECONNECT_BACKOFF_MAX
+                ) * random.uniform(0.5, 1.0)
+                self._retry_at = time.monotonic() + delay
+                logger.info(
+                    f"[ChromaDBContextProvider] Failed to connect to ChromaDB: {e} "
+                    f"(next attempt in {delay:.1f}s)"
+                )
+                return False
+            self._client, self._collection, self._max_batch_size = client, collection, max_batch_size
+            self._failures = 0
+            self._retry_at = 0.0
+            logger.info(f"[ChromaDBContextProvider] Connected to ChromaDB at {self.host}:{self.port}")
+        if self._write_queue is not None:
+            try:
+                pending = await asyncio.to_thread(self._write_queue.pending, self.collection_name)
+            except Exception as e:
+                logger.warning(f"[ChromaDBContextProvider] Could not read the write queue: {e}")
+                pending = 0
+            if pending:
+                self._start_replay()
+        return True
+
+    async def aclose(self) -> None:
+        """Drop the connection (the next operation reconnects)."""
+        if self._replay_task is not None and not self._replay_task.done():
+            self._replay_task.cancel()
+        self._replay_task = None
+        self._client = None
+        self._collection = None
+
+    async def flush_pending(self) -> int:
+        """
+        Replay queued offline writes now (connecting first if needed).
+        
+        Returns:
+            int: Number of writes replayed (0 if ChromaDB is still unreachable)
+        """
+        if self._write_queue is None or not await self.connect():
+            return 0
+        replayed = 0
+        if self._replay_task is not None and not self._replay_task.done():
+            # Started by connect(); count its writes, then replay anything queued since
+            replayed = await asyncio.shield(self._replay_task)
+        return replayed + await self._start_replay()
+
+    def _start_replay(self) -> "asyncio.Task[int]":
+        """Start the background replay of queued writes unless one is running."""
+        if self._replay_task is None or self._replay_task.done():
+            self._replay_task = asyncio.create_task(self._replay())
+        return self._replay_task
+
+    async def _replay(self) -> int:
+        """
+        Upsert queued writes in batches, acknowledging each batch once stored.
+        
+        Queued entries keep the IDs returned to their callers, so replaying a
+        batch again (after a crash or a timeout) overwrites rather than
+        duplicates. Stops at the first failure; the rest stays queued.
+        """
+        queue = self._write_queue
+        replayed = 0
+        while self.is_connected:
+            batch = await asyncio.to_thread(queue.peek, self.collection_name, self._batch_size(None))
+            if not batch:
+                break
+            collection = self._collection
+            try:
+                await self._call(
+                    lambda batch=batch: collection.upsert(
+                        ids=[write.doc_id for write in batch],
+                        documents=[write.document for write in batch],
+                        metadatas=[write.metadata for write in batch]
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"[ChromaDBContextProvider] Replay of queued writes interrupted: {e}")
+                break
+            await asyncio.to_thread(queue.ack, [write.seq for write in batch])
+            replayed += len(batch)
+        if replayed:
+            logger.info(f"[ChromaDBContextProvider] Replayed {replayed} queued writes into {self.collection_name}")
+        return replayed
+
+    async def _enqueue(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ) -> bool:
+        """
+        Queue writes for replay on reconnect.
+        
+        Returns:
+            bool: False if the writes were not kept (no queue, a storage error,
+            or larger than CHROMA_WRITE_QUEUE_MAX_BYTES); the caller must not
+            hand out their IDs as stored
+        """
+        if self._write_queue is None:
+            return False
+        try:
+            await asyncio.to_thread(self._write_queue.enqueue, self.collection_name, ids, documents, metadatas)
+        except Exception as e:
+            logger.warning(f"[ChromaDBContextProvider] Could not queue {len(ids)} offline writes: {e}")
+            return False
+        logger.info(f"[ChromaDBContextProvider] ChromaDB unavailable, queued {len(ids)} writes for replay")
+        return True
+
+    async def _discard(self, ids: List[str]) -> int:
+        """Drop queued writes of ``ids`` so a replay cannot resurrect them."""
+        if self._write_queue is None:
+            return 0
+        try:
+            return await asyncio.to_thread(self._write_queue.discard, self.collection_name, ids)
+        except Exception as e:
+            logger.warning(f"[ChromaDBContextProvider] Could not discard {len(ids)} queued writes: {e}")
+            return 0
+
+    def _connect_sync(self):
+        """Open the HTTP client and collection (runs on the Chroma thread pool)."""
+        client = chromadb.HttpClient(host=self.host, port=self.port)
+        collection = client.get_or_create_collection(name=self.collection_name)
+        try:
+            max_batch_size = client.get_max_batch_size()
+        except Exception:
+            max_batch_size = None
+        return client, collection, max_batch_size
+
+    async def _call(self, operation: Callable[[], T], timeout: Optional[float] = None) -> T:
+        """
+        Run a synchronous Chroma call on the Chroma thread pool with a timeout.
+        
+        A timeout or connection failure drops the connection so the next
+        operation reconnects (subject to backoff). The error is re-raised.
+        """
+        loop = asyncio.get_running_loop()
         try:
-            self._client = chromadb.HttpClient(host=self.host, port=self.port)
-            self._collection = self._client.get_or_create_collection(
-                name=self.collection_name
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor or chroma_executor(), operation),
+                timeout or self.operation_timeout
             )
-            logger.info(f"[ChromaDBContextProvider] Connected to ChromaDB at {self.host}:{self.port}")
         except Exception as e:
-            logger.info(f"[ChromaDBContextProvider] Failed to connect to ChromaDB: {e}")
-            self._client = None
-            self._collection = None
-    
+            if operation != self._connect_sync and _is_connection_error(e):
+                logger.info(f"[ChromaDBContextProvider] Connection lost ({type(e).__name__}: {e}), will reconnect")
+                self._client = None
+                self._collection = None
+            raise
+
+    def _project_filter(self, filter_metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build a where clause scoped to the active project."""
+        from src.persistence.project_context import project_context
+
+        conditions = dict(filter_metadata or {})
+        try:
+            conditions['project_id'] = project_context.get_project()
+        except RuntimeError:
+            conditions['project_id'] = 0
+        if len(conditions) == 1:
+            return conditions
+        # Chroma only accepts several equality conditions combined with $and
+        return {"$and": [{key: value} for key, value in conditions.items()]}
+
+    def _batch_size(self, batch_size: Optional[int]) -> int:
+        """Requested batch size, capped by the server's maximum batch size."""
+        size = batch_size or settings.CHROMA_BATCH_SIZE
+        if self._max_batch_size:
+            size = min(size, self._max_batch_size)
+        return max(1, size)
+
+    @staticmethod
+    def _format_results(results: Optional[Dict[str, Any]], index: int) -> List[Dict[str, Any]]:
+        """Flatten the results of the query at ``index`` in a Chroma query response."""
+        formatted_results = []
+        if not results or not results.get('ids') or index >= len(results['ids']):
+            return formatted_results
+        ids = results['ids'][index]
+        documents = results['documents'][index]
+        metadatas = results['metadatas'][index] if results.get('metadatas') else None
+        distances = results['distances'][index] if results.get('distances') else None
+
+        for i, doc_id in enumerate(ids):
+            formatted_results.append({
+                "id": doc_id,
+                "content": documents[i],
+                "metadata": metadatas[i] if metadatas else {},
+                "distance": distances[i] if distances else None
+            })
+        return formatted_results
+
     async def store(
         self,
         content: str,
@@ -75,14 +387,9 @@ class ChromaDBContextProvider:
             metadata: Optional metadata dictionary
             
         Returns:
-            str: The ID of the stored document
+            str: The ID of the stored document (also while ChromaDB is
+            unreachable if the write was queued; "offline_id" otherwise)
         """
-        if not self.is_connected:
-            # In a real implementation, we might queue this or retry
-            # For now, we'll log and return a placeholder if not connected
-            # (This allows tests to run without a real ChromaDB instance if mocked)
-            return "offline_id"
-
         from src.persistence.project_context import project_context
         
         if metadata is None:
@@ -99,16 +406,25 @@ class ChromaDBContextProvider:
 
         doc_id = str(uuid.uuid4())
         
-        # Run in executor to avoid blocking the event loop
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: self._collection.add(
-                documents=[content],
-                metadatas=[metadata],
-                ids=[doc_id]
+        if not await self.connect():
+            # Queued writes keep their ID and are replayed on reconnect
+            if await self._enqueue([doc_id], [content], [metadata]):
+                return doc_id
+            return "offline_id"
+
+        # Run on the Chroma thread pool to avoid blocking the event loop
+        collection = self._collection
+        try:
+            await self._call(
+                lambda: collection.add(
+                    documents=[content],
+                    metadatas=[metadata],
+                    ids=[doc_id]
+                )
             )
-        )
+        except Exception as e:
+            if not (_is_connection_error(e) and await self._enqueue([doc_id], [content], [metadata])):
+                raise
         
         return doc_id
 
@@ -129,52 +445,150 @@ class ChromaDBContextProvider:
         Returns:
             List[Dict[str, Any]]: List of results with 'content' and 'metadata'
         """
-        if not self.is_connected:
+        if not await self.connect():
             return []
 
-        from src.persistence.project_context import project_context
-
-        if filter_metadata is None:
-            filter_metadata = {}
-            
         # Force project_id filter
-        try:
-            project_id = project_context.get_project()
-            filter_metadata['project_id'] = project_id
-        except RuntimeError:
-            # Fallback
-            filter_metadata['project_id'] = 0
+        where = self._project_filter(filter_metadata)
 
-        loop = asyncio.get_running_loop()
-        results = await loop.run_in_executor(
-            None,
-            lambda: self._collection.query(
+        collection = self._collection
+        results = await self._call(
+            lambda: collection.query(
                 query_texts=[query],
                 n_results=n_results,
-                where=filter_metadata
+                where=where
             )
         )
         
-        # Format results
-        formatted_results = []
-        if results and results['ids']:
-            # ChromaDB returns lists of lists (one list per query)
-            # Since we only query one text at a time, we take the first list
-            ids = results['ids'][0]
-            documents = results['documents'][0]
-            metadatas = results['metadatas'][0]
-            distances = results['distances'][0] if 'distances' in results else None
+        # ChromaDB returns lists of lists (one list per query)
+        return self._format_results(results, 0)
+
+    async def store_many(
+        self,
+        contents: Sequence[str],
+        metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        batch_size: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None
+    ) -> List[str]:
+        """
+        Store many documents with one Chroma call per batch.
+        
+        Documents longer than chunk_size are split into chunks that share a
+        parent_id and carry chunk_index/chunk_count in their metadata.
+        
+        Args:
+            contents: Texts to store
+            metadatas: Optional metadata per text (same length as contents)
+            batch_size: Chunks per Chroma call (default CHROMA_BATCH_SIZE)
+            chunk_size: Maximum characters per chunk (default CHROMA_CHUNK_SIZE, 0 disables)
+            chunk_overlap: Characters shared by consecutive chunks (default CHROMA_CHUNK_OVERLAP)
             
-            for i, doc_id in enumerate(ids):
-                formatted_results.append({
-                    "id": doc_id,
-                    "content": documents[i],
-                    "metadata": metadatas[i] if metadatas else {},
-                    "distance": distances[i] if distances else None
+        Returns:
+            List[str]: IDs of the stored (or queued) chunks, in input order;
+            empty if ChromaDB is unreachable and the writes could not be queued
+        """
+        if metadatas is not None and len(metadatas) != len(contents):
+            raise ValueError("metadatas must have the same length as contents")
+        if not contents:
+            return []
+
+        chunk_size = settings.CHROMA_CHUNK_SIZE if chunk_size is None else chunk_size
+        chunk_overlap = settings.CHROMA_CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        project_filter = self._project_filter(None)
+        project_id = project_filter['project_id']
+
+        ids: List[str] = []
+        documents: List[str] = []
+        chunk_metadatas: List[Dict[str, Any]] = []
+        for index, content in enumerate(contents):
+            metadata = dict((metadatas[index] if metadatas is not None else None) or {})
+            metadata['project_id'] = project_id
+            doc_id = str(uuid.uuid4())
+            chunks = chunk_text(content, chunk_size, chunk_overlap)
+            if len(chunks) == 1:
+                ids.append(doc_id)
+                documents.append(chunks[0])
+                chunk_metadatas.append(metadata)
+                continue
+            for chunk_index, chunk in enumerate(chunks):
+                ids.append(f"{doc_id}-{chunk_index}")
+                documents.append(chunk)
+                chunk_metadatas.append({
+                    **metadata,
+                    "parent_id": doc_id,
+                    "chunk_index": chunk_index,
+                    "chunk_count": len(chunks)
                 })
-                
-        return formatted_results
-    
+
+        if not await self.connect():
+            if await self._enqueue(ids, documents, chunk_metadatas):
+                return ids
+            return []
+
+        size = self._batch_size(batch_size)
+        collection = self._collection
+        for start in range(0, len(ids), size):
+            end = start + size
+            try:
+                await self._call(
+                    lambda start=start, end=end: collection.add(
+                        documents=documents[start:end],
+                        metadatas=chunk_metadatas[start:end],
+                        ids=ids[start:end]
+                    )
+                )
+            except Exception as e:
+                # Earlier batches are stored; queue this one and the rest
+                if not (_is_connection_error(e) and await self._enqueue(ids[start:], documents[start:], chunk_metadatas[start:])):
+                    raise
+                return ids
+        logger.info(
+            f"[ChromaDBContextProvider] Stored {len(contents)} documents as {len(ids)} chunks "
+            f"in {-(-len(ids) // size)} batches"
+        )
+        return ids
+
+    async def query_many(
+        self,
+        queries: Sequence[str],
+        n_results: int = 3,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run many queries with one Chroma call per batch.
+        
+        Args:
+            queries: Query texts
+            n_results: Number of results per query
+            filter_metadata: Optional metadata filter applied to every query
+            batch_size: Queries per Chroma call (default CHROMA_BATCH_SIZE)
+            
+        Returns:
+            List[List[Dict[str, Any]]]: Results per query, formatted like query()
+        """
+        if not queries:
+            return []
+        if not await self.connect():
+            return [[] for _ in queries]
+
+        where = self._project_filter(filter_metadata)
+        size = self._batch_size(batch_size)
+        collection = self._collection
+        all_results: List[List[Dict[str, Any]]] = []
+        for start in range(0, len(queries), size):
+            batch = list(queries[start:start + size])
+            results = await self._call(
+                lambda batch=batch: collection.query(
+                    query_texts=batch,
+                    n_results=n_results,
+                    where=where
+                )
+            )
+            all_results.extend(self._format_results(results, i) for i in range(len(batch)))
+        return all_results
+
     async def retrieve(self, document_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve specific document by ID.
@@ -188,11 +602,12 @@ class ChromaDBContextProvider:
         Raises:
             RuntimeError: If ChromaDB client is not available
         """
-        if not self._collection:
+        if not await self.connect():
             raise RuntimeError("ChromaDB collection not available")
         
+        collection = self._collection
         try:
-            result = self._collection.get(ids=[document_id])
+            result = await self._call(lambda: collection.get(ids=[document_id]))
             if result['documents']:
                 return {
                     "content": result['documents'][0],
@@ -207,6 +622,9 @@ class ChromaDBContextProvider:
         """
         Delete document by ID.
         
+        A write still waiting in the offline queue is discarded as well, so
+        the replay does not store the document again.
+        
         Args:
             document_id: Document identifier (UUID string)
         
@@ -214,13 +632,18 @@ class ChromaDBContextProvider:
             True if deleted successfully, False otherwise
             
         Raises:
-            RuntimeError: If ChromaDB client is not available
+            RuntimeError: If ChromaDB client is not available and the
+                document was not in the offline queue
         """
-        if not self._collection:
+        discarded = await self._discard([document_id])
+        if not await self.connect():
+            if discarded:
+                return True
             raise RuntimeError("ChromaDB collection not available")
         
+        collection = self._collection
         try:
-            self._collection.delete(ids=[document_id])
+            await self._call(lambda: collection.delete(ids=[document_id]))
             return True
         except Exception as e:
             logger.info(f"[ChromaDBContextProvider] Error deleting document {document_id}: {e}")
@@ -228,5 +651,5 @@ class ChromaDBContextProvider:
     
     @property
     def is_connected(self) -> bool:
-        """Check if ChromaDB client is connected and collection is available."""
+        """Check if ChromaDB client is connected and collection is available (does not connect)."""
         return self._client is not None and self._collection is not None
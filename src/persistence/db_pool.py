@@ -0,0 +1,136 @@
+"""
+Shared asyncpg Connection Pool
+
+One application-wide asyncpg.Pool used by every persistence provider
+(message stores, audit log, checkpoints, session/project services and the
+database tools) instead of a fresh asyncpg.connect() handshake per call.
+
+Lifecycle is owned by the entry points (src/main.py, src/api_server.py),
+which call db_pool.open() at startup and db_pool.close() at shutdown.
+When the pool is not open (unit tests, scripts, or the database being down
+at startup) acquire() falls back to a one-off connection, so providers work
+unchanged either way.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import asyncpg
+
+from src.config.settings import settings
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class DatabasePool:
+    """Lifecycle-managed wrapper around a single asyncpg.Pool."""
+
+    def __init__(
+        self,
+        db_url: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        statement_cache_size: Optional[int] = None
+    ):
+        """
+        Args:
+            db_url: Database URL (defaults to settings.DATABASE_URL)
+            min_size: Connections opened eagerly (defaults to DB_POOL_MIN_SIZE)
+            max_size: Upper bound on pooled connections (defaults to DB_POOL_MAX_SIZE)
+            statement_cache_size: Prepared statements cached per connection
+                (defaults to DB_STATEMENT_CACHE_SIZE; 0 disables, e.g. behind pgbouncer)
+        """
+        self.db_url = db_url or settings.DATABASE_URL
+        self.min_size = min_size if min_size is not None else settings.DB_POOL_MIN_SIZE
+        self.max_size = max_size if max_size is not None else settings.DB_POOL_MAX_SIZE
+        self.statement_cache_size = (
+            statement_cache_size if statement_cache_size is not None
+            else settings.DB_STATEMENT_CACHE_SIZE
+        )
+        self._pool: Optional[asyncpg.Pool] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._pool is not None
+
+    async def open(self) -> bool:
+        """Create the pool. Safe to call more than once.
+
+        Returns:
+            True if the pool is open, False if it could not be created
+            (callers keep working via one-off connections).
+        """
+        async with self._lock:
+            if self._pool is not None:
+                return True
+            try:
+                self._pool = await asyncpg.create_pool(
+                    self.db_url,
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                    statement_cache_size=self.statement_cache_size,
+                    command_timeout=settings.DB_COMMAND_TIMEOUT
+                )
+            except Exception as e:
+                logger.warning(f"[DBPool] Could not create connection pool, using direct connections: {e}")
+                return False
+            logger.info(f"[DBPool] Connection pool open (min={self.min_size}, max={self.max_size})")
+            return True
+
+    async def close(self) -> None:
+        """Close the pool, waiting for released connections."""
+        async with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
+            logger.info("[DBPool] Connection pool closed")
+
+    @asynccontextmanager
+    async def acquire(self, db_url: Optional[str] = None) -> AsyncIterator[asyncpg.Connection]:
+        """Borrow a connection for the duration of the block.
+
+        Args:
+            db_url: Database the caller is configured for. Requests for a
+                different database than the pool's get a one-off connection.
+
+        Yields:
+            An asyncpg connection (pooled when possible)
+        """
+        pool = self._pool
+        if pool is None or (db_url is not None and db_url != self.db_url):
+            conn = await asyncpg.connect(db_url or self.db_url)
+            try:
+                yield conn
+            finally:
+                await conn.close()
+            return
+
+        started = time.perf_counter()
+        async with pool.acquire() as conn:
+            self._record_metrics(time.perf_counter() - started)
+            yield conn
+
+    def stats(self) -> dict:
+        """Current pool occupancy: {size, idle, in_use}."""
+        if self._pool is None:
+            return {"size": 0, "idle": 0, "in_use": 0}
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        return {"size": size, "idle": idle, "in_use": size - idle}
+
+    def _record_metrics(self, wait_seconds: float) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            metrics = MetricsService()
+            metrics.observe_db_pool_wait(wait_seconds)
+            metrics.record_db_pool_stats(**self.stats())
+        except Exception:
+            pass
+
+
+# Application-wide pool shared by all persistence providers
+db_pool = DatabasePool()
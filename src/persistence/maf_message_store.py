@@ -5,16 +5,23 @@ Direct implementation of ChatMessageStoreProtocol using PostgreSQL,
 replacing the custom MessageStoreProvider with MAF SDK-native persistence.
 """
 
-import asyncpg
-from typing import Sequence, MutableMapping, Any
+import bisect
+from typing import AsyncIterator, Sequence, Mapping, MutableMapping, Any, Optional
 from agent_framework import ChatMessage
 from agent_framework._threads import ChatMessageStoreProtocol
 from src.config.settings import settings
-from src.utils import get_logger
+from src.persistence.db_pool import DatabasePool, db_pool
+from src.persistence.migration_runner import ensure_schema
+from src.utils import get_logger, serialization
 
 logger = get_logger(__name__)
 
 
+def _estimate_tokens(message: ChatMessage) -> int:
+    """Rough token estimate (~4 characters per token) for windowing."""
+    return max(1, len(message.text or "") // 4)
+
+
 class PostgreSQLMessageStore(ChatMessageStoreProtocol):
     """
     MAF SDK-native message store backed by PostgreSQL.
@@ -24,124 +31,238 @@ class PostgreSQLMessageStore(ChatMessageStoreProtocol):
     while conforming to the MAF SDK's thread management system.
     """
     
-    def __init__(self, session_id: str, db_url: str = None):
+    def __init__(self, session_id: str, db_url: str = None, pool: Optional[DatabasePool] = None):
         """
         Initialize the PostgreSQL message store.
         
         Args:
             session_id: Unique identifier for this conversation thread
             db_url: Optional database URL (uses settings default if not provided)
+            pool: Optional connection pool (uses the shared application pool if not provided)
         """
         self.session_id = session_id
         self.db_url = db_url or settings.DATABASE_URL
+        self.pool = pool or db_pool
         self._messages_cache: list[ChatMessage] = []
+        self._cache_ids: list[int] = []  # agent_messages.id of each cached message (sorted)
+        self._cached_ids: set[int] = set()
         self._cache_loaded = False
+        self._last_id = 0  # Highest agent_messages.id reflected in the cache
     
     async def _init_db(self):
-        """Initialize the agent_messages table if it doesn't exist."""
-        conn = None
+        """Ensure the schema is migrated (runs the migrations once per process)."""
         try:
-            conn = await asyncpg.connect(self.db_url)
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS agent_messages (
-                    id SERIAL PRIMARY KEY,
-                    session_id VARCHAR(255) NOT NULL,
-                    timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                    role VARCHAR(50) NOT NULL,
-                    content TEXT
-                );
-                CREATE INDEX IF NOT EXISTS idx_session_timestamp 
-                ON agent_messages(session_id, timestamp);
-                """
-            )
+            await ensure_schema(self.db_url, self.pool)
         except Exception as e:
             logger.error(f"[PostgreSQLMessageStore] Error initializing database: {e}")
             raise
-        finally:
-            if conn:
-                await conn.close()
     
     async def list_messages(self) -> list[ChatMessage]:
         """
         Get all messages from PostgreSQL in chronological order.
         
+        The first call loads the session; later calls only fetch rows with an
+        id above the newest one seen minus MESSAGE_STORE_REFRESH_OVERLAP and
+        merge those not cached yet. Ids are assigned at insert time but rows
+        become visible at commit, so with concurrent writers a lower id can
+        appear after a higher one has been read; the overlap picks it up and
+        it is placed in id order.
+        
         Returns:
             List of ChatMessage objects from oldest to newest
         """
-        conn = None
         try:
             await self._init_db()
             
-            conn = await asyncpg.connect(self.db_url)
-            records = await conn.fetch(
-                """
-                SELECT role, content 
-                FROM agent_messages
-                WHERE session_id = $1
-                ORDER BY timestamp ASC;
-                """,
-                self.session_id
-            )
-            
-            # Convert to SDK ChatMessage format
-            messages = []
-            for record in records:
-                messages.append(
-                    ChatMessage(role=record['role'], text=record['content'])
+            async with self.pool.acquire(self.db_url) as conn:
+                records = await conn.fetch(
+                    """
+                    SELECT id, role, content, message
+                    FROM agent_messages
+                    WHERE session_id = $1 AND id > $2
+                    ORDER BY id ASC;
+                    """,
+                    self.session_id,
+                    max(self._last_id - settings.MESSAGE_STORE_REFRESH_OVERLAP, 0) if self._cache_loaded else 0
                 )
+
+            if not self._cache_loaded:
+                self._reset_cache()
             
-            # Update cache
-            self._messages_cache = messages
+            for record in records:
+                # Rows already cached (including our own writes) are skipped
+                if record['id'] not in self._cached_ids:
+                    self._cache_message(record['id'], self._record_to_message(record))
             self._cache_loaded = True
-            
-            return messages
-            
+
+            return list(self._messages_cache)
+
         except Exception as e:
             logger.info(f"[PostgreSQLMessageStore] Error retrieving messages: {e}")
             return []
-        finally:
-            if conn:
-                await conn.close()
+    
+    async def list_recent_messages(
+        self,
+        limit: Optional[int] = None,
+        max_tokens: Optional[int] = None
+    ) -> list[ChatMessage]:
+        """
+        Get the most recent window of the conversation.
+        
+        Args:
+            limit: Maximum number of messages to return
+            max_tokens: Stop adding older messages once their estimated token
+                        count (~4 characters per token) would exceed this budget
+                        
+        Returns:
+            List of ChatMessage objects from oldest to newest
+        """
+        window: list[ChatMessage] = []
+        tokens = 0
+        async for message in self._iter_newest_first(page_size=limit or 100):
+            if limit is not None and len(window) >= limit:
+                break
+            cost = _estimate_tokens(message)
+            if max_tokens is not None and window and tokens + cost > max_tokens:
+                break
+            window.append(message)
+            tokens += cost
+        window.reverse()
+        return window
+    
+    async def iter_messages(self, batch_size: int = 500) -> AsyncIterator[ChatMessage]:
+        """
+        Stream the whole session oldest-first in keyset pages of batch_size,
+        without materializing the full history.
+        """
+        await self._init_db()
+        last_id = 0
+        while True:
+            async with self.pool.acquire(self.db_url) as conn:
+                records = await conn.fetch(
+                    """
+                    SELECT id, role, content, message
+                    FROM agent_messages
+                    WHERE session_id = $1 AND id > $2
+                    ORDER BY id ASC
+                    LIMIT $3;
+                    """,
+                    self.session_id,
+                    last_id,
+                    batch_size
+                )
+            for record in records:
+                yield self._record_to_message(record)
+            if len(records) < batch_size:
+                return
+            last_id = records[-1]['id']
+    
+    async def _iter_newest_first(self, page_size: int) -> AsyncIterator[ChatMessage]:
+        """Yield messages newest-first, from the cache when it is loaded."""
+        if self._cache_loaded:
+            for message in reversed(await self.list_messages()):
+                yield message
+            return
+        
+        await self._init_db()
+        before_id = None
+        while True:
+            async with self.pool.acquire(self.db_url) as conn:
+                records = await conn.fetch(
+                    """
+                    SELECT id, role, content, message
+                    FROM agent_messages
+                    WHERE session_id = $1 AND ($2::int IS NULL OR id < $2)
+                    ORDER BY id DESC
+                    LIMIT $3;
+                    """,
+                    self.session_id,
+                    before_id,
+                    page_size
+                )
+            for record in records:
+                yield self._record_to_message(record)
+            if len(records) < page_size:
+                return
+            before_id = records[-1]['id']
     
     async def add_messages(self, messages: Sequence[ChatMessage]) -> None:
         """
-        Add messages to PostgreSQL.
+        Add messages to PostgreSQL in a single batched write.
+        
+        Each row keeps role/text for SQL tooling plus the full serialized
+        ChatMessage (tool calls, function results, author, ids) as JSONB.
         
         Args:
             messages: Sequence of ChatMessage objects to store
         """
-        conn = None
+        if not messages:
+            return
         try:
             await self._init_db()
             
-            conn = await asyncpg.connect(self.db_url)
-            
-            for msg in messages:
-                # Extract text content
-                content = msg.text if hasattr(msg, 'text') else str(msg.content)
-                
-                # Extract role (handle both string and enum)
-                role = str(msg.role.value) if hasattr(msg.role, 'value') else str(msg.role)
-                
-                await conn.execute(
+            rows = [self._message_to_row(msg) for msg in messages]
+            async with self.pool.acquire(self.db_url) as conn:
+                records = await conn.fetch(
                     """
-                    INSERT INTO agent_messages (session_id, role, content)
-                    VALUES ($1, $2, $3);
+                    INSERT INTO agent_messages (session_id, role, content, message)
+                    SELECT $1, r.role, r.content, r.message
+                    FROM unnest($2::text[], $3::text[], $4::jsonb[]) AS r(role, content, message)
+                    RETURNING id;
                     """,
                     self.session_id,
-                    role,
-                    content
+                    [row[0] for row in rows],
+                    [row[1] for row in rows],
+                    [row[2] for row in rows]
                 )
-                
-                # Update cache
-                self._messages_cache.append(msg)
-                
+
+            # Update cache; the ids let list_messages skip these rows later
+            if self._cache_loaded:
+                for record, message in zip(records, messages):
+                    self._cache_message(record['id'], message)
+
         except Exception as e:
             logger.info(f"[PostgreSQLMessageStore] Error storing messages: {e}")
-        finally:
-            if conn:
-                await conn.close()
+    
+    def _reset_cache(self) -> None:
+        """Forget every cached message (the next list_messages reloads the session)."""
+        self._messages_cache = []
+        self._cache_ids = []
+        self._cached_ids = set()
+        self._last_id = 0
+
+    def _cache_message(self, message_id: int, message: ChatMessage) -> None:
+        """Insert a message into the cache at its id position (usually the end)."""
+        index = bisect.bisect(self._cache_ids, message_id)
+        self._cache_ids.insert(index, message_id)
+        self._messages_cache.insert(index, message)
+        self._cached_ids.add(message_id)
+        self._last_id = max(self._last_id, message_id)
+
+    def _message_to_row(self, msg: ChatMessage) -> tuple:
+        """Build the (role, content, message) columns for a message."""
+        # Extract text content
+        content = msg.text if hasattr(msg, 'text') else str(msg.content)
+        
+        # Extract role (handle both string and enum)
+        role = str(msg.role.value) if hasattr(msg.role, 'value') else str(msg.role)
+        
+        payload = serialization.dumps_str(msg.to_dict())
+        return (role, content, payload)
+    
+    @staticmethod
+    def _record_to_message(record: Mapping[str, Any]) -> ChatMessage:
+        """Rebuild a ChatMessage, preferring the lossless serialized form."""
+        payload = record.get('message')
+        if payload:
+            if isinstance(payload, str):
+                payload = serialization.loads(payload)
+            try:
+                return ChatMessage.from_dict(payload)
+            except Exception as e:
+                logger.warning(f"[PostgreSQLMessageStore] Falling back to text for unreadable message: {e}")
+        # Legacy rows (before the message column existed) only have text
+        return ChatMessage(role=record['role'], text=record['content'])
     
     @classmethod
     async def deserialize(
@@ -154,7 +275,7 @@ class PostgreSQLMessageStore(ChatMessageStoreProtocol):
         
         Args:
             serialized_store_state: Previously serialized state containing session_id
-            **kwargs: Additional arguments (db_url, etc.)
+            **kwargs: Additional arguments (db_url, pool, etc.)
             
         Returns:
             New PostgreSQLMessageStore instance
@@ -165,7 +286,7 @@ class PostgreSQLMessageStore(ChatMessageStoreProtocol):
         if not session_id:
             raise ValueError("session_id is required in serialized state")
         
-        return cls(session_id=session_id, db_url=db_url)
+        return cls(session_id=session_id, db_url=db_url, pool=kwargs.get("pool"))
     
     async def update_from_state(
         self, 
@@ -186,7 +307,7 @@ class PostgreSQLMessageStore(ChatMessageStoreProtocol):
             if new_session_id != self.session_id:
                 self.session_id = new_session_id
                 self._cache_loaded = False
-                self._messages_cache = []
+                self._reset_cache()
     
     async def serialize(self, **kwargs: Any) -> dict[str, Any]:
         """
@@ -0,0 +1,170 @@
+"""
+Versioned Schema Migrations
+
+Applies the SQL files in src/persistence/migrations/ in filename order and
+records each one in a schema_migrations table together with a SHA-256
+checksum of its contents. Already-applied migrations are skipped; an
+applied migration whose file has since changed is reported (migrations are
+append-only - add a new file instead of editing an old one).
+
+Persistence providers call ensure_schema() instead of issuing CREATE TABLE
+before every operation. It runs the migrations at most once per process and
+database; after that it is a set lookup.
+"""
+
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from src.config.settings import settings
+from src.persistence.db_pool import DatabasePool, db_pool
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+# Arbitrary key for pg_advisory_lock so concurrent processes migrate one at a time
+_ADVISORY_LOCK_KEY = 727_114_001
+
+
+class MigrationError(RuntimeError):
+    """Raised when a migration fails or applied migrations were modified."""
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A single SQL migration file."""
+    version: str
+    path: Path
+    checksum: str
+
+    def read_sql(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+
+@dataclass
+class MigrationResult:
+    """Outcome of a migration run."""
+    applied: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+
+
+def discover_migrations(migrations_dir: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """List migration files in apply order.
+
+    Args:
+        migrations_dir: Directory containing *.sql migration files
+
+    Returns:
+        Migrations sorted by version (the filename without extension)
+    """
+    migrations = []
+    for path in sorted(migrations_dir.glob("*.sql")):
+        checksum = hashlib.sha256(path.read_bytes()).hexdigest()
+        migrations.append(Migration(version=path.stem, path=path, checksum=checksum))
+    return migrations
+
+
+class MigrationRunner:
+    """Applies pending migrations and tracks them in schema_migrations."""
+
+    def __init__(
+        self,
+        db_url: Optional[str] = None,
+        pool: Optional[DatabasePool] = None,
+        migrations_dir: Path = MIGRATIONS_DIR
+    ):
+        self.db_url = db_url or settings.DATABASE_URL
+        self.pool = pool or db_pool
+        self.migrations_dir = migrations_dir
+
+    async def run(self, strict: bool = False) -> MigrationResult:
+        """Apply every pending migration, each in its own transaction.
+
+        Args:
+            strict: Raise MigrationError if an applied migration's checksum
+                    no longer matches its file (otherwise only logged).
+
+        Returns:
+            MigrationResult listing applied, skipped and modified versions
+        """
+        result = MigrationResult()
+        migrations = discover_migrations(self.migrations_dir)
+
+        async with self.pool.acquire(self.db_url) as conn:
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version VARCHAR(255) PRIMARY KEY,
+                    checksum CHAR(64) NOT NULL,
+                    applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                );
+                """
+            )
+            await conn.execute("SELECT pg_advisory_lock($1)", _ADVISORY_LOCK_KEY)
+            try:
+                rows = await conn.fetch("SELECT version, checksum FROM schema_migrations")
+                applied: Dict[str, str] = {row["version"]: row["checksum"].strip() for row in rows}
+
+                for migration in migrations:
+                    if migration.version in applied:
+                        if applied[migration.version] != migration.checksum:
+                            logger.warning(f"[Migrations] {migration.version} changed after it was applied")
+                            result.modified.append(migration.version)
+                        else:
+                            result.skipped.append(migration.version)
+                        continue
+
+                    logger.info(f"[Migrations] Applying {migration.version}")
+                    try:
+                        async with conn.transaction():
+                            await conn.execute(migration.read_sql())
+                            await conn.execute(
+                                "INSERT INTO schema_migrations (version, checksum) VALUES ($1, $2)",
+                                migration.version,
+                                migration.checksum
+                            )
+                    except Exception as e:
+                        raise MigrationError(f"Migration {migration.version} failed: {e}") from e
+                    result.applied.append(migration.version)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", _ADVISORY_LOCK_KEY)
+
+        if strict and result.modified:
+            raise MigrationError(f"Applied migrations were modified: {', '.join(result.modified)}")
+        return result
+
+
+_verified: Set[str] = set()
+_verify_lock = asyncio.Lock()
+
+
+async def ensure_schema(db_url: Optional[str] = None, pool: Optional[DatabasePool] = None) -> None:
+    """Bring the schema up to date once per process and database.
+
+    Cheap after the first successful call. Failures are not cached, so the
+    next caller retries (e.g. once the database becomes reachable).
+
+    Args:
+        db_url: Database to verify (defaults to settings.DATABASE_URL)
+        pool: Connection pool to use (defaults to the shared pool)
+    """
+    db_url = db_url or settings.DATABASE_URL
+    if db_url in _verified:
+        return
+    async with _verify_lock:
+        if db_url in _verified:
+            return
+        result = await MigrationRunner(db_url, pool).run()
+        if result.applied:
+            logger.info(f"[Migrations] Applied: {', '.join(result.applied)}")
+        _verified.add(db_url)
+
+
+def reset_schema_cache() -> None:
+    """Forget which databases were verified (for tests)."""
+    _verified.clear()
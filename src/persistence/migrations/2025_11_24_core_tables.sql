@@ -0,0 +1,24 @@
+-- Core tables previously created ad hoc by the persistence providers
+-- (MessageStoreProvider, PostgreSQLMessageStore, AuditLogProvider).
+
+-- Conversation history
+CREATE TABLE IF NOT EXISTS agent_messages (
+    id SERIAL PRIMARY KEY,
+    session_id VARCHAR(255) NOT NULL,
+    timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    role VARCHAR(50) NOT NULL,  -- 'user', 'assistant', 'system', 'tool'
+    content TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_session_timestamp
+ON agent_messages(session_id, timestamp);
+
+-- Agent audit log
+CREATE TABLE IF NOT EXISTS audit_log (
+    id SERIAL PRIMARY KEY,
+    timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    agent_name VARCHAR(255) NOT NULL,
+    session_id VARCHAR(255),
+    operation VARCHAR(255) NOT NULL,
+    details TEXT
+);
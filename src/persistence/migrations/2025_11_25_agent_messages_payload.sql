@@ -0,0 +1,5 @@
+-- Store the full serialized ChatMessage (contents, tool calls, author, ids)
+-- alongside the plain-text columns so threads round-trip losslessly.
+-- Rows written before this migration keep message = NULL and are read back
+-- from role/content.
+ALTER TABLE agent_messages ADD COLUMN IF NOT EXISTS message JSONB;
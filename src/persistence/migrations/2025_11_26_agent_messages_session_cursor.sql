@@ -0,0 +1,5 @@
+-- Keyset access path for incremental / windowed history reads:
+--   WHERE session_id = $1 AND id > $2 ORDER BY id
+--   WHERE session_id = $1 ORDER BY id DESC LIMIT $2
+CREATE INDEX IF NOT EXISTS idx_agent_messages_session_id
+ON agent_messages(session_id, id);
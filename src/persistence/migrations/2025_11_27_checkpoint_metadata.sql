@@ -0,0 +1,11 @@
+-- Checkpoint storage metadata: codec/delta bookkeeping plus cheap columns for
+-- listing checkpoints without reading the state blob.
+ALTER TABLE workflow_checkpoints ADD COLUMN IF NOT EXISTS codec VARCHAR(16) DEFAULT 'json';
+ALTER TABLE workflow_checkpoints ADD COLUMN IF NOT EXISTS is_delta BOOLEAN DEFAULT false;
+ALTER TABLE workflow_checkpoints ADD COLUMN IF NOT EXISTS base_checkpoint_id UUID;
+ALTER TABLE workflow_checkpoints ADD COLUMN IF NOT EXISTS size_bytes INTEGER;
+ALTER TABLE workflow_checkpoints ADD COLUMN IF NOT EXISTS iteration_count INTEGER;
+
+CREATE INDEX IF NOT EXISTS idx_workflow_checkpoints_base
+ON workflow_checkpoints(base_checkpoint_id)
+WHERE base_checkpoint_id IS NOT NULL;
@@ -0,0 +1,9 @@
+-- Keyset pagination and "latest checkpoint per workflow" lookups:
+--   WHERE workflow_id = $1 AND (created_at, checkpoint_id) < ($2, $3)
+--   ORDER BY created_at DESC, checkpoint_id DESC
+--   SELECT DISTINCT ON (workflow_id) ... ORDER BY workflow_id, created_at DESC, checkpoint_id DESC
+CREATE INDEX IF NOT EXISTS idx_workflow_checkpoints_workflow_created
+ON workflow_checkpoints(workflow_id, created_at DESC, checkpoint_id DESC);
+
+-- Superseded by the composite index above
+DROP INDEX IF EXISTS idx_workflow_checkpoints_workflow_id;
@@ -0,0 +1,10 @@
+-- Shared ResearchExecutor results (RESEARCH_CACHE_BACKEND=postgres)
+CREATE TABLE IF NOT EXISTS research_cache (
+    key TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    created_at DOUBLE PRECISION NOT NULL,
+    accessed_at DOUBLE PRECISION NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_research_cache_accessed ON research_cache(accessed_at);
@@ -1,3 +1,9 @@
+import asyncio
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
 from src.agents import (
     LiaisonAgent,
     ProjectLeadAgent
@@ -7,58 +13,195 @@ from src.agents.domain_leads import DevDomainLead, DocsDomainLead
 from src.agents.executors import CoderExecutor, TesterExecutor, WriterExecutor
 from src.workflows.tlb_workflow import TLBWorkflow
 from src.workflows.olb_workflow import OLBWorkflow
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class StartupReport:
+    """Per-component startup timings, exposed by the /ready endpoint."""
+
+    def __init__(self):
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.ready = False
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def measure(self, component: str) -> Iterator[None]:
+        """Time a synchronous initialization step."""
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "failed"
+            raise
+        finally:
+            self.record(component, time.perf_counter() - started, status)
+
+    async def run(self, component: str, step: Awaitable[Any], timeout: Optional[float] = None) -> None:
+        """Time an asynchronous initialization step; failures are logged, not raised."""
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            result = await asyncio.wait_for(step, timeout)
+            if result is False:
+                status = "degraded"
+        except asyncio.TimeoutError:
+            status = "timeout"
+            logger.warning(f"[Startup] {component} did not finish within {timeout}s")
+        except Exception as e:
+            status = "failed"
+            logger.warning(f"[Startup] {component} failed: {e}")
+        self.record(component, time.perf_counter() - started, status)
+
+    def record(self, component: str, seconds: float, status: str = "ok") -> None:
+        self.components[component] = {"seconds": round(seconds, 4), "status": status}
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().record_startup_component(component, seconds)
+        except Exception:
+            pass
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def summary(self) -> str:
+        """One-line breakdown, slowest component first."""
+        ordered = sorted(self.components.items(), key=lambda item: item[1]["seconds"], reverse=True)
+        return ", ".join(
+            f"{name}={info['seconds']:.3f}s" + ("" if info["status"] == "ok" else f" ({info['status']})")
+            for name, info in ordered
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "elapsed_seconds": round(self.elapsed, 4), "components": dict(self.components)}
+
+
+class LazyAgentRegistry(Mapping):
+    """Read-only mapping that constructs each agent on first access.
+
+    Iterating or checking membership does not construct anything; the
+    workflows' ``.get(name)`` lookups build the agent the first time it is
+    actually needed.
+    """
+
+    def __init__(
+        self,
+        factories: Dict[str, Callable[[], Any]],
+        group: str,
+        report: Optional[StartupReport] = None
+    ):
+        """
+        Args:
+            factories: Agent name -> zero-argument constructor
+            group: Registry name used in the startup report (e.g. "executors")
+            report: Startup report that records construction times
+        """
+        self._factories = dict(factories)
+        self._instances: Dict[str, Any] = {}
+        self.group = group
+        self.report = report
+
+    def __getitem__(self, name: str) -> Any:
+        agent = self._instances.get(name)
+        if agent is None:
+            factory = self._factories[name]
+            if self.report is not None:
+                with self.report.measure(f"{self.group}.{name}"):
+                    agent = factory()
+            else:
+                agent = factory()
+            self._instances[name] = agent
+            logger.debug(f"[AgentFactory] Constructed {self.group}.{name}")
+        return agent
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._factories
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def loaded(self) -> List[str]:
+        return list(self._instances)
+
+    def preload(self) -> None:
+        """Construct every agent now."""
+        for name in self._factories:
+            self[name]
+
 
 class AgentFactory:
     """
     Factory to instantiate MAF Studio agents.
-    
+
     Phase 2 (Current): Full 4-Tier Hierarchy
     - Tier 1: Liaison
     - Tier 2: ProjectLead + DocumentationAgent
     - Tier 3: Domain Leads (Dev)
     - Tier 4: Executors (Coder, Tester, Writer)
     - Workflows: OLB (Strategy->Tactics), TLB (Tactics->Execution)
+
+    Domain Leads and Executors are constructed on first use unless
+    AGENT_LAZY_INIT is disabled. I/O-bound warm-up (database pool, project
+    context snapshot, tool schemas) runs concurrently in warm_up(), which
+    API servers start in the background and report through /ready.
     """
     @staticmethod
-    def create_hierarchy(message_store=None):
+    def create_hierarchy(message_store=None, lazy: Optional[bool] = None):
         from src.clients.litellm_client import LiteLLMChatClient
         from src.config.settings import settings
-        
-        # Create shared chat client
-        client = LiteLLMChatClient(model_name=settings.DEFAULT_MODEL)
+
+        lazy = settings.AGENT_LAZY_INIT if lazy is None else lazy
+        report = StartupReport()
+
+        # Create shared chat client (owns the process-wide HTTP connection pool)
+        with report.measure("chat_client"):
+            client = LiteLLMChatClient(model_name=settings.DEFAULT_MODEL)
 
         # --- Tier 4: Executors ---
-        executors = {
-            "coder": CoderExecutor(chat_client=client),
-            "tester": TesterExecutor(chat_client=client),
-            "writer": WriterExecutor(chat_client=client)
-        }
+        executors = LazyAgentRegistry({
+            "coder": lambda: CoderExecutor(chat_client=client),
+            "tester": lambda: TesterExecutor(chat_client=client),
+            "writer": lambda: WriterExecutor(chat_client=client)
+        }, group="executors", report=report)
 
         # --- Workflows: TLB ---
         tlb_workflow = TLBWorkflow(executors=executors)
 
         # --- Tier 3: Domain Leads ---
-        dev_dl = DevDomainLead(chat_client=client, tlb_workflow=tlb_workflow)
-        # Future: qa_dl, docs_dl
-
-        docs_dl = DocsDomainLead(chat_client=client, tlb_workflow=tlb_workflow)
-
-        domain_leads = {
-            "Development": dev_dl,
-            "Documentation": docs_dl
-        }
+        # Future: qa_dl
+        domain_leads = LazyAgentRegistry({
+            "Development": lambda: DevDomainLead(chat_client=client, tlb_workflow=tlb_workflow),
+            "Documentation": lambda: DocsDomainLead(chat_client=client, tlb_workflow=tlb_workflow)
+        }, group="domain_leads", report=report)
 
         # --- Workflows: OLB ---
         olb_workflow = OLBWorkflow(domain_leads=domain_leads)
 
+        if not lazy:
+            executors.preload()
+            domain_leads.preload()
+
         # --- Tier 2: Orchestration ---
-        project_lead = ProjectLeadAgent(chat_client=client, olb_workflow=olb_workflow)
-        documentation_agent = DocumentationAgent(chat_client=client)
+        with report.measure("project_lead"):
+            project_lead = ProjectLeadAgent(chat_client=client, olb_workflow=olb_workflow)
+        with report.measure("documentation_agent"):
+            documentation_agent = DocumentationAgent(chat_client=client)
 
         # --- Tier 1: Interface ---
-        liaison = LiaisonAgent(project_lead=project_lead, chat_client=client)
+        with report.measure("liaison"):
+            liaison = LiaisonAgent(project_lead=project_lead, chat_client=client)
 
         return {
+            "chat_client": client,
             "liaison": liaison,
             "project_lead": project_lead,
             "documentation_agent": documentation_agent,
@@ -67,5 +210,51 @@ class AgentFactory:
             "workflows": {
                 "tlb": tlb_workflow,
                 "olb": olb_workflow
-            }
+            },
+            "startup": report
+        }
+
+    @staticmethod
+    async def warm_up(hierarchy) -> StartupReport:
+        """Run the I/O-bound initialization steps concurrently.
+
+        Failures are recorded in the startup report and logged; the agents
+        keep working (the database falls back to direct connections and the
+        project context is built on first use).
+
+        Returns:
+            The hierarchy's StartupReport, marked ready
+        """
+        from src.clients.tool_schemas import tool_schema_cache
+        from src.config.settings import settings
+        from src.persistence.db_pool import db_pool
+        from src.services.project_context_service import project_context_service
+
+        report = hierarchy.setdefault("startup", StartupReport())
+        timeout = settings.STARTUP_WARMUP_TIMEOUT
+        steps = {
+            "database_pool": db_pool.open(),
+            "project_context": project_context_service.get_snapshot()
         }
+        project_lead = hierarchy.get("project_lead")
+        if project_lead is not None:
+            steps["tool_schemas"] = asyncio.to_thread(tool_schema_cache.compile, project_lead.chat_options.tools)
+
+        await asyncio.gather(*(report.run(name, step, timeout) for name, step in steps.items()))
+        report.ready = True
+        logger.info(f"[Startup] Ready in {report.elapsed:.3f}s: {report.summary()}")
+        return report
+
+    @staticmethod
+    async def create_hierarchy_async(message_store=None, lazy: Optional[bool] = None):
+        """create_hierarchy() followed by warm_up()."""
+        hierarchy = AgentFactory.create_hierarchy(message_store=message_store, lazy=lazy)
+        await AgentFactory.warm_up(hierarchy)
+        return hierarchy
+
+    @staticmethod
+    async def shutdown(hierarchy):
+        """Release resources held by a hierarchy (e.g. the shared HTTP pool)."""
+        client = hierarchy.get("chat_client") if hierarchy else None
+        if client is not None:
+            await client.aclose()
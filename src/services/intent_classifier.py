@@ -0,0 +1,272 @@
+"""
+Intent Classifier
+
+Tiered classification of user messages for the LiaisonAgent, cheapest stage
+first; a stage answers only when its confidence clears its threshold:
+
+1. Cache: results are remembered per normalized message (LRU).
+2. Rules: keyword/regex patterns for greetings, build instructions and
+   questions (INTENT_RULE_THRESHOLD).
+3. Centroids: nearest-centroid model over hashed word and character n-gram
+   embeddings, trained on the LLM's past classifications and persisted to
+   INTENT_EXAMPLES_PATH (INTENT_CENTROID_THRESHOLD).
+4. LLM: the caller's fallback, whose answers become new training examples.
+"""
+
+import math
+import os
+import re
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.utils import get_logger, serialization
+
+logger = get_logger(__name__)
+
+QUESTION = "QUESTION"
+IDEA = "IDEA"
+CHIT_CHAT = "CHIT_CHAT"
+INTENTS = (QUESTION, IDEA, CHIT_CHAT)
+
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"[a-z0-9']+")
+
+# (intent, confidence, pattern) - first match wins, so specific rules come first
+_RULES: List[Tuple[str, float, "re.Pattern[str]"]] = [
+    (CHIT_CHAT, 0.95, re.compile(
+        r"^(hi|hello|hey|hiya|yo|howdy|greetings|good (morning|afternoon|evening)|thanks|thank you|thx|"
+        r"cheers|bye|goodbye|see you|how are you|how's it going|what's up|nice to meet you)"
+        r"( there| again| all| team| liaison)?[\s!.,?]*(how are you( doing)?)?[\s!.?]*$"
+    )),
+    (IDEA, 0.9, re.compile(
+        r"^((let's|lets|let us|please)\s+)?(build|create|make|implement|add|write|generate|develop|refactor|fix|"
+        r"set up|setup|design|start|scaffold|prototype|migrate|update|remove|rename)\b"
+    )),
+    (IDEA, 0.85, re.compile(
+        r"^(i want to|i'd like to|i would like to|we need to|we should|can you|could you|would you|please)\s+"
+        r"(build|create|make|implement|add|write|generate|develop|refactor|fix|set up|design|start)\b"
+    )),
+    (IDEA, 0.8, re.compile(r"^(i have an idea|new idea|idea:|project idea|here's an idea)")),
+    (QUESTION, 0.9, re.compile(
+        r"^(what|who|why|where|when|which|how)\b.*\?$|^(what is|what are|who are you|what can you do|"
+        r"how does|how do|explain|describe|tell me about)\b"
+    )),
+    (QUESTION, 0.85, re.compile(r"^(is|are|does|do|can|could|should|will|would|has|have)\b.*\?$")),
+]
+
+
+def normalize(message: str) -> str:
+    """Lowercase and collapse whitespace (the cache and training key)."""
+    return _WHITESPACE.sub(" ", message.strip().lower())
+
+
+def parse_intent(text: str) -> str:
+    """Extract an intent label from an LLM answer (QUESTION when unrecognized)."""
+    upper = str(text).upper().replace("-", "_").replace(" ", "_")
+    for intent in (IDEA, CHIT_CHAT, QUESTION):
+        if intent in upper:
+            return intent
+    return QUESTION
+
+
+@dataclass
+class IntentResult:
+    intent: str
+    confidence: float
+    source: str  # cache | rules | centroid | llm
+
+
+class RuleClassifier:
+    """Keyword/regex fast path."""
+
+    def classify(self, normalized: str) -> Optional[IntentResult]:
+        for intent, confidence, pattern in _RULES:
+            if pattern.search(normalized):
+                return IntentResult(intent, confidence, "rules")
+        if normalized.endswith("?"):
+            return IntentResult(QUESTION, 0.6, "rules")
+        return None
+
+
+class CentroidClassifier:
+    """Nearest-centroid classifier over hashed n-gram embeddings."""
+
+    def __init__(self, dimensions: int = 1024, temperature: float = 0.1, min_examples: int = 3):
+        """
+        Args:
+            dimensions: Size of the hashed embedding
+            temperature: Softmax temperature applied to cosine similarities
+            min_examples: Examples an intent needs before it is predicted
+        """
+        self.dimensions = dimensions
+        self.temperature = temperature
+        self.min_examples = min_examples
+        self._sums: Dict[str, List[float]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def embed(self, normalized: str) -> List[float]:
+        """L2-normalized hashed bag of words, word bigrams and character trigrams."""
+        vector = [0.0] * self.dimensions
+        words = _WORD.findall(normalized)
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        padded = f" {' '.join(words)} "
+        features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+        for feature in features:
+            vector[zlib.crc32(feature.encode("utf-8")) % self.dimensions] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm else vector
+
+    def learn(self, normalized: str, intent: str) -> None:
+        vector = self.embed(normalized)
+        total = self._sums.setdefault(intent, [0.0] * self.dimensions)
+        for i, value in enumerate(vector):
+            if value:
+                total[i] += value
+        self._counts[intent] = self._counts.get(intent, 0) + 1
+
+    @property
+    def trained_intents(self) -> List[str]:
+        return [intent for intent, count in self._counts.items() if count >= self.min_examples]
+
+    def classify(self, normalized: str) -> Optional[IntentResult]:
+        intents = self.trained_intents
+        if len(intents) < 2:
+            return None
+        vector = self.embed(normalized)
+        similarities = {}
+        for intent in intents:
+            centroid = self._sums[intent]
+            norm = math.sqrt(sum(v * v for v in centroid)) or 1.0
+            similarities[intent] = sum(a * b for a, b in zip(vector, centroid) if a) / norm
+
+        top = max(similarities.values())
+        weights = {intent: math.exp((s - top) / self.temperature) for intent, s in similarities.items()}
+        best = max(weights, key=weights.get)
+        return IntentResult(best, weights[best] / sum(weights.values()), "centroid")
+
+
+class IntentClassifier:
+    """Cache -> rules -> centroids -> LLM fallback."""
+
+    def __init__(
+        self,
+        rule_threshold: Optional[float] = None,
+        centroid_threshold: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        examples_path: Optional[str] = "",
+        min_examples: Optional[int] = None
+    ):
+        """
+        Args:
+            rule_threshold: Minimum rule confidence to skip later stages
+            centroid_threshold: Minimum centroid confidence to skip the LLM
+            cache_size: Normalized messages remembered
+            examples_path: JSONL file of training examples (None disables
+                persistence; "" uses INTENT_EXAMPLES_PATH)
+            min_examples: Examples per intent before the centroid stage is used
+        """
+        self.rule_threshold = settings.INTENT_RULE_THRESHOLD if rule_threshold is None else rule_threshold
+        self.centroid_threshold = (
+            settings.INTENT_CENTROID_THRESHOLD if centroid_threshold is None else centroid_threshold
+        )
+        self.cache_size = cache_size or settings.INTENT_CACHE_SIZE
+        self.examples_path = settings.INTENT_EXAMPLES_PATH if examples_path == "" else examples_path
+
+        self.rules = RuleClassifier()
+        self.centroids = CentroidClassifier(
+            min_examples=settings.INTENT_MIN_EXAMPLES if min_examples is None else min_examples
+        )
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._load_examples()
+
+    async def classify(
+        self,
+        message: str,
+        llm_fallback: Optional[Callable[[str], Awaitable[str]]] = None
+    ) -> IntentResult:
+        """Classify ``message``.
+
+        Args:
+            message: Raw user message
+            llm_fallback: Coroutine returning the LLM's raw answer, used when
+                the local stages are not confident enough
+
+        Returns:
+            IntentResult (the best local guess if there is no fallback)
+        """
+        normalized = normalize(message)
+        cached = self._cache.get(normalized)
+        if cached is not None:
+            self._cache.move_to_end(normalized)
+            return self._done(IntentResult(cached, 1.0, "cache"), normalized, cache=False)
+
+        candidates = []
+        for stage, threshold in ((self.rules, self.rule_threshold), (self.centroids, self.centroid_threshold)):
+            result = stage.classify(normalized)
+            if result is None:
+                continue
+            if result.confidence >= threshold:
+                return self._done(result, normalized)
+            candidates.append(result)
+
+        if llm_fallback is None:
+            best = max(candidates, key=lambda r: r.confidence, default=IntentResult(QUESTION, 0.0, "default"))
+            return self._done(best, normalized)
+
+        result = IntentResult(parse_intent(await llm_fallback(message)), 1.0, "llm")
+        self.learn(message, result.intent)
+        return self._done(result, normalized)
+
+    def learn(self, message: str, intent: str) -> None:
+        """Add a labelled example to the centroid model (and the examples file)."""
+        if intent not in INTENTS:
+            return
+        normalized = normalize(message)
+        self.centroids.learn(normalized, intent)
+        if not self.examples_path:
+            return
+        try:
+            directory = os.path.dirname(self.examples_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.examples_path, "a", encoding="utf-8") as f:
+                f.write(serialization.dumps_str({"text": normalized, "intent": intent}) + "\n")
+        except OSError as e:
+            logger.warning(f"[IntentClassifier] Could not persist example: {e}")
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def _done(self, result: IntentResult, normalized: str, cache: bool = True) -> IntentResult:
+        if cache:
+            self._cache[normalized] = result.intent
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        logger.debug(f"[IntentClassifier] {result.intent} ({result.source}, {result.confidence:.2f})")
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().record_intent_classification(result.source, result.intent)
+        except Exception:
+            pass
+        return result
+
+    def _load_examples(self) -> None:
+        if not self.examples_path or not os.path.exists(self.examples_path):
+            return
+        loaded = 0
+        try:
+            with open(self.examples_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        example = serialization.loads(line)
+                    except ValueError:
+                        continue
+                    if example.get("intent") in INTENTS and example.get("text"):
+                        self.centroids.learn(example["text"], example["intent"])
+                        loaded += 1
+        except OSError as e:
+            logger.warning(f"[IntentClassifier] Could not load examples: {e}")
+        logger.info(f"[IntentClassifier] Loaded {loaded} training examples")
@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Gauge, start_http_server
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,6 +39,143 @@ class MetricsService:
             'Number of currently active workflows'
         )
 
+        # LLM HTTP connection pool
+        self.llm_http_connections = Gauge(
+            'maf_llm_http_connections',
+            'Connections in the shared LLM HTTP pool by state',
+            ['state']
+        )
+        self.llm_http_pool_wait_seconds = Histogram(
+            'maf_llm_http_pool_wait_seconds',
+            'Time spent waiting for a pooled LLM HTTP connection',
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+        )
+
+        # Database connection pool
+        self.db_pool_connections = Gauge(
+            'maf_db_pool_connections',
+            'Connections in the shared asyncpg pool by state',
+            ['state']
+        )
+        self.db_pool_wait_seconds = Histogram(
+            'maf_db_pool_wait_seconds',
+            'Time spent waiting to acquire a pooled database connection',
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+        )
+
+        # Audit log write-behind buffer
+        self.audit_queue_depth = Gauge(
+            'maf_audit_queue_depth',
+            'Audit events waiting in the write-behind buffer'
+        )
+        self.audit_flush_seconds = Histogram(
+            'maf_audit_flush_seconds',
+            'Latency of audit log batch flushes',
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+        )
+        self.audit_events_written_total = Counter(
+            'maf_audit_events_written_total',
+            'Audit events written to the database'
+        )
+        self.audit_overflow_events_total = Counter(
+            'maf_audit_overflow_events_total',
+            'Audit events dropped or spilled to disk',
+            ['reason']
+        )
+
+        # LLM response cache
+        self.llm_cache_requests_total = Counter(
+            'maf_llm_cache_requests_total',
+            'LLM response cache lookups by result and tier',
+            ['result', 'tier']
+        )
+        self.llm_cache_saved_tokens_total = Counter(
+            'maf_llm_cache_saved_tokens_total',
+            'Tokens not sent to the model thanks to cache hits'
+        )
+        self.llm_cache_saved_seconds_total = Counter(
+            'maf_llm_cache_saved_seconds_total',
+            'Upstream latency avoided thanks to cache hits'
+        )
+
+        # LLM request coalescing
+        self.llm_coalesced_requests_total = Counter(
+            'maf_llm_coalesced_requests_total',
+            'LLM requests that joined an identical in-flight call',
+            ['group']
+        )
+
+        # LLM admission control
+        self.llm_admission_limit = Gauge(
+            'maf_llm_admission_limit',
+            'Current adaptive concurrency limit per model',
+            ['model']
+        )
+        self.llm_admission_in_flight = Gauge(
+            'maf_llm_admission_in_flight',
+            'Admitted LLM requests in progress per model',
+            ['model']
+        )
+        self.llm_admission_queue_depth = Gauge(
+            'maf_llm_admission_queue_depth',
+            'LLM requests waiting for admission per model',
+            ['model']
+        )
+        self.llm_admission_wait_seconds = Histogram(
+            'maf_llm_admission_wait_seconds',
+            'Time LLM requests spent queued for admission',
+            ['model'],
+            buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0)
+        )
+        self.llm_admission_rejected_total = Counter(
+            'maf_llm_admission_rejected_total',
+            'LLM requests rejected by admission control',
+            ['model', 'reason']
+        )
+
+        # LLM context window budget
+        self.llm_prompt_tokens = Histogram(
+            'maf_llm_prompt_tokens',
+            'Estimated prompt tokens per LLM request after budgeting',
+            buckets=(256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+        )
+        self.llm_context_compactions_total = Counter(
+            'maf_llm_context_compactions_total',
+            'Requests changed to fit the context window by action',
+            ['action']
+        )
+
+        # Research cache
+        self.research_cache_requests_total = Counter(
+            'maf_research_cache_requests_total',
+            'ResearchExecutor cache lookups by result and tier',
+            ['result', 'tier']
+        )
+
+        # ChromaDB offline write queue
+        self.chroma_write_queue_depth = Gauge(
+            'maf_chroma_write_queue_depth',
+            'ChromaDB writes queued while the server was unreachable'
+        )
+        self.chroma_write_queue_dropped_total = Counter(
+            'maf_chroma_write_queue_dropped_total',
+            'Queued ChromaDB writes dropped to stay within CHROMA_WRITE_QUEUE_MAX_BYTES'
+        )
+
+        # Liaison intent classification
+        self.intent_classifications_total = Counter(
+            'maf_intent_classifications_total',
+            'User message intent classifications by deciding stage',
+            ['source', 'intent']
+        )
+
+        # Startup
+        self.startup_component_seconds = Gauge(
+            'maf_startup_component_seconds',
+            'Time spent initializing each startup component',
+            ['component']
+        )
+
     def start_server(self, port: int = 8001):
         """Start the Prometheus metrics server."""
         try:
@@ -56,3 +193,70 @@ class MetricsService:
 
     def record_decision(self, category: str):
         self.decisions_stored_total.labels(category=category).inc()
+
+    def record_http_pool_stats(self, in_use: int, idle: int, queued: int):
+        self.llm_http_connections.labels(state="in_use").set(in_use)
+        self.llm_http_connections.labels(state="idle").set(idle)
+        self.llm_http_connections.labels(state="queued").set(queued)
+
+    def observe_http_pool_wait(self, seconds: float):
+        self.llm_http_pool_wait_seconds.observe(seconds)
+
+    def record_db_pool_stats(self, size: int, idle: int, in_use: int):
+        self.db_pool_connections.labels(state="size").set(size)
+        self.db_pool_connections.labels(state="idle").set(idle)
+        self.db_pool_connections.labels(state="in_use").set(in_use)
+
+    def observe_db_pool_wait(self, seconds: float):
+        self.db_pool_wait_seconds.observe(seconds)
+
+    def record_audit_queue_depth(self, depth: int):
+        self.audit_queue_depth.set(depth)
+
+    def observe_audit_flush(self, seconds: float, count: int):
+        self.audit_flush_seconds.observe(seconds)
+        self.audit_events_written_total.inc(count)
+
+    def record_audit_overflow(self, reason: str, count: int = 1):
+        self.audit_overflow_events_total.labels(reason=reason).inc(count)
+
+    def record_llm_cache_lookup(self, result: str, tier: str, saved_tokens: int = 0, saved_seconds: float = 0.0):
+        self.llm_cache_requests_total.labels(result=result, tier=tier).inc()
+        if saved_tokens:
+            self.llm_cache_saved_tokens_total.inc(saved_tokens)
+        if saved_seconds:
+            self.llm_cache_saved_seconds_total.inc(saved_seconds)
+
+    def record_llm_coalesced(self, group: str):
+        self.llm_coalesced_requests_total.labels(group=group).inc()
+
+    def record_llm_admission_state(self, model: str, limit: int, in_flight: int, queue_depth: int):
+        self.llm_admission_limit.labels(model=model).set(limit)
+        self.llm_admission_in_flight.labels(model=model).set(in_flight)
+        self.llm_admission_queue_depth.labels(model=model).set(queue_depth)
+
+    def observe_llm_admission_wait(self, model: str, seconds: float):
+        self.llm_admission_wait_seconds.labels(model=model).observe(seconds)
+
+    def record_llm_admission_rejected(self, model: str, reason: str):
+        self.llm_admission_rejected_total.labels(model=model, reason=reason).inc()
+
+    def observe_llm_prompt_tokens(self, tokens: int):
+        self.llm_prompt_tokens.observe(tokens)
+
+    def record_llm_context_compaction(self, action: str):
+        self.llm_context_compactions_total.labels(action=action).inc()
+
+    def record_startup_component(self, component: str, seconds: float):
+        self.startup_component_seconds.labels(component=component).set(seconds)
+
+    def record_intent_classification(self, source: str, intent: str):
+        self.intent_classifications_total.labels(source=source, intent=intent).inc()
+
+    def record_research_cache_lookup(self, result: str, tier: str):
+        self.research_cache_requests_total.labels(result=result, tier=tier).inc()
+
+    def record_chroma_write_queue(self, depth: int, dropped: int = 0):
+        self.chroma_write_queue_depth.set(depth)
+        if dropped:
+            self.chroma_write_queue_dropped_total.inc(dropped)
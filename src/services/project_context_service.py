@@ -0,0 +1,377 @@
+"""
+Project Context Service
+
+Shared, cached snapshot of a project's file tree and key documents (README,
+project brief, guidelines) for the agents' prompts.
+
+- Snapshots are built off the event loop on first use and cached per
+  project_id (the active project from project_context, or the default
+  project root when none is set).
+- Refreshes are incremental: only directories whose mtime changed are
+  re-listed and only changed documents are re-read. A refresh runs when the
+  snapshot is older than PROJECT_CONTEXT_REFRESH_SECONDS, or immediately
+  after a filesystem event when the optional 'watchdog' package is
+  installed (inotify on Linux).
+- render() produces a size-bounded text block; ProjectContextProvider
+  injects it into an agent's instructions on every run, so agents always
+  see the current snapshot without re-scanning at construction time.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, MutableSequence, Optional, Sequence, Tuple
+
+from agent_framework import ChatMessage, Context, ContextProvider
+
+from src.config.settings import settings
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Optional dependency
+    FileSystemEventHandler = object
+    Observer = None
+
+DEFAULT_DOCS = ("README.md", ".meta/project_brief.md", ".ai/project_guidelines.md")
+TRUNCATED = "\n[... truncated]"
+
+
+@dataclass
+class DirectoryListing:
+    """Non-hidden entries of one directory, as of ``mtime_ns``."""
+    mtime_ns: int
+    dirs: List[str]
+    files: List[str]
+
+
+@dataclass
+class ProjectSnapshot:
+    """File tree (up to max_depth) and documents of one project root."""
+    root: str
+    max_depth: int
+    directories: Dict[str, DirectoryListing] = field(default_factory=dict)
+    # relative path -> (mtime_ns, content); missing documents are not stored
+    documents: Dict[str, Tuple[int, str]] = field(default_factory=dict)
+    version: int = 0
+    refreshed_at: float = 0.0
+    dirty: bool = False
+
+    def render_tree(self, max_lines: int) -> str:
+        """Indented tree in the 'Project Structure' format used in prompts."""
+        lines: List[str] = []
+
+        def visit(rel: str, level: int) -> None:
+            listing = self.directories.get(rel)
+            if listing is None:
+                return
+            name = os.path.basename(rel) if rel else os.path.basename(self.root.rstrip(os.sep))
+            lines.append(f"{' ' * 4 * level}{name}/")
+            for sub in listing.dirs:
+                visit(os.path.join(rel, sub) if rel else sub, level + 1)
+            lines.extend(f"{' ' * 4 * (level + 1)}{f}" for f in listing.files)
+
+        visit("", 0)
+        if len(lines) > max_lines:
+            hidden = len(lines) - max_lines
+            lines = lines[:max_lines] + [f"... ({hidden} more entries)"]
+        return "Project Structure:\n" + "\n".join(lines)
+
+    def render(
+        self,
+        max_chars: int,
+        include_tree: bool = True,
+        docs: Sequence[str] = DEFAULT_DOCS,
+        max_tree_lines: int = 200
+    ) -> str:
+        """Render the snapshot into at most ``max_chars`` characters.
+
+        The tree takes at most half of the budget; the documents share the rest.
+        """
+        sections: List[str] = []
+        if include_tree and self.directories:
+            tree = self.render_tree(max_tree_lines)
+            limit = max_chars // 2 if docs else max_chars
+            sections.append(tree if len(tree) <= limit else tree[:limit] + TRUNCATED)
+
+        present = [name for name in docs if name in self.documents]
+        remaining = max_chars - sum(len(s) + 2 for s in sections)
+        for index, name in enumerate(present):
+            header = f"# {os.path.basename(name)}\n"
+            share = remaining // (len(present) - index) - len(header) - 2
+            if share <= len(TRUNCATED):
+                break
+            content = self.documents[name][1]
+            if len(content) > share:
+                content = content[:share - len(TRUNCATED)] + TRUNCATED
+            section = header + content
+            sections.append(section)
+            remaining -= len(section) + 2
+        return "\n\n".join(sections)
+
+
+class _DirtyHandler(FileSystemEventHandler):
+    """Marks a snapshot dirty on any filesystem event."""
+
+    def __init__(self, snapshot: ProjectSnapshot):
+        super().__init__()
+        self.snapshot = snapshot
+
+    def on_any_event(self, event: Any) -> None:
+        self.snapshot.dirty = True
+
+
+class ProjectContextService:
+    """Builds, caches and incrementally refreshes project snapshots."""
+
+    def __init__(
+        self,
+        default_root: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        refresh_interval: Optional[float] = None,
+        max_doc_chars: Optional[int] = None,
+        watch: Optional[bool] = None,
+        docs: Sequence[str] = DEFAULT_DOCS
+    ):
+        """
+        Args:
+            default_root: Root used when no project is active
+            max_depth: Directory depth included in the tree
+            refresh_interval: Seconds before a snapshot is re-validated
+            max_doc_chars: Characters read per document
+            watch: Use watchdog (inotify) to refresh right after changes
+            docs: Documents (relative to the root) kept in the snapshot
+        """
+        self.default_root = default_root or settings.PROJECT_CONTEXT_ROOT
+        self.max_depth = settings.PROJECT_CONTEXT_MAX_DEPTH if max_depth is None else max_depth
+        self.refresh_interval = (
+            settings.PROJECT_CONTEXT_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        )
+        self.max_doc_chars = max_doc_chars or settings.PROJECT_CONTEXT_MAX_DOC_CHARS
+        self.watch = settings.PROJECT_CONTEXT_WATCH if watch is None else watch
+        self.docs = tuple(docs)
+
+        self._roots: Dict[Optional[int], str] = {}
+        self._snapshots: Dict[Optional[int], ProjectSnapshot] = {}
+        self._locks: Dict[Optional[int], asyncio.Lock] = {}
+        self._observers: Dict[str, Any] = {}
+        self._observer_lock = threading.Lock()
+
+    def register(self, project_id: Optional[int], root: str) -> None:
+        """Associate a project with its root directory (drops a stale snapshot)."""
+        root = os.path.abspath(root)
+        if self._roots.get(project_id) != root:
+            self._roots[project_id] = root
+            self._snapshots.pop(project_id, None)
+
+    async def get_snapshot(self, project_id: Optional[int] = None) -> ProjectSnapshot:
+        """Return the project's snapshot, building or refreshing it if needed.
+
+        Args:
+            project_id: Project to snapshot (None for the default root)
+
+        Returns:
+            The cached ProjectSnapshot
+        """
+        snapshot = self._snapshots.get(project_id)
+        if snapshot is not None and not self._needs_refresh(snapshot):
+            return snapshot
+
+        lock = self._locks.setdefault(project_id, asyncio.Lock())
+        async with lock:
+            snapshot = self._snapshots.get(project_id)
+            if snapshot is None:
+                root = await self._resolve_root(project_id)
+                snapshot = await asyncio.to_thread(self._build, root)
+                self._snapshots[project_id] = snapshot
+                self._start_watching(snapshot)
+            elif self._needs_refresh(snapshot):
+                await asyncio.to_thread(self._refresh, snapshot)
+        return snapshot
+
+    async def render(
+        self,
+        project_id: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        include_tree: bool = True,
+        docs: Optional[Sequence[str]] = None
+    ) -> str:
+        """Size-bounded text rendering of the project's snapshot."""
+        snapshot = await self.get_snapshot(project_id)
+        return snapshot.render(
+            max_chars or settings.PROJECT_CONTEXT_MAX_CHARS,
+            include_tree=include_tree,
+            docs=self.docs if docs is None else docs,
+            max_tree_lines=settings.PROJECT_CONTEXT_MAX_TREE_LINES
+        )
+
+    def invalidate(self, project_id: Optional[int] = None) -> None:
+        """Force a refresh on the next access."""
+        snapshot = self._snapshots.get(project_id)
+        if snapshot is not None:
+            snapshot.dirty = True
+
+    def close(self) -> None:
+        """Stop filesystem watchers."""
+        with self._observer_lock:
+            for observer in self._observers.values():
+                observer.stop()
+            self._observers.clear()
+
+    def _needs_refresh(self, snapshot: ProjectSnapshot) -> bool:
+        return snapshot.dirty or time.monotonic() - snapshot.refreshed_at >= self.refresh_interval
+
+    async def _resolve_root(self, project_id: Optional[int]) -> str:
+        root = self._roots.get(project_id)
+        if root is None and project_id is not None:
+            try:
+                from src.services.project_service import ProjectService
+                project = await ProjectService(settings.DATABASE_URL).get_project(project_id)
+                if project is not None:
+                    root = project.path
+            except Exception as e:
+                logger.warning(f"[ProjectContext] Could not look up project {project_id}: {e}")
+        if root is None:
+            root = self.default_root if os.path.isdir(self.default_root) else os.getcwd()
+        root = os.path.abspath(root)
+        self._roots[project_id] = root
+        return root
+
+    # --- Scanning (runs in a worker thread) ---
+
+    def _build(self, root: str) -> ProjectSnapshot:
+        started = time.perf_counter()
+        snapshot = ProjectSnapshot(root=root, max_depth=self.max_depth)
+        self._refresh(snapshot)
+        logger.info(
+            f"[ProjectContext] Snapshot of {root}: {len(snapshot.directories)} directories, "
+            f"{len(snapshot.documents)} documents in {time.perf_counter() - started:.3f}s"
+        )
+        return snapshot
+
+    def _refresh(self, snapshot: ProjectSnapshot) -> None:
+        """Re-list changed directories and re-read changed documents."""
+        snapshot.dirty = False
+        changed = self._refresh_directory(snapshot, "", 0)
+        for name in self.docs:
+            changed |= self._refresh_document(snapshot, name)
+        if changed:
+            snapshot.version += 1
+        snapshot.refreshed_at = time.monotonic()
+
+    def _refresh_directory(self, snapshot: ProjectSnapshot, rel: str, depth: int) -> bool:
+        path = os.path.join(snapshot.root, rel)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return self._drop_directory(snapshot, rel)
+
+        listing = snapshot.directories.get(rel)
+        changed = False
+        if listing is None or listing.mtime_ns != mtime_ns:
+            dirs, files = [], []
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.name.startswith("."):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name != "__pycache__":
+                                dirs.append(entry.name)
+                        else:
+                            files.append(entry.name)
+            except OSError as e:
+                logger.warning(f"[ProjectContext] Cannot list {path}: {e}")
+            if listing is not None:
+                for removed in set(listing.dirs) - set(dirs):
+                    self._drop_directory(snapshot, os.path.join(rel, removed) if rel else removed)
+            listing = DirectoryListing(mtime_ns, sorted(dirs), sorted(files))
+            snapshot.directories[rel] = listing
+            changed = True
+
+        if depth < snapshot.max_depth:
+            for sub in listing.dirs:
+                changed |= self._refresh_directory(snapshot, os.path.join(rel, sub) if rel else sub, depth + 1)
+        return changed
+
+    @staticmethod
+    def _drop_directory(snapshot: ProjectSnapshot, rel: str) -> bool:
+        prefix = rel + os.sep
+        doomed = [key for key in snapshot.directories if key == rel or key.startswith(prefix)]
+        for key in doomed:
+            del snapshot.directories[key]
+        return bool(doomed)
+
+    def _refresh_document(self, snapshot: ProjectSnapshot, name: str) -> bool:
+        path = os.path.join(snapshot.root, name)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return snapshot.documents.pop(name, None) is not None
+        current = snapshot.documents.get(name)
+        if current is not None and current[0] == mtime_ns:
+            return False
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                content = f.read(self.max_doc_chars + 1)
+        except OSError as e:
+            logger.warning(f"[ProjectContext] Could not read {path}: {e}")
+            return False
+        if len(content) > self.max_doc_chars:
+            content = content[:self.max_doc_chars] + TRUNCATED
+        snapshot.documents[name] = (mtime_ns, content)
+        return True
+
+    def _start_watching(self, snapshot: ProjectSnapshot) -> None:
+        if not self.watch or Observer is None:
+            return
+        with self._observer_lock:
+            if snapshot.root in self._observers:
+                return
+            try:
+                observer = Observer()
+                observer.daemon = True
+                observer.schedule(_DirtyHandler(snapshot), snapshot.root, recursive=True)
+                observer.start()
+                self._observers[snapshot.root] = observer
+            except Exception as e:
+                logger.warning(f"[ProjectContext] Falling back to mtime polling for {snapshot.root}: {e}")
+
+
+class ProjectContextProvider(ContextProvider):
+    """Adds the active project's snapshot to an agent's instructions on every run."""
+
+    def __init__(
+        self,
+        service: Optional[ProjectContextService] = None,
+        include_tree: bool = True,
+        docs: Optional[Sequence[str]] = None,
+        max_chars: Optional[int] = None
+    ):
+        self.service = service or project_context_service
+        self.include_tree = include_tree
+        self.docs = docs
+        self.max_chars = max_chars
+
+    async def invoking(self, messages: ChatMessage | MutableSequence[ChatMessage], **kwargs: Any) -> Context:
+        from src.persistence.project_context import _project_id_ctx
+        try:
+            text = await self.service.render(
+                _project_id_ctx.get(),
+                max_chars=self.max_chars,
+                include_tree=self.include_tree,
+                docs=self.docs
+            )
+        except Exception as e:
+            logger.warning(f"[ProjectContext] Could not render project context: {e}")
+            return Context()
+        return Context(instructions=f"Current Project Context:\n\n{text}" if text else None)
+
+
+# Global instance shared by all agents
+project_context_service = ProjectContextService()
@@ -4,7 +4,7 @@ Manages project registration, metadata, and validation.
 """
 
 import os
-import asyncpg
+from src.persistence.db_pool import DatabasePool, db_pool
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 
@@ -15,11 +15,9 @@ class Project(BaseModel):
     created_at: Optional[Any] = None
 
 class ProjectService:
-    def __init__(self, db_url: str):
+    def __init__(self, db_url: str, pool: Optional[DatabasePool] = None):
         self.db_url = db_url
-
-    async def _get_conn(self):
-        return await asyncpg.connect(self.db_url)
+        self.pool = pool or db_pool
 
     async def register_project(self, path: str, name: str) -> Project:
         """
@@ -38,8 +36,7 @@ class ProjectService:
         # Normalize path
         abs_path = os.path.abspath(path)
 
-        conn = await self._get_conn()
-        try:
+        async with self.pool.acquire(self.db_url) as conn:
             # 2. Insert into DB
             row = await conn.fetchrow(
                 """
@@ -50,22 +47,16 @@ class ProjectService:
                 name, abs_path
             )
             return Project(**dict(row))
-        finally:
-            await conn.close()
 
     async def list_projects(self) -> List[Project]:
         """List all registered projects."""
-        conn = await self._get_conn()
-        try:
+        async with self.pool.acquire(self.db_url) as conn:
             rows = await conn.fetch("SELECT project_id, name, path, created_at FROM projects ORDER BY project_id ASC")
             return [Project(**dict(row)) for row in rows]
-        finally:
-            await conn.close()
 
     async def get_project(self, project_id: int) -> Optional[Project]:
         """Get project by ID."""
-        conn = await self._get_conn()
-        try:
+        async with self.pool.acquire(self.db_url) as conn:
             row = await conn.fetchrow(
                 "SELECT project_id, name, path, created_at FROM projects WHERE project_id = $1",
                 project_id
@@ -73,14 +64,11 @@ class ProjectService:
             if row:
                 return Project(**dict(row))
             return None
-        finally:
-            await conn.close()
 
     async def get_project_by_path(self, path: str) -> Optional[Project]:
         """Get project by path."""
         abs_path = os.path.abspath(path)
-        conn = await self._get_conn()
-        try:
+        async with self.pool.acquire(self.db_url) as conn:
             row = await conn.fetchrow(
                 "SELECT project_id, name, path, created_at FROM projects WHERE path = $1",
                 abs_path
@@ -88,5 +76,3 @@ class ProjectService:
             if row:
                 return Project(**dict(row))
             return None
-        finally:
-            await conn.close()
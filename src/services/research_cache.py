@@ -0,0 +1,393 @@
+"""
+Research Cache
+
+Results of ResearchExecutor tasks keyed by their (normalized) description,
+shared by every executor in the process via get_research_cache():
+
+1. memory     - LRU bounded by entry count and total bytes, with TTL
+2. sqlite     - RESEARCH_CACHE_BACKEND="sqlite": local file shared by the
+                processes on one host and surviving restarts
+   postgres   - RESEARCH_CACHE_BACKEND="postgres": research_cache table
+                shared by every process using the database
+3. semantic   - optional: paraphrased descriptions are matched through a
+                ChromaDB collection above RESEARCH_CACHE_SIMILARITY
+
+The cache is a MutableMapping over the memory and SQLite tiers (so existing
+``cache[description]`` code keeps working); aget()/aset() consult every tier.
+Failures of the shared tiers are logged and treated as misses.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Iterator, Optional, Tuple
+
+from src.clients.response_cache import SemanticTier
+from src.config.settings import settings
+from src.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Context shared by all research entries in the semantic tier
+_SEMANTIC_CONTEXT = "research"
+
+
+def normalize_description(description: str) -> str:
+    """Case- and whitespace-insensitive cache key."""
+    return " ".join(description.lower().split())
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class SQLiteResearchStore:
+    """research_cache table in a local SQLite file."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: Optional[float]):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS research_cache (
+                key TEXT PRIMARY KEY,
+                description TEXT NOT NULL,
+                artifact TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_research_cache_accessed ON research_cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT artifact, created_at FROM research_cache WHERE key = ?", (_digest(key),)
+            ).fetchone()
+            if row is None:
+                return None
+            if self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM research_cache WHERE key = ?", (_digest(key),))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE research_cache SET accessed_at = ? WHERE key = ?", (now, _digest(key)))
+            self._conn.commit()
+        return row[1], row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO research_cache (key, description, artifact, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (_digest(key), key, value, now, now)
+            )
+            if self.ttl_seconds is not None:
+                self._conn.execute("DELETE FROM research_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM research_cache").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM research_cache WHERE key IN ("
+                    "SELECT key FROM research_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM research_cache WHERE key = ?", (_digest(key),))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM research_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class PostgresResearchStore:
+    """research_cache table in PostgreSQL (async only)."""
+
+    name = "postgres"
+
+    # Enforce max_entries every N writes rather than counting rows on each one
+    _EVICT_EVERY = 50
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float], db_url: Optional[str] = None, pool: Any = None):
+        from src.persistence.db_pool import db_pool
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_url = db_url or settings.DATABASE_URL
+        self.pool = pool or db_pool
+        self._writes = 0
+
+    async def get(self, key: str) -> Optional[Tuple[float, str]]:
+        await self._init_db()
+        async with self.pool.acquire(self.db_url) as conn:
+            row = await conn.fetchrow(
+                "UPDATE research_cache SET accessed_at = $2 WHERE key = $1 RETURNING artifact, created_at",
+                _digest(key), time.time()
+            )
+        if row is None:
+            return None
+        if self.ttl_seconds is not None and time.time() - row["created_at"] > self.ttl_seconds:
+            return None
+        return row["created_at"], row["artifact"]
+
+    async def set(self, key: str, value: str) -> None:
+        await self._init_db()
+        now = time.time()
+        self._writes += 1
+        async with self.pool.acquire(self.db_url) as conn:
+            await conn.execute(
+                """
+                INSERT INTO research_cache (key, description, artifact, created_at, accessed_at)
+                VALUES ($1, $2, $3, $4, $4)
+                ON CONFLICT (key) DO UPDATE
+                SET artifact = EXCLUDED.artifact, created_at = EXCLUDED.created_at, accessed_at = EXCLUDED.accessed_at
+                """,
+                _digest(key), key, value, now
+            )
+            if self._writes % self._EVICT_EVERY == 0:
+                if self.ttl_seconds is not None:
+                    await conn.execute("DELETE FROM research_cache WHERE created_at < $1", now - self.ttl_seconds)
+                await conn.execute(
+                    "DELETE FROM research_cache WHERE key IN ("
+                    "SELECT key FROM research_cache ORDER BY accessed_at DESC OFFSET $1)",
+                    self.max_entries
+                )
+
+    async def delete(self, key: str) -> None:
+        await self._init_db()
+        async with self.pool.acquire(self.db_url) as conn:
+            await conn.execute("DELETE FROM research_cache WHERE key = $1", _digest(key))
+
+    async def clear(self) -> None:
+        await self._init_db()
+        async with self.pool.acquire(self.db_url) as conn:
+            await conn.execute("DELETE FROM research_cache")
+
+    async def _init_db(self) -> None:
+        from src.persistence.migration_runner import ensure_schema
+        await ensure_schema(self.db_url, self.pool)
+
+
+class ResearchCache(MutableMapping):
+    """Bounded, optionally persistent and semantic cache of research results."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = -1,
+        backend: Optional[str] = None,
+        path: Optional[str] = None,
+        semantic: Optional[bool] = None,
+        similarity: Optional[float] = None,
+        semantic_tier: Optional[SemanticTier] = None,
+        store: Any = None
+    ):
+        """
+        Args:
+            max_entries: Entries kept in memory
+            max_bytes: Total UTF-8 size of keys and results kept in memory
+            ttl_seconds: Entry lifetime (None never expires; -1 uses the setting)
+            backend: "memory", "sqlite" or "postgres"
+            path: SQLite file for the "sqlite" backend
+            semantic: Match paraphrased descriptions through ChromaDB
+            similarity: Minimum cosine similarity for a semantic hit
+            semantic_tier: Preconfigured semantic tier (tests)
+            store: Preconfigured shared store (overrides ``backend``)
+        """
+        self.max_entries = max_entries or settings.RESEARCH_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or settings.RESEARCH_CACHE_MAX_BYTES
+        self.ttl_seconds = settings.RESEARCH_CACHE_TTL_SECONDS if ttl_seconds == -1 else ttl_seconds
+
+        # normalized description -> (stored_at, result, size in bytes)
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._bytes = 0
+
+        backend = (backend or settings.RESEARCH_CACHE_BACKEND).lower()
+        persistent_max = settings.RESEARCH_CACHE_PERSISTENT_MAX_ENTRIES
+        self.store = store
+        if store is None and backend == "sqlite":
+            self.store = SQLiteResearchStore(path or settings.RESEARCH_CACHE_PATH, persistent_max, self.ttl_seconds)
+        elif store is None and backend == "postgres":
+            self.store = PostgresResearchStore(persistent_max, self.ttl_seconds)
+        elif store is None and backend != "memory":
+            logger.warning(f"[ResearchCache] Unknown backend '{backend}', keeping results in memory only")
+
+        self.semantic = semantic_tier
+        if self.semantic is None and (settings.RESEARCH_CACHE_SEMANTIC if semantic is None else semantic):
+            self.semantic = SemanticTier(
+                similarity=similarity or settings.RESEARCH_CACHE_SIMILARITY,
+                ttl_seconds=self.ttl_seconds,
+                collection_name="research_cache"
+            )
+
+    # --- Mapping interface (memory + SQLite) ---
+
+    def __getitem__(self, description: str) -> str:
+        key = normalize_description(description)
+        value = self._memory_get(key)
+        if value is None and isinstance(self.store, SQLiteResearchStore):
+            found = self._guard(self.store.get, key)
+            if found is not None:
+                value = found[1]
+                self._memory_set(key, value, stored_at=found[0])
+        if value is None:
+            raise KeyError(description)
+        return value
+
+    def __setitem__(self, description: str, value: str) -> None:
+        key = normalize_description(description)
+        self._memory_set(key, value)
+        if isinstance(self.store, SQLiteResearchStore):
+            self._guard(self.store.set, key, value)
+
+    def __delitem__(self, description: str) -> None:
+        key = normalize_description(description)
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self._bytes -= item[2]
+        if isinstance(self.store, SQLiteResearchStore):
+            self._guard(self.store.delete, key)
+        elif item is None:
+            raise KeyError(description)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop every entry from memory and the SQLite store (see aclear())."""
+        self._entries.clear()
+        self._bytes = 0
+        if isinstance(self.store, SQLiteResearchStore):
+            self._guard(self.store.clear)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    # --- Async interface (all tiers) ---
+
+    async def aget(self, description: str) -> Optional[str]:
+        """Look ``description`` up in memory, the shared store and the semantic tier."""
+        key = normalize_description(description)
+        value = self._memory_get(key)
+        if value is not None:
+            self._record_lookup("hit", "memory")
+            return value
+
+        if self.store is not None:
+            found = await self._aguard(self.store.get, key)
+            if found is not None:
+                self._memory_set(key, found[1], stored_at=found[0])
+                self._record_lookup("hit", self.store.name)
+                return found[1]
+
+        if self.semantic is not None:
+            entry = await self._aguard(self.semantic.get, key, _SEMANTIC_CONTEXT)
+            if entry is not None and isinstance(entry.get("artifact"), str):
+                self._record_lookup("hit", "semantic")
+                return entry["artifact"]
+
+        self._record_lookup("miss", "none")
+        return None
+
+    async def aset(self, description: str, value: str) -> None:
+        """Store ``value`` in every tier."""
+        key = normalize_description(description)
+        self._memory_set(key, value)
+        if self.store is not None:
+            await self._aguard(self.store.set, key, value)
+        if self.semantic is not None:
+            await self._aguard(self.semantic.set, _digest(key), key, _SEMANTIC_CONTEXT, {"artifact": value})
+
+    async def aclear(self) -> None:
+        """Drop every entry from memory and the shared store."""
+        self._entries.clear()
+        self._bytes = 0
+        if self.store is not None:
+            await self._aguard(self.store.clear)
+
+    # --- Internals ---
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        if self.ttl_seconds is not None and time.time() - item[0] > self.ttl_seconds:
+            self._bytes -= self._entries.pop(key)[2]
+            return None
+        self._entries.move_to_end(key)
+        return item[1]
+
+    def _memory_set(self, key: str, value: str, stored_at: Optional[float] = None) -> None:
+        size = len(key.encode("utf-8")) + len(value.encode("utf-8"))
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[2]
+        if size > self.max_bytes:
+            return  # Larger than the whole budget: only the shared tiers keep it
+        self._entries[key] = (stored_at or time.time(), value, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._bytes -= self._entries.popitem(last=False)[1][2]
+
+    def _guard(self, operation, *args):
+        try:
+            return operation(*args)
+        except Exception as e:
+            logger.warning(f"[ResearchCache] {self.store.name} store failed: {e}")
+            return None
+
+    async def _aguard(self, operation, *args):
+        try:
+            if isinstance(self.store, SQLiteResearchStore) and getattr(operation, "__self__", None) is self.store:
+                return await asyncio.to_thread(operation, *args)
+            return await operation(*args)
+        except Exception as e:
+            logger.warning(f"[ResearchCache] Shared tier failed: {e}")
+            return None
+
+    @staticmethod
+    def _record_lookup(result: str, tier: str) -> None:
+        try:
+            from src.services.metrics_service import MetricsService
+            MetricsService().record_research_cache_lookup(result, tier)
+        except Exception:
+            pass
+
+
+_shared_cache: Optional[ResearchCache] = None
+
+
+def get_research_cache() -> ResearchCache:
+    """Process-wide cache shared by all ResearchExecutor instances."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ResearchCache()
+    return _shared_cache
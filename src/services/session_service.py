@@ -3,12 +3,12 @@ Session Service
 Manages session lifecycle, persistence, and status.
 """
 
-import asyncpg
+from src.persistence.db_pool import DatabasePool, db_pool
 from typing import List, Optional, Dict, Any
+from src.utils import serialization
 from pydantic import BaseModel
 from enum import Enum
 from datetime import datetime
-import json
 
 class SessionStatus(str, Enum):
     ACTIVE = "active"
@@ -26,18 +26,15 @@ class Session(BaseModel):
     metadata: Optional[Dict[str, Any]] = {}
 
 class SessionService:
-    def __init__(self, db_url: str):
+    def __init__(self, db_url: str, pool: Optional[DatabasePool] = None):
         self.db_url = db_url
-
-    async def _get_conn(self):
-        return await asyncpg.connect(self.db_url)
+        self.pool = pool or db_pool
 
     async def create_session(self, project_id: int, name: str, metadata: Dict[str, Any] = {}) -> Session:
         """
         Create a new session for a project.
         """
-        conn = await self._get_conn()
-        try:
+        async with self.pool.acquire(self.db_url) as conn:
             # Verify project exists first
             project = await conn.fetchrow("SELECT project_id FROM projects WHERE project_id = $1", project_id)
             if not project:
@@ -49,7 +46,7 @@ class SessionService:
                 VALUES ($1, $2, $3)
                 RETURNING session_id, project_id, status, created_at, updated_at, metadata
                 """,
-                project_id, SessionStatus.ACTIVE.value, json.dumps(metadata)
+                project_id, SessionStatus.ACTIVE.value, serialization.dumps_str(metadata)
             )
             # Note: The 'name' field might be missing in the schema based on migration.
             # Let's check the migration file. If 'name' is missing, we'll just use metadata or add it.
@@ -79,20 +76,17 @@ class SessionService:
             
             data = dict(row)
             if isinstance(data.get('metadata'), str):
-                data['metadata'] = json.loads(data['metadata'])
+                data['metadata'] = serialization.loads(data['metadata'])
             
             # Inject name from metadata if not in row
             if 'name' not in data:
                 data['name'] = data.get('metadata', {}).get('name', name)
 
             return Session(**data)
-        finally:
-            await conn.close()
 
     async def get_session(self, session_id: int) -> Optional[Session]:
         """Get session by ID."""
-        conn = await self._get_conn()
-        try:
+        async with self.pool.acquire(self.db_url) as conn:
             row = await conn.fetchrow(
                 "SELECT session_id, project_id, status, created_at, updated_at, metadata FROM sessions WHERE session_id = $1",
                 session_id
@@ -100,18 +94,15 @@ class SessionService:
             if row:
                 data = dict(row)
                 if isinstance(data.get('metadata'), str):
-                    data['metadata'] = json.loads(data['metadata'])
+                    data['metadata'] = serialization.loads(data['metadata'])
                 # Extract name from metadata
                 data['name'] = data.get('metadata', {}).get('name', f"Session {session_id}")
                 return Session(**data)
             return None
-        finally:
-            await conn.close()
 
     async def list_sessions(self, project_id: int) -> List[Session]:
         """List all sessions for a project."""
-        conn = await self._get_conn()
-        try:
+        async with self.pool.acquire(self.db_url) as conn:
             rows = await conn.fetch(
                 "SELECT session_id, project_id, status, created_at, updated_at, metadata FROM sessions WHERE project_id = $1 ORDER BY created_at DESC",
                 project_id
@@ -120,17 +111,14 @@ class SessionService:
             for row in rows:
                 data = dict(row)
                 if isinstance(data.get('metadata'), str):
-                    data['metadata'] = json.loads(data['metadata'])
+                    data['metadata'] = serialization.loads(data['metadata'])
                 data['name'] = data.get('metadata', {}).get('name', f"Session {data['session_id']}")
                 sessions.append(Session(**data))
             return sessions
-        finally:
-            await conn.close()
 
     async def update_status(self, session_id: int, status: SessionStatus) -> Optional[Session]:
         """Update session status."""
-        conn = await self._get_conn()
-        try:
+        async with self.pool.acquire(self.db_url) as conn:
             row = await conn.fetchrow(
                 """
                 UPDATE sessions
@@ -143,9 +131,7 @@ class SessionService:
             if row:
                 data = dict(row)
                 if isinstance(data.get('metadata'), str):
-                    data['metadata'] = json.loads(data['metadata'])
+                    data['metadata'] = serialization.loads(data['metadata'])
                 data['name'] = data.get('metadata', {}).get('name', f"Session {session_id}")
                 return Session(**data)
             return None
-        finally:
-            await conn.close()
@@ -168,5 +168,41 @@ try:
 except ImportError as e:
     # Fallback if tier imports fail
     ALL_CODE_TOOLS = []
-    ALL_TOOLS = ALL_UTILITY_TOOLS
+    ALL_TOOLS = list(ALL_UTILITY_TOOLS)
+
+
+def register_tool(tool) -> None:
+    """
+    Add a tool to ALL_TOOLS (replacing a registered tool with the same name).
+    
+    Compiled tool schemas are invalidated so chat clients pick up the change.
+    """
+    name = _tool_name(tool)
+    ALL_TOOLS[:] = [t for t in ALL_TOOLS if _tool_name(t) != name]
+    ALL_TOOLS.append(tool)
+    _invalidate_tool_schemas()
+
+
+def unregister_tool(name: str) -> bool:
+    """
+    Remove the tool called ``name`` from ALL_TOOLS.
+    
+    Returns:
+        True if a tool was removed
+    """
+    remaining = [t for t in ALL_TOOLS if _tool_name(t) != name]
+    removed = len(remaining) != len(ALL_TOOLS)
+    if removed:
+        ALL_TOOLS[:] = remaining
+        _invalidate_tool_schemas()
+    return removed
+
+
+def _tool_name(tool) -> str:
+    return getattr(tool, "name", None) or getattr(tool, "__name__", repr(tool))
+
+
+def _invalidate_tool_schemas() -> None:
+    from src.clients.tool_schemas import tool_schema_cache
+    tool_schema_cache.invalidate()
 
@@ -1,7 +1,7 @@
-import asyncpg
-import json
 from typing import List, Dict, Optional
 from src.config.settings import settings
+from src.persistence.db_pool import db_pool
+from src.utils import serialization
 
 async def query_agent_messages(session_id: Optional[str] = None, role: Optional[str] = None) -> str:
     """
@@ -15,7 +15,6 @@ async def query_agent_messages(session_id: Optional[str] = None, role: Optional[
         A JSON string containing the matching message history, or an error message.
     """
     db_url = settings.DATABASE_URL
-    conn = None
     
     # 1. Build the SQL query dynamically based on arguments
     sql_base = "SELECT session_id, role, content, timestamp FROM agent_messages"
@@ -39,9 +38,9 @@ async def query_agent_messages(session_id: Optional[str] = None, role: Optional[
     sql_query += " ORDER BY timestamp DESC LIMIT 5;" 
 
     try:
-        conn = await asyncpg.connect(db_url)
-        records = await conn.fetch(sql_query, *params)
-        
+        async with db_pool.acquire(db_url) as conn:
+            records = await conn.fetch(sql_query, *params)
+
         # 2. Format results for the LLM
         results = [
             {
@@ -53,25 +52,21 @@ async def query_agent_messages(session_id: Optional[str] = None, role: Optional[
             }
             for r in records
         ]
-        
+
         if not results:
             return "No messages found matching the criteria."
-            
+
         # 3. Return as a JSON string
-        return json.dumps(results, indent=2)
+        return serialization.dumps_str(results, indent=True)
 
     except Exception as e:
         return f"Database Tool Error: Failed to execute message query. Details: {e}"
-    finally:
-        if conn:
-            await conn.close()
 
 async def query_audit_log(operation: Optional[str] = None, agent_name: Optional[str] = None) -> str:
     """
     Queries the audit_log table for recent entries based on provided filters.
     """
     db_url = settings.DATABASE_URL
-    conn = None
     
     sql_base = "SELECT timestamp, agent_name, operation, details FROM audit_log"
     conditions = []
@@ -93,9 +88,9 @@ async def query_audit_log(operation: Optional[str] = None, agent_name: Optional[
     sql_query += " ORDER BY timestamp DESC LIMIT 5;"
 
     try:
-        conn = await asyncpg.connect(db_url)
-        records = await conn.fetch(sql_query, *params)
-        
+        async with db_pool.acquire(db_url) as conn:
+            records = await conn.fetch(sql_query, *params)
+
         results = [
             {
                 "timestamp": r['timestamp'].isoformat(),
@@ -105,14 +100,11 @@ async def query_audit_log(operation: Optional[str] = None, agent_name: Optional[
             }
             for r in records
         ]
-        
+
         if not results:
             return "No audit log entries found matching the criteria."
-            
-        return json.dumps(results, indent=2)
+
+        return serialization.dumps_str(results, indent=True)
 
     except Exception as e:
         return f"Database Tool Error: Failed to execute audit query. Details: {e}"
-    finally:
-        if conn:
-            await conn.close()
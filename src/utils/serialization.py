@@ -0,0 +1,211 @@
+"""
+JSON Serialization
+
+One entry point for the JSON hot paths (LiteLLM request bodies, SSE frames,
+checkpoint states, message payloads, session metadata). The backend is
+chosen by settings.JSON_BACKEND:
+
+- "orjson":  fastest, used by "auto" when the 'orjson' package is installed
+- "msgspec": used by "auto" when orjson is missing but 'msgspec' is installed
+- "json":    the standard library (always available)
+
+All backends produce compact UTF-8 output, stringify unsupported objects
+with ``default`` (str by default) and raise json.JSONDecodeError on invalid
+input, so callers do not need to know which one is active. Types orjson and
+msgspec encode natively get the same representation from the stdlib backend:
+datetime/date/time as ISO 8601, dataclasses as objects, enums by value,
+UUIDs as strings, and NaN/Infinity as null. (msgspec alone spells a UTC
+offset "Z" instead of "+00:00".)
+"""
+
+import dataclasses
+import json
+import math
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Union
+from uuid import UUID
+
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Optional dependency
+    msgspec = None
+
+Default = Optional[Callable[[Any], Any]]
+
+
+def _native(default: Default) -> Callable[[Any], Any]:
+    """Wrap ``default`` so the stdlib encodes orjson's native types the same way."""
+    def encode(obj: Any) -> Any:
+        if isinstance(obj, (datetime, date, time)):
+            return obj.isoformat()
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            return {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+        if isinstance(obj, Enum):
+            return obj.value
+        if isinstance(obj, UUID):
+            return str(obj)
+        if default is None:
+            raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+        return default(obj)
+    return encode
+
+
+def _finite(obj: Any) -> Any:
+    """Copy of ``obj`` with NaN/Infinity replaced by None."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+class StdlibBackend:
+    """Standard library json, matching orjson's output for its native types."""
+
+    name = "json"
+
+    def __init__(self):
+        self._defaults: Dict[Any, Callable[[Any], Any]] = {}
+
+    def dumps(self, obj: Any, sort_keys: bool = False, indent: bool = False, default: Default = str) -> bytes:
+        encode = self._defaults.get(default)
+        if encode is None:
+            encode = self._defaults[default] = _native(default)
+        try:
+            return self._dumps(obj, sort_keys, indent, encode)
+        except ValueError:
+            # Non-finite floats: re-encode with them (also inside converted values) as null
+            return self._dumps(_finite(obj), sort_keys, indent, lambda value: _finite(encode(value)))
+
+    @staticmethod
+    def _dumps(obj: Any, sort_keys: bool, indent: bool, default: Callable[[Any], Any]) -> bytes:
+        return json.dumps(
+            obj,
+            sort_keys=sort_keys,
+            indent=2 if indent else None,
+            separators=None if indent else (",", ":"),
+            ensure_ascii=False,
+            allow_nan=False,
+            default=default
+        ).encode("utf-8")
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+
+class OrjsonBackend:
+    """orjson; falls back to the stdlib for values it rejects (e.g. >64-bit ints)."""
+
+    name = "orjson"
+
+    def __init__(self):
+        self._fallback = StdlibBackend()
+
+    def dumps(self, obj: Any, sort_keys: bool = False, indent: bool = False, default: Default = str) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            return self._fallback.dumps(obj, sort_keys=sort_keys, indent=indent, default=default)
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(data)
+
+
+class MsgspecBackend:
+    """msgspec.json."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        self._decoder = msgspec.json.Decoder()
+        self._encoders: Dict[Any, Any] = {}
+
+    def dumps(self, obj: Any, sort_keys: bool = False, indent: bool = False, default: Default = str) -> bytes:
+        key = (default, sort_keys)
+        encoder = self._encoders.get(key)
+        if encoder is None:
+            encoder = msgspec.json.Encoder(enc_hook=default, order="sorted" if sort_keys else None)
+            self._encoders[key] = encoder
+        data = encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if indent else data
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), data if isinstance(data, str) else "", 0) from e
+
+
+def _select_backend(name: str):
+    if name in ("auto", "orjson") and orjson is not None:
+        return OrjsonBackend()
+    if name in ("auto", "msgspec") and msgspec is not None:
+        return MsgspecBackend()
+    if name not in ("auto", "json"):
+        logger.warning(f"[Serialization] JSON backend '{name}' is not installed, using stdlib json")
+    return StdlibBackend()
+
+
+_backend = _select_backend(settings.JSON_BACKEND)
+
+
+def backend_name() -> str:
+    """Name of the active backend."""
+    return _backend.name
+
+
+def set_backend(name: str) -> str:
+    """Switch backend at runtime (benchmarks, tests).
+
+    Returns:
+        The name of the backend actually selected
+    """
+    global _backend
+    _backend = _select_backend(name)
+    return _backend.name
+
+
+def dumps(obj: Any, *, sort_keys: bool = False, indent: bool = False, default: Default = str) -> bytes:
+    """Serialize ``obj`` to UTF-8 JSON bytes.
+
+    Args:
+        obj: Value to serialize
+        sort_keys: Emit object keys in sorted order (stable hashing)
+        indent: Pretty-print with two-space indentation
+        default: Called for objects the backend cannot serialize
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    return _backend.dumps(obj, sort_keys=sort_keys, indent=indent, default=default)
+
+
+def dumps_str(obj: Any, *, sort_keys: bool = False, indent: bool = False, default: Default = str) -> str:
+    """Like dumps() but returns ``str`` (for text columns and SSE frames)."""
+    return dumps(obj, sort_keys=sort_keys, indent=indent, default=default).decode("utf-8")
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Parse JSON from bytes or str. Raises json.JSONDecodeError on invalid input."""
+    return _backend.loads(data)
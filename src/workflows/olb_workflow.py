@@ -6,17 +6,24 @@ Uses MAF routing patterns to dispatch tasks to the correct domain.
 
 Design:
 - Receives StrategicPlan from Project Lead
-- Iterates through tasks in the plan
-- Routes each task to the appropriate Domain Lead based on 'domain' field
+- Schedules tasks as a DAG over their declared dependencies
+- Routes each ready task to the appropriate Domain Lead based on 'domain' field,
+  running independent tasks concurrently
+- Skips only the downstream subtree of a failed task
 - Aggregates results from all Domain Leads
 - Returns final execution summary to Project Lead
 """
 
-from agent_framework import AgentThread
+from agent_framework import AgentThread, ChatMessageStore
+from src.clients.admission import llm_priority
 from src.models.data_contracts import StrategicPlan, TaskDefinition
+from src.middleware.event_stream import emit_event
 from src.utils import get_logger
-from typing import Dict, Any, List, TYPE_CHECKING
+from typing import Dict, Any, List, Tuple, TYPE_CHECKING
+from collections import deque
 from datetime import datetime
+import asyncio
+import time
 
 if TYPE_CHECKING:
     from src.agents.domain_leads.base_domain_lead import BaseDomainLead
@@ -37,7 +44,7 @@ class OLBWorkflow:
     Responsibilities:
     - Parse StrategicPlan
     - Route tasks to correct Domain Lead (Dev, QA, Docs)
-    - Handle cross-domain dependencies (sequential execution for now)
+    - Handle cross-domain dependencies (DAG scheduling, concurrent where independent)
     - Aggregate results into final report
     """
     
@@ -57,86 +64,268 @@ class OLBWorkflow:
     ) -> Dict[str, Any]:
         """Execute a strategic plan by routing tasks to Domain Leads.
         
+        Tasks are scheduled as a DAG over ``TaskDefinition.dependencies``:
+        every task whose dependencies have completed is launched immediately,
+        so independent tasks on different Domain Leads run concurrently. A
+        failed task only cancels its downstream subtree.
+        
         Args:
             plan: The StrategicPlan object from Project Lead
-            thread: MAF AgentThread
+            thread: MAF AgentThread with the plan's conversation. Each task
+                    runs in its own child thread seeded with this history plus
+                    the history of its upstream tasks, so dependents see what
+                    their dependencies did while concurrent Domain Leads
+                    don't interleave history.
             
         Returns:
             Aggregated execution summary
         """
         logger.info(f"Executing Plan: {plan.plan_id} ({len(plan.tasks)} tasks)")
+        await emit_event("plan_started", workflow="OLB", plan_id=plan.plan_id, total_tasks=len(plan.tasks))
         start_time = datetime.now()
         
         results = []
         failed_tasks = []
+        skipped_tasks = []
+        durations: Dict[str, float] = {}
+        task_threads: Dict[str, AgentThread] = {}
+        base_history = await self._history(thread)
         
-        # Sort tasks by dependencies (simple topological sort or just sequential for MVP)
-        # For MVP, we assume the PL has ordered them correctly or we execute sequentially.
-        ordered_tasks = self._order_tasks(plan.tasks)
+        ordered_tasks, blocked = self._order_tasks(plan.tasks)
+        tasks_by_id = {task.task_id: task for task in plan.tasks}
         
-        for task in ordered_tasks:
-            domain = task.domain
-            dl = self.domain_leads.get(domain)
-            
-            if not dl:
-                error = f"No Domain Lead found for domain: {domain}"
-                logger.error(f"No Domain Lead found for domain: {domain}")
-                failed_tasks.append({
-                    "task_id": task.task_id,
-                    "error": error,
-                    "status": "Failed"
-                })
-                continue
-            
-            # Execute task via Domain Lead
-            try:
-                logger.info(f"Routing task {task.task_id} to {dl.name}")
-                result = await dl.execute_task(task, thread)
-                results.append(result)
+        for task_id, error in blocked.items():
+            logger.error(f"Task {task_id} cannot be scheduled: {error}")
+            failed_tasks.append({"task_id": task_id, "error": error, "status": "Failed"})
+        
+        status_by_id: Dict[str, str] = {task_id: "Failed" for task_id in blocked}
+        waiting = list(ordered_tasks)
+        running: Dict[asyncio.Task, TaskDefinition] = {}
+        
+        try:
+            while waiting or running:
+                # Launch every task whose dependencies are all resolved
+                for task in list(waiting):
+                    dep_states = [status_by_id.get(dep) for dep in task.dependencies]
+                    if any(state is None for state in dep_states):
+                        continue
+                    waiting.remove(task)
+                    if all(state == "Completed" for state in dep_states):
+                        task_thread = self._child_thread(
+                            base_history,
+                            [await self._history(task_threads[dep]) for dep in task.dependencies]
+                        )
+                        task_threads[task.task_id] = task_thread
+                        running[asyncio.create_task(self._run_task(task, task_thread))] = task
+                    else:
+                        failed_deps = [
+                            dep for dep, state in zip(task.dependencies, dep_states)
+                            if state != "Completed"
+                        ]
+                        logger.warning(f"Skipping task {task.task_id}: upstream failed ({', '.join(failed_deps)})")
+                        status_by_id[task.task_id] = "Skipped"
+                        skipped_tasks.append({
+                            "task_id": task.task_id,
+                            "status": "Skipped",
+                            "error": f"Upstream task(s) failed: {', '.join(failed_deps)}"
+                        })
+                        await emit_event("task_finished", workflow="OLB", task_id=task.task_id, status="Skipped")
                 
-                if result["status"] != "Completed":
-                    failed_tasks.append(result)
-                    # Stop on failure? For now, yes, to prevent cascading errors.
-                    logger.warning(f"Task {task.task_id} failed. Stopping plan execution.")
-                    break
-                    
-            except Exception as e:
-                error = f"Error executing task {task.task_id}: {str(e)}"
-                logger.error(f"Error executing task {task.task_id}: {str(e)}")
-                failed_tasks.append({
-                    "task_id": task.task_id,
-                    "error": error,
-                    "status": "Failed"
-                })
-                break
+                if not running:
+                    continue
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    task = running.pop(finished)
+                    result, elapsed, routed = finished.result()
+                    durations[task.task_id] = elapsed
+                    if routed:
+                        results.append(result)
+                    if result["status"] != "Completed":
+                        failed_tasks.append(result)
+                        logger.warning(f"Task {task.task_id} failed. Cancelling downstream tasks.")
+                    status_by_id[task.task_id] = result["status"]
+        finally:
+            for pending in running:
+                pending.cancel()
         
         end_time = datetime.now()
         execution_time_ms = int((end_time - start_time).total_seconds() * 1000)
         
-        return self._aggregate_results(plan, results, failed_tasks, execution_time_ms)
+        summary = self._aggregate_results(plan, results, failed_tasks, skipped_tasks, execution_time_ms)
+        critical_path, critical_path_ms = self._critical_path(tasks_by_id, durations)
+        summary["critical_path"] = critical_path
+        summary["critical_path_ms"] = critical_path_ms
+        await emit_event("plan_finished", workflow="OLB", plan_id=plan.plan_id, status=summary["status"])
+        return summary
     
-    def _order_tasks(self, tasks: List[TaskDefinition]) -> List[TaskDefinition]:
-        """Order tasks based on dependencies.
+    @staticmethod
+    async def _history(thread: AgentThread) -> List[Any]:
+        """Messages recorded in ``thread`` (empty if it has no local store)."""
+        if thread is None or thread.message_store is None:
+            return []
+        return list(await thread.message_store.list_messages())
+
+    @staticmethod
+    def _child_thread(base: List[Any], upstream: List[List[Any]]) -> AgentThread:
+        """Create a task thread seeded with the plan history and its upstream tasks' messages.
         
-        For MVP, we just respect the list order, assuming PL ordered them.
-        Future: Implement topological sort.
+        Upstream threads start with the same plan history (and share messages
+        of common ancestors), so each message object is copied only once.
         """
-        return tasks
+        seen = set()
+        messages = []
+        for message in [*base, *(m for history in upstream for m in history)]:
+            if id(message) not in seen:
+                seen.add(id(message))
+                messages.append(message)
+        if not messages:
+            return AgentThread()
+        return AgentThread(message_store=ChatMessageStore(messages))
+
+    async def _run_task(
+        self,
+        task: TaskDefinition,
+        thread: AgentThread
+    ) -> Tuple[Dict[str, Any], float, bool]:
+        """Route one task to its Domain Lead.
+        
+        Args:
+            task: The task to run
+            thread: The task's child thread (see execute_plan)
+            
+        Returns:
+            Tuple of (result dict, elapsed milliseconds, whether the Domain
+            Lead returned the result). Errors are converted into a failed
+            result rather than raised.
+        """
+        started = time.perf_counter()
+        dl = self.domain_leads.get(task.domain)
+        
+        if not dl:
+            error = f"No Domain Lead found for domain: {task.domain}"
+            logger.error(error)
+            result = {"task_id": task.task_id, "error": error, "status": "Failed"}
+            return result, (time.perf_counter() - started) * 1000, False
+        
+        try:
+            logger.info(f"Routing task {task.task_id} to {dl.name}")
+            await emit_event("task_started", workflow="OLB", task_id=task.task_id, domain_lead=dl.name)
+            with llm_priority("background"):
+                result = await dl.execute_task(task, thread)
+            if "status" not in result:
+                raise ValueError(f"{dl.name} returned a result without a status")
+            routed = True
+        except Exception as e:
+            error = f"Error executing task {task.task_id}: {str(e)}"
+            logger.error(error)
+            result = {"task_id": task.task_id, "error": error, "status": "Failed"}
+            routed = False
+        
+        await emit_event("task_finished", workflow="OLB", task_id=task.task_id, status=result["status"])
+        return result, (time.perf_counter() - started) * 1000, routed
+    
+    def _order_tasks(
+        self,
+        tasks: List[TaskDefinition]
+    ) -> Tuple[List[TaskDefinition], Dict[str, str]]:
+        """Topologically order tasks by their dependencies (Kahn's algorithm).
+        
+        Args:
+            tasks: Tasks from the StrategicPlan
+            
+        Returns:
+            Tuple of (schedulable tasks in topological order, blocked tasks).
+            Blocked maps task_id to the reason it can never run: it depends on
+            an unknown task_id or sits on (or downstream of) a dependency cycle.
+        """
+        known = {task.task_id for task in tasks}
+        blocked: Dict[str, str] = {}
+        
+        for task in tasks:
+            missing = [dep for dep in task.dependencies if dep not in known]
+            if missing:
+                blocked[task.task_id] = f"Unknown dependencies: {', '.join(missing)}"
+        
+        in_degree = {task.task_id: len(set(task.dependencies) & known) for task in tasks}
+        dependents: Dict[str, List[TaskDefinition]] = {task.task_id: [] for task in tasks}
+        for task in tasks:
+            for dep in set(task.dependencies):
+                if dep in dependents:
+                    dependents[dep].append(task)
+        
+        # Seed in plan order so independent tasks keep the PL's ordering
+        ready = deque(task for task in tasks if in_degree[task.task_id] == 0)
+        ordered = []
+        while ready:
+            task = ready.popleft()
+            ordered.append(task)
+            for child in dependents[task.task_id]:
+                in_degree[child.task_id] -= 1
+                if in_degree[child.task_id] == 0:
+                    ready.append(child)
+        
+        if len(ordered) < len(tasks):
+            scheduled = {task.task_id for task in ordered}
+            cyclic = [task.task_id for task in tasks if task.task_id not in scheduled]
+            for task_id in cyclic:
+                blocked.setdefault(task_id, "Dependency cycle detected")
+            logger.error(f"Dependency cycle among tasks: {', '.join(cyclic)}")
+        
+        # Tasks with unknown dependencies (and their descendants) are resolved
+        # as failed up front; the scheduler skips their downstream subtree.
+        return [task for task in ordered if task.task_id not in blocked], blocked
+    
+    def _critical_path(
+        self,
+        tasks_by_id: Dict[str, TaskDefinition],
+        durations: Dict[str, float]
+    ) -> Tuple[List[str], int]:
+        """Find the longest dependency chain by measured task duration.
+        
+        Args:
+            tasks_by_id: Plan tasks keyed by task_id
+            durations: Elapsed milliseconds for every task that actually ran
+            
+        Returns:
+            Tuple of (task_ids along the critical path, its length in ms)
+        """
+        best: Dict[str, Tuple[float, List[str]]] = {}
+        
+        def longest(task_id: str) -> Tuple[float, List[str]]:
+            if task_id not in best:
+                best[task_id] = (0.0, [])  # guards against cycles
+                upstream = max(
+                    (longest(dep) for dep in tasks_by_id[task_id].dependencies if dep in durations),
+                    key=lambda item: item[0],
+                    default=(0.0, [])
+                )
+                best[task_id] = (upstream[0] + durations[task_id], upstream[1] + [task_id])
+            return best[task_id]
+        
+        length, path = max(
+            (longest(task_id) for task_id in durations),
+            key=lambda item: item[0],
+            default=(0.0, [])
+        )
+        return path, int(length)
         
     def _aggregate_results(
         self,
         plan: StrategicPlan,
         results: List[Dict[str, Any]],
         failed_tasks: List[Dict[str, Any]],
+        skipped_tasks: List[Dict[str, Any]],
         execution_time_ms: int
     ) -> Dict[str, Any]:
         """Create final report for Project Lead."""
         total = len(plan.tasks)
         completed = len([r for r in results if r["status"] == "Completed"])
         failed = len(failed_tasks)
-        pending = total - completed - failed
+        skipped = len(skipped_tasks)
+        pending = total - completed - failed - skipped
         
-        status = "Completed" if failed == 0 and pending == 0 else "Failed"
+        status = "Completed" if failed == 0 and skipped == 0 and pending == 0 else "Failed"
         
         return {
             "plan_id": plan.plan_id,
@@ -145,7 +334,9 @@ class OLBWorkflow:
             "completed": completed,
             "failed": failed,
             "pending": pending,
+            "skipped": skipped,
             "results": results,
             "failed_details": failed_tasks,
+            "skipped_details": skipped_tasks,
             "execution_time_ms": execution_time_ms
         }
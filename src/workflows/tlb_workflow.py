@@ -2,19 +2,28 @@
 TLB (Tactical Level Batcher) Workflow
 
 Responsible for executing Executor tasks in parallel and aggregating ExecutorReport objects.
-Uses MAF WorkflowBuilder with fan-in/fan-out pattern for parallel execution.
+Subtasks fan out concurrently via asyncio.gather, bounded by a global limit
+and per-executor-type limits, and fan back in in their original order.
 
 Design:
 - Receives task breakdown from Domain Lead
-- Fans out to multiple Executors in parallel
-- Uses MAF fan-in edges to aggregate results
+- Fans out to multiple Executors in parallel (each with its own AgentThread)
+- Bounds each subtask with a timeout so one stuck executor cannot stall the batch
 - Returns aggregated ExecutorReport summary to Domain Lead
 """
 
 from agent_framework import WorkflowBuilder, AgentThread
+from src.clients.admission import llm_priority
 from src.models.data_contracts import ExecutorReport
-from typing import List, Dict, Any
+from src.middleware.event_stream import emit_event
+from src.config.settings import settings
+from src.utils import get_logger
+from typing import List, Dict, Any, Optional
 from datetime import datetime
+import asyncio
+import time
+
+logger = get_logger(__name__)
 
 
 class TLBWorkflow:
@@ -29,21 +38,56 @@ class TLBWorkflow:
     
     Responsibilities:
     - Create workflow graph with executor nodes
-    - Execute tasks in parallel (fan-out)
-    - Aggregate ExecutorReport objects (fan-in)
+    - Execute tasks in parallel (fan-out) under global and per-executor limits
+    - Aggregate ExecutorReport objects (fan-in), preserving task order
     - Return structured summary
     
     Context Window: None (stateless workflow)
     """
     
-    def __init__(self, executors: Dict[str, 'BaseExecutor']):
+    def __init__(
+        self,
+        executors: Dict[str, 'BaseExecutor'],
+        concurrent: Optional[bool] = None,
+        max_concurrency: Optional[int] = None,
+        executor_concurrency: Optional[Dict[str, int]] = None,
+        task_timeout: Optional[float] = None
+    ):
         """Initialize TLB with available executors.
         
         Args:
             executors: Dictionary mapping executor types to executor instances
                       e.g., {"coder": CoderExecutor, "tester": TesterExecutor}
+            concurrent: Run subtasks concurrently (default: settings.TLB_CONCURRENT)
+            max_concurrency: Global cap on in-flight subtasks across all callers,
+                             tied to LLM backend capacity
+                             (default: settings.TLB_MAX_CONCURRENCY or LLM_MAX_PARALLEL_REQUESTS)
+            executor_concurrency: Per-executor-type caps, e.g. {"coder": 2}
+                                  (default: settings.TLB_EXECUTOR_CONCURRENCY)
+            task_timeout: Per-subtask timeout in seconds (default: settings.TLB_TASK_TIMEOUT_SECONDS)
         """
         self.executors = executors
+        self.concurrent = settings.TLB_CONCURRENT if concurrent is None else concurrent
+        self.max_concurrency = (
+            max_concurrency
+            or settings.TLB_MAX_CONCURRENCY
+            or settings.LLM_MAX_PARALLEL_REQUESTS
+        )
+        self.executor_concurrency = (
+            settings.TLB_EXECUTOR_CONCURRENCY if executor_concurrency is None else executor_concurrency
+        )
+        self.task_timeout = settings.TLB_TASK_TIMEOUT_SECONDS if task_timeout is None else task_timeout
+        
+        # Shared by every execute_tasks() call on this TLB (all Domain Leads)
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self._executor_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _executor_limit(self, executor_type: str) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent subtasks for one executor type."""
+        if executor_type not in self._executor_limits:
+            limit = self.executor_concurrency.get(executor_type, self.max_concurrency)
+            self._executor_limits[executor_type] = asyncio.Semaphore(limit)
+        return self._executor_limits[executor_type]
         
     async def execute_tasks(
         self, 
@@ -52,6 +96,10 @@ class TLBWorkflow:
     ) -> Dict[str, Any]:
         """Execute tasks in parallel and aggregate results.
         
+        In concurrent mode every subtask runs on its own AgentThread (executors
+        are task-scoped) so parallel conversations do not interleave; in
+        sequential mode all subtasks share ``thread``.
+        
         Args:
             tasks: List of task dictionaries, each containing:
                   - task_id: Unique identifier
@@ -65,7 +113,7 @@ class TLBWorkflow:
             - total_tasks: Number of tasks executed
             - completed: Number of successful tasks
             - failed: Number of failed tasks
-            - reports: List of ExecutorReport objects
+            - reports: List of ExecutorReport objects (same order as tasks)
             - execution_time_ms: Total execution time
         """
         if not tasks:
@@ -79,34 +127,81 @@ class TLBWorkflow:
         
         start_time = datetime.now()
         
-        # For MVP: Execute tasks sequentially (simpler than parallel)
-        # Phase 2.1 will add true parallel execution with fan-in/fan-out
-        reports = []
-        
-        for task in tasks:
-            executor_type = task.get("executor_type", "coder")
-            executor = self.executors.get(executor_type)
-            
-            if not executor:
-                # Unknown executor type - create failed report
-                reports.append(ExecutorReport(
-                    executor_task_id=task.get("task_id", "unknown"),
-                    executor_name=f"{executor_type}Executor",
-                    status="Failed",
-                    outputs={},
-                    error_message=f"Unknown executor type: {executor_type}"
-                ))
-                continue
-            
-            # Execute task
-            report = await executor.execute_task(task, thread)
-            reports.append(report)
+        if self.concurrent:
+            # Fan-out: gather preserves input order for the fan-in
+            reports = list(await asyncio.gather(
+                *(self._run_task(task, AgentThread()) for task in tasks)
+            ))
+        else:
+            reports = [await self._run_task(task, thread) for task in tasks]
         
         end_time = datetime.now()
         execution_time_ms = int((end_time - start_time).total_seconds() * 1000)
         
         # Aggregate reports
         return self._aggregate_reports(reports, execution_time_ms)
+
+    async def _run_task(self, task: Dict[str, Any], thread: AgentThread) -> ExecutorReport:
+        """Run a single subtask under the concurrency limits and timeout."""
+        task_id = task.get("task_id", "unknown")
+        executor_type = task.get("executor_type", "coder")
+        executor = self.executors.get(executor_type)
+        
+        if not executor:
+            # Unknown executor type - create failed report
+            return ExecutorReport(
+                executor_task_id=task_id,
+                executor_name=f"{executor_type}Executor",
+                status="Failed",
+                outputs={},
+                error_message=f"Unknown executor type: {executor_type}"
+            )
+        
+        # Per-type slot first: a subtask queued behind its own type must not
+        # hold a global slot that other executor types could use
+        async with self._executor_limit(executor_type), self._global_limit:
+            await emit_event(
+                "subtask_started",
+                workflow="TLB",
+                task_id=task_id,
+                executor=executor.name
+            )
+            started = time.perf_counter()
+            try:
+                # Executor LLM calls queue behind interactive turns
+                with llm_priority("background"):
+                    report = await asyncio.wait_for(
+                        executor.execute_task(task, thread),
+                        timeout=self.task_timeout
+                    )
+            except asyncio.TimeoutError:
+                logger.warning(f"Subtask {task_id} timed out after {self.task_timeout}s")
+                report = ExecutorReport(
+                    executor_task_id=task_id,
+                    executor_name=executor.name,
+                    status="Failed",
+                    outputs={},
+                    error_message=f"Timed out after {self.task_timeout}s",
+                    metadata={"timeout": True}
+                )
+            except Exception as e:
+                report = ExecutorReport(
+                    executor_task_id=task_id,
+                    executor_name=executor.name,
+                    status="Failed",
+                    outputs={},
+                    error_message=f"Execution error: {str(e)}"
+                )
+            report.execution_time_ms = int((time.perf_counter() - started) * 1000)
+        
+        await emit_event(
+            "subtask_finished",
+            workflow="TLB",
+            task_id=report.executor_task_id,
+            executor=report.executor_name,
+            status=report.status
+        )
+        return report
         
     def _aggregate_reports(
         self, 
@@ -0,0 +1,16 @@
+"""
+Shared pytest configuration.
+"""
+
+import pytest
+
+from src.config.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def no_shared_chroma_write_queue(monkeypatch):
+    """Keep tests out of the on-disk ChromaDB write queue (data/chroma_write_queue.sqlite).
+
+    Tests that exercise the queue pass their own ``write_queue``.
+    """
+    monkeypatch.setattr(settings, "CHROMA_WRITE_QUEUE_ENABLED", False)
@@ -0,0 +1,157 @@
+"""
+Integration tests for the streaming chat endpoints (SSE and WebSocket).
+"""
+
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from src.api import agent_api
+from src.api.agent_api import app
+from src.middleware.event_stream import emit_event
+
+client = TestClient(app)
+
+
+class FakeLiaison:
+    """Liaison stand-in that streams tokens and workflow progress."""
+
+    async def stream_user_message(self, message: str):
+        yield {"type": "intent", "intent": "IDEA"}
+        # Emitted from inside the 'hierarchy', not yielded by the Liaison
+        await emit_event("task_started", workflow="OLB", task_id="t1")
+        yield {"type": "token", "text": "Hel"}
+        yield {"type": "token", "text": "lo"}
+        yield {"type": "done", "response": "Hello"}
+
+
+class SlowLiaison:
+    """Liaison stand-in that blocks until cancelled."""
+
+    def __init__(self):
+        self.cancelled = False
+
+    async def stream_user_message(self, message: str):
+        yield {"type": "token", "text": "thinking"}
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+@pytest.fixture
+def hierarchy():
+    previous = agent_api.agent_hierarchy
+    yield lambda liaison: agent_api.set_agent_hierarchy({"liaison": liaison})
+    agent_api.set_agent_hierarchy(previous)
+
+
+def _parse_sse(body: str):
+    events = []
+    for frame in body.split("\n\n"):
+        for line in frame.splitlines():
+            if line.startswith("data: "):
+                events.append(json.loads(line[len("data: "):]))
+    return events
+
+
+def test_chat_stream_requires_hierarchy(hierarchy):
+    agent_api.set_agent_hierarchy(None)
+    response = client.post("/chat/stream", json={"message": "hi"})
+    assert response.status_code == 503
+
+
+def test_chat_stream_emits_tokens_and_progress(hierarchy):
+    hierarchy(FakeLiaison())
+
+    response = client.post("/chat/stream", json={"message": "build it", "session_id": "s1"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    assert [e["type"] for e in events] == ["intent", "task_started", "token", "token", "done"]
+    assert events[-1]["response"] == "Hello"
+    assert all(e["session_id"] == "s1" for e in events)
+
+
+def test_websocket_streams_events(hierarchy):
+    hierarchy(FakeLiaison())
+
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.send_json({"message": "build it"})
+        received = []
+        while True:
+            event = ws.receive_json()
+            received.append(event["type"])
+            if event["type"] == "done":
+                break
+
+    assert received == ["intent", "task_started", "token", "token", "done"]
+
+
+def test_websocket_cancel_stops_producer(hierarchy):
+    liaison = SlowLiaison()
+    hierarchy(liaison)
+
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.send_json({"message": "long task"})
+        assert ws.receive_json()["type"] == "token"
+        ws.send_json({"type": "cancel"})
+        assert ws.receive_json()["type"] == "cancelled"
+
+    assert liaison.cancelled is True
+
+
+@pytest.mark.asyncio
+async def test_cancelling_producer_with_full_queue_does_not_hang():
+    from src.middleware.event_stream import EventStream
+
+    class ChattyLiaison:
+        async def stream_user_message(self, message: str):
+            while True:
+                yield {"type": "token", "text": "x"}
+
+    stream = EventStream(maxsize=2)
+    producer = asyncio.create_task(agent_api._produce_chat_events(ChattyLiaison(), "hi", stream))
+    await asyncio.sleep(0.01)  # Producer is now blocked on a full queue
+
+    await asyncio.wait_for(agent_api._cancel_and_wait(producer), timeout=1)
+
+    assert producer.cancelled()
+    assert [event async for event in stream] == [{"type": "token", "text": "x"}]
+
+
+@pytest.mark.asyncio
+async def test_cancel_and_wait_propagates_outer_cancellation():
+    producer = asyncio.create_task(asyncio.sleep(30))
+
+    async def handler():
+        await agent_api._cancel_and_wait(producer)
+        return "carried on"
+
+    task = asyncio.create_task(handler())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+def test_websocket_rejects_invalid_frames(hierarchy):
+    liaison = SlowLiaison()
+    hierarchy(liaison)
+
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.send_text("{not json")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json([1])
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json({"session_id": "s1"})  # Missing message
+        assert ws.receive_json()["type"] == "error"
+
+        # The socket is still usable; a non-object frame mid-stream is ignored
+        ws.send_json({"message": "long task"})
+        assert ws.receive_json()["type"] == "token"
+        ws.send_json([1])
+        ws.send_json({"type": "cancel"})
+        assert ws.receive_json()["type"] == "cancelled"
@@ -0,0 +1,143 @@
+"""
+Unit tests for per-model LLM admission control.
+"""
+
+import asyncio
+import pytest
+import httpx
+from src.clients.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    get_admission_controller,
+    llm_priority,
+    reset_admission_controllers,
+)
+
+
+async def _hold(controller, order, name, release, priority=None):
+    async with controller.admit(priority):
+        order.append(name)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_limit_bounds_concurrency():
+    controller = AdmissionController("m", initial_limit=2, adaptive=False)
+    release = asyncio.Event()
+    order = []
+
+    tasks = [asyncio.create_task(_hold(controller, order, i, release)) for i in range(4)]
+    await asyncio.sleep(0.01)
+    assert controller.in_flight == 2
+    assert controller.queue_depth == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert controller.in_flight == 0
+    assert sorted(order) == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_interactive_admitted_before_background():
+    controller = AdmissionController("m", initial_limit=1, adaptive=False)
+    blocker = asyncio.Event()
+    release = asyncio.Event()
+    release.set()
+    order = []
+
+    holder = asyncio.create_task(_hold(controller, order, "holder", blocker))
+    await asyncio.sleep(0)
+    with llm_priority("background"):
+        background = asyncio.create_task(_hold(controller, order, "background", release))
+    interactive = asyncio.create_task(_hold(controller, order, "interactive", release, "interactive"))
+    await asyncio.sleep(0.01)
+
+    blocker.set()
+    await asyncio.gather(holder, background, interactive)
+    assert order == ["holder", "interactive", "background"]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_or_displaces_lower_priority():
+    controller = AdmissionController("m", initial_limit=1, max_queue=1, adaptive=False)
+    release = asyncio.Event()
+    order = []
+
+    holder = asyncio.create_task(_hold(controller, order, "holder", release))
+    background = asyncio.create_task(_hold(controller, order, "bg", release, "background"))
+    await asyncio.sleep(0.01)
+
+    # Same priority as the queued waiter: rejected
+    with pytest.raises(AdmissionRejected) as exc:
+        async with controller.admit("background"):
+            pass
+    assert exc.value.reason == "queue_full"
+
+    # Higher priority displaces the queued background waiter
+    interactive = asyncio.create_task(_hold(controller, order, "fg", release, "interactive"))
+    await asyncio.sleep(0.01)
+    with pytest.raises(AdmissionRejected) as exc:
+        await background
+    assert exc.value.reason == "displaced"
+
+    release.set()
+    await asyncio.gather(holder, interactive)
+    assert order == ["holder", "fg"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_rejection_and_timeout():
+    controller = AdmissionController("m", initial_limit=1, adaptive=False)
+    controller._avg_latency = 5.0
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, [], "holder", release))
+    await asyncio.sleep(0)
+
+    # Expected wait (~5s) exceeds the deadline: rejected without queueing
+    with pytest.raises(AdmissionRejected) as exc:
+        async with controller.admit(timeout=1.0):
+            pass
+    assert exc.value.reason == "deadline"
+
+    controller._avg_latency = None
+    with pytest.raises(AdmissionRejected) as exc:
+        async with controller.admit(timeout=0.01):
+            pass
+    assert exc.value.reason == "timeout"
+    assert controller.queue_depth == 0
+
+    release.set()
+    await holder
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_aimd_grows_when_saturated_and_backs_off_on_overload():
+    controller = AdmissionController("m", initial_limit=1, max_limit=4)
+
+    for _ in range(3):
+        async with controller.admit():
+            await asyncio.sleep(0.001)
+    assert controller.limit > 1
+
+    grown = controller._limit
+    controller._last_decrease = 0.0
+    with pytest.raises(httpx.ConnectTimeout):
+        async with controller.admit():
+            raise httpx.ConnectTimeout("slow")
+    assert controller._limit == pytest.approx(grown * controller.backoff)
+
+    # Client errors (4xx) are not congestion signals
+    before = controller._limit
+    request = httpx.Request("POST", "http://x")
+    with pytest.raises(httpx.HTTPStatusError):
+        async with controller.admit():
+            raise httpx.HTTPStatusError("bad", request=request, response=httpx.Response(400, request=request))
+    assert controller._limit == before
+
+
+def test_controllers_are_per_model():
+    reset_admission_controllers()
+    assert get_admission_controller("a") is get_admission_controller("a")
+    assert get_admission_controller("a") is not get_admission_controller("b")
+    reset_admission_controllers()
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import agent_api
+from src.services.agent_factory import AgentFactory, LazyAgentRegistry, StartupReport
+
+
+def test_lazy_registry_constructs_on_first_access():
+    built = []
+    report = StartupReport()
+    registry = LazyAgentRegistry(
+        {"coder": lambda: built.append("coder") or object(), "writer": lambda: built.append("writer") or object()},
+        group="executors",
+        report=report
+    )
+
+    assert list(registry) == ["coder", "writer"] and "coder" in registry and len(registry) == 2
+    assert built == []
+
+    coder = registry.get("coder")
+    assert registry["coder"] is coder
+    assert registry.get("missing") is None
+    assert built == ["coder"]
+    assert registry.loaded() == ["coder"] and not registry.is_loaded("writer")
+    assert report.components["executors.coder"]["status"] == "ok"
+
+
+def test_create_hierarchy_defers_domain_leads_and_executors():
+    hierarchy = AgentFactory.create_hierarchy(lazy=True)
+
+    assert hierarchy["domain_leads"].loaded() == []
+    assert hierarchy["executors"].loaded() == []
+    assert {"chat_client", "project_lead", "liaison"} <= set(hierarchy["startup"].components)
+
+    # Workflows construct agents through their registry lookups
+    dev_dl = hierarchy["workflows"]["olb"].domain_leads.get("Development")
+    assert dev_dl is hierarchy["domain_leads"]["Development"]
+    assert hierarchy["domain_leads"].loaded() == ["Development"]
+
+
+def test_create_hierarchy_eager():
+    hierarchy = AgentFactory.create_hierarchy(lazy=False)
+
+    assert hierarchy["domain_leads"].loaded() == ["Development", "Documentation"]
+    assert hierarchy["executors"].loaded() == ["coder", "tester", "writer"]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_runs_steps_concurrently_and_tolerates_failures(monkeypatch):
+    from src.persistence.db_pool import db_pool
+    from src.services import project_context_service as pcs
+
+    async def slow_open():
+        await asyncio.sleep(0.2)
+        return False  # Pool unavailable: degraded, not fatal
+
+    async def slow_snapshot(project_id=None):
+        await asyncio.sleep(0.2)
+        raise OSError("boom")
+
+    monkeypatch.setattr(db_pool, "open", slow_open)
+    monkeypatch.setattr(pcs.project_context_service, "get_snapshot", slow_snapshot)
+    hierarchy = AgentFactory.create_hierarchy()
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    report = await AgentFactory.warm_up(hierarchy)
+
+    assert loop.time() - started < 0.35
+    assert report.ready
+    assert report.components["database_pool"]["status"] == "degraded"
+    assert report.components["project_context"]["status"] == "failed"
+    assert report.components["tool_schemas"]["status"] == "ok"
+    assert "database_pool=" in report.summary()
+
+
+def test_ready_endpoint_reflects_warm_up():
+    client = TestClient(agent_api.app)
+    previous = agent_api.agent_hierarchy
+    report = StartupReport()
+    try:
+        agent_api.set_agent_hierarchy(None)
+        assert client.get("/ready").status_code == 503
+
+        agent_api.set_agent_hierarchy({"startup": report})
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "starting"
+
+        report.record("database_pool", 0.01)
+        report.ready = True
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["startup"]["components"]["database_pool"]["status"] == "ok"
+        assert client.get("/health").status_code == 200
+    finally:
+        agent_api.set_agent_hierarchy(previous)
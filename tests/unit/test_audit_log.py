@@ -0,0 +1,196 @@
+"""
+Unit tests for the buffered (write-behind) audit log writer.
+"""
+
+import asyncio
+import json
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from src.persistence import audit_log as audit_log_module
+from src.persistence.audit_log import AuditLogProvider
+
+
+class FakePool:
+    """Pool stand-in whose connection records COPY batches."""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    @asynccontextmanager
+    async def acquire(self, db_url=None):
+        conn = AsyncMock()
+
+        async def copy_records_to_table(table, records, columns):
+            if self.fail:
+                raise OSError("database down")
+            self.batches.append(list(records))
+
+        conn.copy_records_to_table.side_effect = copy_records_to_table
+        yield conn
+
+
+@pytest.fixture(autouse=True)
+def skip_migrations(monkeypatch):
+    monkeypatch.setattr(audit_log_module, "ensure_schema", AsyncMock())
+
+
+def _provider(pool, **kwargs):
+    kwargs.setdefault("batch_size", 10)
+    kwargs.setdefault("flush_interval", 0.05)
+    kwargs.setdefault("max_queue_size", 100)
+    kwargs.setdefault("overflow_policy", "block")
+    return AuditLogProvider(db_url="postgresql://db", pool=pool, buffered=True, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_log_enqueues_without_writing():
+    """log() should only enqueue; the write happens in batches."""
+    pool = FakePool()
+    audit = _provider(pool, flush_interval=10)
+
+    for i in range(3):
+        await audit.log("Agent", "OP", f"event {i}")
+
+    assert pool.batches == []
+    assert audit.queue_depth == 3
+
+    await audit.aclose()
+    assert len(pool.batches) == 1
+    assert [r[4] for r in pool.batches[0]] == ["event 0", "event 1", "event 2"]
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_batch_size():
+    """A full batch should be flushed without waiting for the interval."""
+    pool = FakePool()
+    audit = _provider(pool, batch_size=5, flush_interval=10)
+
+    for i in range(5):
+        await audit.log("Agent", "OP", str(i))
+    await asyncio.sleep(0.05)
+
+    assert len(pool.batches) == 1
+    assert len(pool.batches[0]) == 5
+    await audit.aclose()
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_interval():
+    """A partial batch should be flushed once the interval elapses."""
+    pool = FakePool()
+    audit = _provider(pool, flush_interval=0.05)
+
+    await audit.log("Agent", "OP", "lonely")
+    await asyncio.sleep(0.15)
+
+    assert len(pool.batches) == 1
+    await audit.aclose()
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_policy():
+    """When the queue is full, the oldest events are discarded."""
+    pool = FakePool()
+    audit = _provider(pool, max_queue_size=2, overflow_policy="drop_oldest", flush_interval=10)
+    audit._ensure_flusher = lambda: None  # keep everything queued
+
+    for i in range(4):
+        await audit.log("Agent", "OP", str(i))
+    await audit.aclose()
+
+    assert [r[4] for r in pool.batches[0]] == ["2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_spill_policy_replays_after_recovery(tmp_path):
+    """Overflow and failed flushes spill to disk and replay on the next flush."""
+    spill = tmp_path / "spill.jsonl"
+    pool = FakePool(fail=True)
+    audit = _provider(pool, max_queue_size=1, overflow_policy="spill", spill_path=str(spill), flush_interval=10)
+    audit._ensure_flusher = lambda: None
+
+    await audit.log("Agent", "OP", "queued")
+    await audit.log("Agent", "OP", "overflow")
+    await audit.flush()  # database down: queued event is spilled too
+
+    spilled = [json.loads(line)["details"] for line in spill.read_text().splitlines()]
+    assert spilled == ["overflow", "queued"]
+
+    pool.fail = False
+    await audit.log("Agent", "OP", "fresh")
+    await audit.aclose()
+
+    written = [r[4] for batch in pool.batches for r in batch]
+    assert written == ["fresh", "overflow", "queued"]
+    assert not spill.exists()
+
+
+@pytest.mark.asyncio
+async def test_unbuffered_writes_immediately():
+    """buffered=False keeps the synchronous single-insert behaviour."""
+    pool = FakePool()
+    audit = AuditLogProvider(db_url="postgresql://db", pool=pool, buffered=False)
+
+    await audit.log("Agent", "OP", "now")
+
+    assert len(pool.batches) == 1
+
+
+@pytest.mark.asyncio
+async def test_spill_replay_skips_bad_lines_and_keeps_unwritten(tmp_path, monkeypatch):
+    """Corrupt spill lines are skipped; a failed replay keeps only what was not written."""
+    spill = tmp_path / "spill.jsonl"
+    good = [
+        json.dumps({"timestamp": "2025-01-01T00:00:00", "agent_name": "Agent",
+                    "session_id": None, "operation": "OP", "details": f"event-{i}"})
+        for i in range(4)
+    ]
+    spill.write_text("\n".join([good[0], "{not json", good[1], good[2], good[3]]) + "\n")
+    pool = FakePool()
+    audit = _provider(pool, batch_size=2, overflow_policy="spill", spill_path=str(spill))
+
+    real_acquire = pool.acquire
+    calls = {"n": 0}
+
+    def acquire(db_url=None):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            pool.fail = True
+        return real_acquire(db_url)
+
+    monkeypatch.setattr(pool, "acquire", acquire)
+    await audit._replay_spill()
+
+    assert [r[4] for batch in pool.batches for r in batch] == ["event-0", "event-1"]
+    kept = [json.loads(line)["details"] for line in spill.read_text().splitlines()]
+    assert kept == ["event-2", "event-3"]
+    assert not (tmp_path / "spill.jsonl.replay").exists()
+
+    pool.fail = False
+    await audit._replay_spill()
+    assert [r[4] for batch in pool.batches for r in batch] == ["event-0", "event-1", "event-2", "event-3"]
+    assert not spill.exists()
+
+
+@pytest.mark.asyncio
+async def test_spill_file_io_runs_off_the_event_loop(tmp_path, monkeypatch):
+    import threading
+
+    threads = []
+    original = AuditLogProvider._append_spill
+
+    def append_spill(self, batch):
+        threads.append(threading.current_thread())
+        original(self, batch)
+
+    monkeypatch.setattr(AuditLogProvider, "_append_spill", append_spill)
+    audit = _provider(FakePool(fail=True), overflow_policy="spill", spill_path=str(tmp_path / "spill.jsonl"))
+    audit._ensure_flusher = lambda: None
+
+    await audit.log("Agent", "OP", "queued")
+    await audit.flush()
+
+    assert threads and all(t is not threading.main_thread() for t in threads)
+    assert json.loads((tmp_path / "spill.jsonl").read_text())["details"] == "queued"
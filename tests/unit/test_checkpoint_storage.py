@@ -0,0 +1,368 @@
+"""
+Unit tests for checkpoint compression, delta encoding and retention.
+"""
+
+import asyncio
+import json
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+from agent_framework import WorkflowCheckpoint
+from src.persistence import checkpoint_codec
+from src.persistence import checkpoint_storage as storage_module
+from src.persistence.checkpoint_storage import PostgreSQLCheckpointStorage
+
+
+class FakeConn:
+    """In-memory workflow_checkpoints table for the queries the storage issues."""
+
+    def __init__(self):
+        self.rows = []
+        self.clock = datetime(2025, 1, 1)
+
+    def _by_id(self, checkpoint_id):
+        return next((r for r in self.rows if r["checkpoint_id"] == checkpoint_id), None)
+
+    async def execute(self, sql, *args):
+        if sql.strip().startswith("INSERT"):
+            self.clock += timedelta(seconds=1)
+            cp_id, wf_id, state, codec, is_delta, base_id, size, iteration = args
+            if self._by_id(cp_id) is not None:
+                return "INSERT 0 0"  # ON CONFLICT DO NOTHING
+            self.rows.append({
+                "checkpoint_id": cp_id, "workflow_id": wf_id, "state": state,
+                "created_at": self.clock, "codec": codec, "is_delta": is_delta,
+                "base_checkpoint_id": base_id, "size_bytes": size, "iteration_count": iteration
+            })
+            return "INSERT 0 1"
+        if "ANY($1::uuid[])" in sql:
+            before = len(self.rows)
+            self.rows = [r for r in self.rows if r["checkpoint_id"] not in args[0]]
+            return f"DELETE {before - len(self.rows)}"
+        if sql.strip().startswith("DELETE"):
+            before = len(self.rows)
+            self.rows = [r for r in self.rows if r["checkpoint_id"] != args[0]]
+            return f"DELETE {before - len(self.rows)}"
+        if sql.strip().startswith("UPDATE"):
+            row = self._by_id(args[0])
+            row.update(state=args[1], codec=args[2], is_delta=False, base_checkpoint_id=None, size_bytes=args[3])
+            return "UPDATE 1"
+
+    async def fetch(self, sql, *args):
+        if "WITH RECURSIVE" in sql:
+            chain, row = [], self._by_id(args[0])
+            while row is not None:
+                chain.append(row)
+                row = self._by_id(row["base_checkpoint_id"]) if row["base_checkpoint_id"] else None
+            return list(reversed(chain))
+        if "WHERE base_checkpoint_id = $1" in sql:
+            return [r for r in self.rows if r["base_checkpoint_id"] == args[0]]
+        if "DISTINCT ON" in sql:
+            latest = {}
+            for r in sorted(self.rows, key=self._sort_key):
+                latest[r["workflow_id"]] = r
+            return list(latest.values())
+        if "LIMIT $" in sql:
+            return self._page(sql, list(args))
+        if "AS within_age" in sql:
+            return self._prune_rows(sql, list(args))
+        rows = [r for r in self.rows if not args or r["workflow_id"] == args[0]]
+        if "ORDER BY workflow_id" in sql:
+            return sorted(rows, key=lambda r: (r["workflow_id"], -r["created_at"].timestamp()))
+        return sorted(rows, key=lambda r: r["created_at"], reverse=True)
+
+    async def fetchrow(self, sql, workflow_id):
+        rows = sorted((r for r in self.rows if r["workflow_id"] == workflow_id), key=self._sort_key)
+        return rows[-1] if rows else None
+
+    def cursor(self, sql, *args, prefetch=None):
+        self.cursor_prefetch = prefetch
+        rows = sorted((r for r in self.rows if not args or r["workflow_id"] == args[0]), key=self._sort_key)
+        if "DESC" in sql:
+            rows.reverse()
+
+        async def iterate():
+            for row in rows:
+                yield row
+        return iterate()
+
+    def _page(self, sql, args):
+        limit = args.pop()
+        rows = sorted(self.rows, key=self._sort_key, reverse=True)
+        if "workflow_id = $1" in sql:
+            workflow_id = args.pop(0)
+            rows = [r for r in rows if r["workflow_id"] == workflow_id]
+        if args:
+            created_at, checkpoint_id = args
+            rows = [r for r in rows if (r["created_at"], r["checkpoint_id"]) < (created_at, checkpoint_id)]
+        return rows[:limit]
+
+    def _prune_rows(self, sql, args):
+        rows = self.rows
+        if "workflow_id = $1" in sql:
+            workflow_id = args.pop(0)
+            rows = [r for r in rows if r["workflow_id"] == workflow_id]
+        # LOCALTIMESTAMP is the fake clock
+        cutoff = self.clock - timedelta(seconds=args[0]) if args else None
+        rows = [dict(r, within_age=cutoff is None or r["created_at"] >= cutoff) for r in rows]
+        return sorted(rows, key=lambda r: (r["workflow_id"], -r["created_at"].timestamp()))
+
+    @staticmethod
+    def _sort_key(row):
+        return (row["created_at"], row["checkpoint_id"])
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConn()
+
+    @asynccontextmanager
+    async def acquire(self, db_url=None):
+        yield self.conn
+
+
+@pytest.fixture(autouse=True)
+def skip_migrations(monkeypatch):
+    monkeypatch.setattr(storage_module, "ensure_schema", AsyncMock())
+
+
+def _checkpoint(step: int, workflow_id: str = "wf") -> WorkflowCheckpoint:
+    return WorkflowCheckpoint(
+        workflow_id=workflow_id,
+        messages={"exec": [{"text": f"message {i}"} for i in range(step)]},
+        shared_state={"step": step, "notes": "x" * 500},
+        iteration_count=step
+    )
+
+
+class TestCheckpointCodec:
+
+    @pytest.mark.parametrize("codec", checkpoint_codec.available_codecs())
+    def test_round_trip(self, codec):
+        payload = {"a": [1, 2, 3], "b": {"c": "text" * 100}}
+        blob = checkpoint_codec.encode(payload, codec)
+        assert checkpoint_codec.decode(blob) == (payload, False)
+
+    def test_zlib_compresses(self):
+        payload = {"notes": "repetitive " * 1000}
+        assert len(checkpoint_codec.encode(payload, "zlib")) < len(json.dumps(payload)) / 10
+
+    def test_legacy_json_blob(self):
+        blob = json.dumps({"checkpoint_id": "x"}).encode("utf-8")
+        assert checkpoint_codec.decode(blob) == ({"checkpoint_id": "x"}, False)
+
+    def test_unavailable_codec_falls_back(self):
+        assert checkpoint_codec.resolve_codec("brotli") == "zlib"
+
+    def test_diff_apply(self):
+        old = {"keep": 1, "gone": 2, "list": [1, 2], "nested": {"x": 1, "y": 2}}
+        new = {"keep": 1, "list": [1, 2, 3], "nested": {"x": 1, "y": 3}, "added": True}
+        delta = checkpoint_codec.diff(old, new)
+        assert delta["sub"]["list"] == {"append": [3]}
+        assert checkpoint_codec.apply(old, delta) == new
+        assert checkpoint_codec.diff(new, new) is None
+
+
+class TestCheckpointStorage:
+
+    @pytest.mark.asyncio
+    async def test_save_and_load_compressed(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(db_url="postgresql://db", pool=pool, codec="zlib", delta_encoding=False)
+        checkpoint = _checkpoint(3)
+
+        await storage.save_checkpoint(checkpoint)
+        loaded = await storage.load_checkpoint(checkpoint.checkpoint_id)
+
+        assert pool.conn.rows[0]["state"].startswith(checkpoint_codec.MAGIC)
+        assert loaded.to_dict() == checkpoint.to_dict()
+
+    @pytest.mark.asyncio
+    async def test_delta_chain_with_keyframes(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(
+            db_url="postgresql://db", pool=pool, delta_encoding=True, keyframe_interval=3
+        )
+        checkpoints = [_checkpoint(step) for step in range(5)]
+        for checkpoint in checkpoints:
+            await storage.save_checkpoint(checkpoint)
+
+        assert [r["is_delta"] for r in pool.conn.rows] == [False, True, True, False, True]
+        assert pool.conn.rows[2]["size_bytes"] < pool.conn.rows[0]["size_bytes"]
+        for checkpoint in checkpoints:
+            loaded = await storage.load_checkpoint(checkpoint.checkpoint_id)
+            assert loaded.to_dict() == checkpoint.to_dict()
+
+        listed = await storage.list_checkpoints("wf")
+        assert [c.iteration_count for c in listed] == [4, 3, 2, 1, 0]
+
+    @pytest.mark.asyncio
+    async def test_metadata_listing_skips_state(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(db_url="postgresql://db", pool=pool)
+        await storage.save_checkpoint(_checkpoint(1))
+
+        metadata = await storage.list_checkpoint_metadata("wf")
+
+        assert metadata[0]["iteration_count"] == 1
+        assert metadata[0]["codec"] == "zlib"
+        assert "state" not in metadata[0]
+
+    @pytest.mark.asyncio
+    async def test_prune_keeps_bases_of_retained_deltas(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(
+            db_url="postgresql://db", pool=pool, delta_encoding=True,
+            keyframe_interval=4, retention_count=2
+        )
+        checkpoints = [_checkpoint(step) for step in range(6)]
+        for checkpoint in checkpoints:
+            await storage.save_checkpoint(checkpoint)
+
+        deleted = await storage.prune()
+
+        # Newest two are deltas on keyframe #4; #0-#3 form an unneeded chain
+        assert deleted == 4
+        remaining = {r["iteration_count"] for r in pool.conn.rows}
+        assert remaining == {4, 5}
+        loaded = await storage.load_checkpoint(checkpoints[5].checkpoint_id)
+        assert loaded.to_dict() == checkpoints[5].to_dict()
+
+    @pytest.mark.asyncio
+    async def test_prune_by_age(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(db_url="postgresql://db", pool=pool, retention_seconds=2)
+        for step in range(5):
+            await storage.save_checkpoint(_checkpoint(step))
+        await storage.save_checkpoint(_checkpoint(0, workflow_id="stale"))
+        pool.conn.clock += timedelta(seconds=60)
+
+        deleted = await storage.prune()
+
+        # Only the newest of each workflow survives once everything is stale
+        assert deleted == 4
+        assert {(r["workflow_id"], r["iteration_count"]) for r in pool.conn.rows} == {("wf", 4), ("stale", 0)}
+
+    @pytest.mark.asyncio
+    async def test_retention_is_opt_in(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(db_url="postgresql://db", pool=pool)
+        for step in range(3):
+            await storage.save_checkpoint(_checkpoint(step))
+
+        assert storage.retention_count is None and storage.retention_seconds is None
+        assert await storage.prune() == 0
+        storage.start_background_pruning()
+        assert storage._prune_task is None
+        # An explicit 0 is a policy, not "use the default"
+        assert PostgreSQLCheckpointStorage(pool=pool, retention_count=0).retention_count == 0
+
+    @pytest.mark.asyncio
+    async def test_skipped_insert_does_not_advance_delta_base(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(db_url="postgresql://db", pool=pool, delta_encoding=True)
+        first = _checkpoint(1)
+        await storage.save_checkpoint(first)
+
+        # Same id with different state: the stored row keeps the old state
+        duplicate = WorkflowCheckpoint.from_dict(dict(_checkpoint(2).to_dict(), checkpoint_id=first.checkpoint_id))
+        await storage.save_checkpoint(duplicate)
+        following = _checkpoint(3)
+        await storage.save_checkpoint(following)
+
+        assert len(pool.conn.rows) == 2
+        assert pool.conn.rows[1]["is_delta"] is False
+        loaded = await storage.load_checkpoint(following.checkpoint_id)
+        assert loaded.to_dict() == following.to_dict()
+
+    @pytest.mark.asyncio
+    async def test_delete_rebases_dependents(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(db_url="postgresql://db", pool=pool, delta_encoding=True)
+        first, second = _checkpoint(1), _checkpoint(2)
+        await storage.save_checkpoint(first)
+        await storage.save_checkpoint(second)
+
+        assert await storage.delete_checkpoint(first.checkpoint_id) is True
+
+        loaded = await storage.load_checkpoint(second.checkpoint_id)
+        assert loaded.to_dict() == second.to_dict()
+        assert pool.conn.rows[0]["is_delta"] is False
+
+
+class TestCheckpointListing:
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages_cover_all_rows(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(db_url="postgresql://db", pool=pool)
+        for step in range(5):
+            await storage.save_checkpoint(_checkpoint(step))
+        await storage.save_checkpoint(_checkpoint(9, workflow_id="other"))
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await storage.list_checkpoints_page("wf", limit=2, cursor=cursor)
+            seen.extend(item["iteration_count"] for item in page)
+            if cursor is None:
+                break
+
+        assert seen == [4, 3, 2, 1, 0]
+
+    @pytest.mark.asyncio
+    async def test_iter_checkpoints_streams_deltas(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(
+            db_url="postgresql://db", pool=pool, delta_encoding=True, keyframe_interval=3
+        )
+        checkpoints = [_checkpoint(step) for step in range(5)]
+        for checkpoint in checkpoints:
+            await storage.save_checkpoint(checkpoint)
+
+        newest_first = [c.to_dict() async for c in storage.iter_checkpoints("wf", prefetch=2)]
+        oldest_first = [c.to_dict() async for c in storage.iter_checkpoints("wf", newest_first=False)]
+
+        assert newest_first == [c.to_dict() for c in reversed(checkpoints)]
+        assert oldest_first == [c.to_dict() for c in checkpoints]
+        assert pool.conn.cursor_prefetch == 20
+
+    @pytest.mark.asyncio
+    async def test_latest_checkpoint_fast_path(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(db_url="postgresql://db", pool=pool, delta_encoding=True)
+        for step in range(3):
+            await storage.save_checkpoint(_checkpoint(step))
+        await storage.save_checkpoint(_checkpoint(7, workflow_id="other"))
+
+        latest = await storage.get_latest_checkpoint("wf")
+        per_workflow = await storage.list_latest_per_workflow()
+
+        assert latest.iteration_count == 2
+        assert latest.shared_state["step"] == 2
+        assert {m["workflow_id"]: m["iteration_count"] for m in per_workflow} == {"wf": 2, "other": 7}
+        assert await storage.get_latest_checkpoint("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_background_pruning_lifecycle(self):
+        pool = FakePool()
+        storage = PostgreSQLCheckpointStorage(db_url="postgresql://db", pool=pool, retention_count=1)
+        for step in range(3):
+            await storage.save_checkpoint(_checkpoint(step))
+
+        storage.start_background_pruning(interval=60)
+        await asyncio.sleep(0.01)
+        assert len(pool.conn.rows) == 1
+        await storage.stop_background_pruning()
+        assert storage._prune_task is None
+
+        storage.retention_count = storage.retention_seconds = None
+        storage.start_background_pruning()
+        assert storage._prune_task is None
+
+    def test_shared_storage(self):
+        assert storage_module.get_checkpoint_storage() is storage_module.get_checkpoint_storage()
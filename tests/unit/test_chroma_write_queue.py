@@ -0,0 +1,155 @@
+"""
+Unit tests for the ChromaDB offline write queue: stores made while ChromaDB
+is unreachable are kept on disk and replayed with upsert on reconnect.
+"""
+
+import pytest
+
+from src.persistence import chromadb_context_provider as module
+from src.persistence.chroma_write_queue import ChromaWriteQueue
+from src.persistence.chromadb_context_provider import ChromaDBContextProvider
+
+
+class FakeCollection:
+    def __init__(self):
+        self.upsert_calls = []
+        self.documents = {}
+
+    def add(self, documents, metadatas, ids):
+        for doc_id, document, metadata in zip(ids, documents, metadatas):
+            self.documents[doc_id] = (document, metadata)
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.documents.pop(doc_id, None)
+
+    def upsert(self, ids, documents, metadatas):
+        self.upsert_calls.append(list(ids))
+        self.add(documents, metadatas, ids)
+
+
+class FakeClient:
+    def __init__(self):
+        self.collection = FakeCollection()
+
+    def get_or_create_collection(self, name):
+        return self.collection
+
+    def get_max_batch_size(self):
+        return 2
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Fake Chroma server; set ``down`` to refuse connections."""
+    state = {"down": True, "client": FakeClient()}
+
+    def http_client(host, port):
+        if state["down"]:
+            raise ConnectionError("Could not connect to a Chroma server")
+        return state["client"]
+
+    monkeypatch.setattr(module.chromadb, "HttpClient", http_client)
+    return state
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = ChromaWriteQueue(str(tmp_path / "queue.sqlite"), max_bytes=1024 * 1024)
+    yield queue
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_offline_stores_are_queued_and_replayed(server, queue, monkeypatch):
+    provider = ChromaDBContextProvider(collection_name="memory", write_queue=queue)
+
+    doc_id = await provider.store("remember this", {"topic": "a"})
+    ids = await provider.store_many(["one", "two", "three"], chunk_size=0)
+
+    assert doc_id != "offline_id" and len(set(ids)) == 3
+    assert queue.pending("memory") == 4 and queue.pending("other") == 0
+
+    server["down"] = False
+    monkeypatch.setattr(provider, "_retry_at", 0.0)
+    assert await provider.flush_pending() == 4
+
+    collection = server["client"].collection
+    assert [len(call) for call in collection.upsert_calls] == [2, 2]  # Server batch limit
+    assert collection.documents[doc_id] == ("remember this", {"topic": "a", "project_id": 0})
+    assert set(collection.documents) == {doc_id, *ids}
+    assert queue.pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_reconnect_starts_replay_in_background(server, queue):
+    queue.enqueue("memory", ["queued-1"], ["doc"], [{"project_id": 0}])
+    provider = ChromaDBContextProvider(collection_name="memory", write_queue=queue)
+    server["down"] = False
+
+    assert await provider.query_many([]) == []  # No Chroma call, no connection
+    assert await provider.connect()
+    assert await provider._replay_task == 1
+    assert "queued-1" in server["client"].collection.documents
+    await provider.aclose()
+
+
+def test_requeueing_an_id_replaces_the_entry(queue):
+    queue.enqueue("memory", ["id-1", "id-2"], ["first", "other"], [{}, {}])
+    queue.enqueue("memory", ["id-1"], ["second"], [{"v": 2}])
+
+    pending = queue.peek("memory", 10)
+    assert [(w.doc_id, w.document, w.metadata) for w in pending] == [
+        ("id-2", "other", {}),
+        ("id-1", "second", {"v": 2}),
+    ]
+    queue.ack([w.seq for w in pending[:1]])
+    assert [w.doc_id for w in queue.peek("memory", 10)] == ["id-1"]
+
+
+def test_disk_budget_drops_oldest_writes(tmp_path):
+    queue = ChromaWriteQueue(str(tmp_path / "small.sqlite"), max_bytes=250)
+    for i in range(5):
+        queue.enqueue("memory", [f"id-{i}"], ["x" * 100], [{}])
+
+    assert queue.size_bytes() <= 250
+    assert [w.doc_id for w in queue.peek("memory", 10)] == ["id-3", "id-4"]
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_write_larger_than_queue_is_not_acknowledged(server, tmp_path):
+    queue = ChromaWriteQueue(str(tmp_path / "tiny.sqlite"), max_bytes=200)
+    provider = ChromaDBContextProvider(collection_name="memory", write_queue=queue)
+
+    kept = await provider.store("small")
+    assert await provider.store("x" * 500) == "offline_id"
+    assert await provider.store_many(["y" * 150, "z" * 150], chunk_size=0) == []
+
+    assert [w.doc_id for w in queue.peek("memory", 10)] == [kept]
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_delete_discards_queued_write(server, queue, monkeypatch):
+    provider = ChromaDBContextProvider(collection_name="memory", write_queue=queue)
+    forgotten, kept = await provider.store_many(["forget me", "keep me"], chunk_size=0)
+    queue.enqueue("other", [forgotten], ["same id, other collection"], [{}])
+
+    # Offline: the queued write alone is the document
+    assert await provider.delete(forgotten) is True
+    assert [w.doc_id for w in queue.peek("memory", 10)] == [kept]
+    assert queue.pending("other") == 1
+    with pytest.raises(RuntimeError):
+        await provider.delete("never-stored")
+
+    server["down"] = False
+    monkeypatch.setattr(provider, "_retry_at", 0.0)
+    assert await provider.flush_pending() == 1
+    assert set(server["client"].collection.documents) == {kept}
+    assert await provider.delete(kept) is True
+    assert server["client"].collection.documents == {}
+
+
+def test_default_queue_disabled_in_tests():
+    assert ChromaDBContextProvider(collection_name="defaults")._write_queue is None
@@ -0,0 +1,121 @@
+"""
+Unit tests for ChromaDBContextProvider connection handling: lazy connect,
+reconnect backoff, dedicated thread pool and operation timeouts.
+"""
+
+import threading
+import time
+
+import httpx
+import pytest
+
+from src.persistence import chromadb_context_provider as module
+from src.persistence.chromadb_context_provider import ChromaDBContextProvider
+
+
+class FakeCollection:
+    def __init__(self):
+        self.delay = 0.0
+        self.threads = []
+
+    def add(self, documents, metadatas, ids):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+
+    def get(self, ids):
+        self.threads.append(threading.current_thread().name)
+        return {"documents": ["doc"], "metadatas": [{"project_id": 0}]}
+
+
+class FakeClient:
+    def __init__(self):
+        self.collection = FakeCollection()
+
+    def get_or_create_collection(self, name):
+        return self.collection
+
+    def get_max_batch_size(self):
+        return 100
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Records HttpClient constructions; set ``fail`` to refuse connections."""
+    state = {"count": 0, "fail": False, "client": FakeClient()}
+
+    def http_client(host, port):
+        state["count"] += 1
+        if state["fail"]:
+            raise ConnectionError("Could not connect to a Chroma server")
+        return state["client"]
+
+    monkeypatch.setattr(module.chromadb, "HttpClient", http_client)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_connects_lazily_on_the_chroma_pool(connections):
+    provider = ChromaDBContextProvider(collection_name="lazy")
+    assert connections["count"] == 0 and not provider.is_connected
+
+    await provider.store("content", {})
+    retrieved = await provider.retrieve("some-id")
+
+    assert connections["count"] == 1 and provider.is_connected
+    assert retrieved["content"] == "doc"
+    assert all(name.startswith("chroma") for name in connections["client"].collection.threads)
+
+
+@pytest.mark.asyncio
+async def test_reconnect_backoff(connections, monkeypatch):
+    connections["fail"] = True
+    provider = ChromaDBContextProvider(collection_name="backoff", write_queue=None)
+
+    assert await provider.store("content") == "offline_id"
+    assert await provider.query("anything") == []
+    assert connections["count"] == 1  # Second call is inside the backoff window
+
+    with pytest.raises(RuntimeError, match="ChromaDB collection not available"):
+        await provider.retrieve("id")
+
+    # Once the backoff has elapsed the next operation reconnects
+    connections["fail"] = False
+    monkeypatch.setattr(provider, "_retry_at", 0.0)
+    assert await provider.store("content") != "offline_id"
+    assert connections["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_timeout_drops_connection(connections):
+    provider = ChromaDBContextProvider(collection_name="slow", operation_timeout=0.05, write_queue=None)
+    await provider.connect()
+    connections["client"].collection.delay = 0.3
+
+    with pytest.raises(TimeoutError):
+        await provider.store("content")
+    assert not provider.is_connected
+
+    connections["client"].collection.delay = 0.0
+    await provider.store("content")
+    assert provider.is_connected and connections["count"] == 2
+
+
+def _wrapped_connect_error():
+    # What chromadb raises when the server is unreachable
+    try:
+        try:
+            raise httpx.ConnectError("All connection attempts failed")
+        except httpx.ConnectError:
+            raise ValueError("Could not connect to a Chroma server. Are you sure it is running?")
+    except ValueError as e:
+        return e
+
+
+def test_connection_errors_are_matched_by_type():
+    assert module._is_connection_error(httpx.ReadTimeout("slow"))
+    assert module._is_connection_error(ConnectionRefusedError())
+    assert module._is_connection_error(TimeoutError())
+    assert module._is_connection_error(_wrapped_connect_error())
+    # Application errors mentioning "connect" are not connection failures
+    assert not module._is_connection_error(ValueError("Invalid metadata key 'connection'"))
+    assert not module._is_connection_error(RuntimeError("disconnected documents"))
@@ -0,0 +1,130 @@
+"""
+Unit tests for the batched ChromaDBContextProvider APIs (store_many/query_many).
+
+Uses an in-memory stand-in for the Chroma HTTP client, so no server is needed.
+"""
+
+import pytest
+
+from src.persistence import chromadb_context_provider as module
+from src.persistence.chromadb_context_provider import ChromaDBContextProvider, chunk_text
+from src.persistence.project_context import project_context
+
+
+class FakeCollection:
+    def __init__(self):
+        self.add_calls = []
+        self.query_calls = []
+        self.documents = {}
+
+    def add(self, documents, metadatas, ids):
+        self.add_calls.append(list(ids))
+        for doc_id, document, metadata in zip(ids, documents, metadatas):
+            self.documents[doc_id] = (document, metadata)
+
+    def query(self, query_texts, n_results, where):
+        self.query_calls.append((list(query_texts), where))
+        return {
+            "ids": [[f"id-{text}"] for text in query_texts],
+            "documents": [[f"doc for {text}"] for text in query_texts],
+            "metadatas": [[{"project_id": 0}] for _ in query_texts],
+            "distances": [[0.1] for _ in query_texts],
+        }
+
+
+class FakeClient:
+    def __init__(self, max_batch_size=1000):
+        self.collection = FakeCollection()
+        self.max_batch_size = max_batch_size
+
+    def get_or_create_collection(self, name):
+        return self.collection
+
+    def get_max_batch_size(self):
+        return self.max_batch_size
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(module.chromadb, "HttpClient", lambda host, port: client)
+    return client
+
+
+@pytest.fixture
+def provider(fake_client):
+    return ChromaDBContextProvider(collection_name="test_batching")
+
+
+def test_chunk_text_prefers_boundaries_and_overlaps():
+    text = "alpha beta gamma delta\n\nepsilon zeta eta theta iota kappa"
+    chunks = chunk_text(text, chunk_size=25, overlap=6)
+
+    assert chunks[0] == "alpha beta gamma delta"
+    assert all(len(c) <= 25 for c in chunks)
+    assert "kappa" in chunks[-1]
+    assert chunk_text("short", chunk_size=100) == ["short"]
+    assert chunk_text("x" * 50, chunk_size=0) == ["x" * 50]
+    assert "".join(chunk_text("x" * 50, chunk_size=20)) == "x" * 50  # Hard cuts without separators
+
+
+@pytest.mark.asyncio
+async def test_store_many_batches_documents(provider, fake_client):
+    contents = [f"Document {i}" for i in range(10)]
+    metadatas = [{"index": i} for i in range(10)]
+
+    ids = await provider.store_many(contents, metadatas, batch_size=4, chunk_size=0)
+
+    assert len(ids) == 10 and len(set(ids)) == 10
+    assert [len(call) for call in fake_client.collection.add_calls] == [4, 4, 2]
+    document, metadata = fake_client.collection.documents[ids[3]]
+    assert document == "Document 3"
+    assert metadata == {"index": 3, "project_id": 0}
+
+
+@pytest.mark.asyncio
+async def test_store_many_chunks_long_documents(provider, fake_client):
+    long_doc = " ".join(f"word{i}" for i in range(200))
+
+    async with project_context.project_scope(5):
+        ids = await provider.store_many(["short", long_doc], [{"path": "a.md"}, {"path": "b.md"}], chunk_size=300)
+
+    stored = [fake_client.collection.documents[doc_id] for doc_id in ids]
+    chunks = [(doc, meta) for doc, meta in stored if meta["path"] == "b.md"]
+    assert len(chunks) > 1
+    assert {meta["parent_id"] for _, meta in chunks} == {ids[1].rsplit("-", 1)[0]}
+    assert [meta["chunk_index"] for _, meta in chunks] == list(range(len(chunks)))
+    assert all(meta["chunk_count"] == len(chunks) and meta["project_id"] == 5 for _, meta in chunks)
+    assert "parent_id" not in stored[0][1]
+
+
+@pytest.mark.asyncio
+async def test_batch_size_capped_by_server_limit(provider, fake_client):
+    fake_client.max_batch_size = 3
+
+    await provider.store_many([f"doc {i}" for i in range(7)], chunk_size=0)
+
+    assert [len(call) for call in fake_client.collection.add_calls] == [3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_query_many_batches_queries(provider, fake_client):
+    results = await provider.query_many(["a", "b", "c"], n_results=1, filter_metadata={"topic": "x"}, batch_size=2)
+
+    assert [r[0]["content"] for r in results] == ["doc for a", "doc for b", "doc for c"]
+    assert [texts for texts, _ in fake_client.collection.query_calls] == [["a", "b"], ["c"]]
+    assert fake_client.collection.query_calls[0][1] == {"$and": [{"topic": "x"}, {"project_id": 0}]}
+
+
+@pytest.mark.asyncio
+async def test_batched_apis_when_disconnected(monkeypatch):
+    def refuse(host, port):
+        raise ConnectionError("no server")
+
+    monkeypatch.setattr(module.chromadb, "HttpClient", refuse)
+    provider = ChromaDBContextProvider(collection_name="offline", write_queue=None)
+
+    assert await provider.store_many(["a", "b"]) == []
+    assert await provider.query_many(["a", "b"]) == [[], []]
+    with pytest.raises(ValueError):
+        await provider.store_many(["a"], [{}, {}])
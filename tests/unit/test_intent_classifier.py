@@ -0,0 +1,98 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.intent_classifier import (
+    CHIT_CHAT,
+    IDEA,
+    QUESTION,
+    IntentClassifier,
+    normalize,
+    parse_intent,
+)
+
+
+def _classifier(**kwargs):
+    kwargs.setdefault("examples_path", None)
+    return IntentClassifier(**kwargs)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("message,intent", [
+    ("Hello!", CHIT_CHAT),
+    ("hey there, how are you?", CHIT_CHAT),
+    ("Thanks", CHIT_CHAT),
+    ("Let's build a game", IDEA),
+    ("Create a new workflow for invoices", IDEA),
+    ("Can you implement a login page?", IDEA),
+    ("What is this project?", QUESTION),
+    ("Who are you", QUESTION),
+    ("Does the API support streaming?", QUESTION),
+])
+async def test_rules_answer_without_llm(message, intent):
+    llm = AsyncMock(return_value="QUESTION")
+    result = await _classifier().classify(message, llm_fallback=llm)
+
+    assert (result.intent, result.source) == (intent, "rules")
+    llm.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_llm_fallback_and_cache():
+    classifier = _classifier()
+    llm = AsyncMock(return_value="  idea\n")
+
+    first = await classifier.classify("The inventory spreadsheet keeps drifting from reality", llm_fallback=llm)
+    second = await classifier.classify("the inventory   spreadsheet keeps drifting from reality ", llm_fallback=llm)
+
+    assert (first.intent, first.source) == (IDEA, "llm")
+    assert (second.intent, second.source) == (IDEA, "cache")
+    assert llm.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_centroids_learn_from_llm_labels(tmp_path):
+    path = str(tmp_path / "examples.jsonl")
+    classifier = _classifier(examples_path=path, min_examples=2)
+    labels = {
+        "the deployment pipeline for billing": IDEA,
+        "a dashboard pipeline for billing reports": IDEA,
+        "billing pipeline dashboard with alerts": IDEA,
+        "curious about the agent hierarchy tiers": QUESTION,
+        "the agent hierarchy tiers and their roles": QUESTION,
+        "wondering about agent hierarchy tiers": QUESTION,
+    }
+    for text, label in labels.items():
+        await classifier.classify(text, llm_fallback=AsyncMock(return_value=label))
+
+    llm = AsyncMock(return_value="CHIT_CHAT")
+    result = await classifier.classify("billing pipeline dashboard", llm_fallback=llm)
+    assert (result.intent, result.source) == (IDEA, "centroid")
+    llm.assert_not_called()
+
+    # Examples persist across instances
+    reloaded = _classifier(examples_path=path, min_examples=2)
+    result = await reloaded.classify("agent hierarchy tiers roles", llm_fallback=llm)
+    assert (result.intent, result.source) == (QUESTION, "centroid")
+
+
+@pytest.mark.asyncio
+async def test_liaison_uses_classifier_before_llm():
+    from src.agents.liaison_agent import LiaisonAgent
+
+    chat_client = MagicMock()
+    chat_client.get_response = AsyncMock(return_value=MagicMock(text="CHIT_CHAT"))
+    liaison = LiaisonAgent(project_lead=MagicMock(), chat_client=chat_client, intent_classifier=_classifier())
+
+    assert await liaison._classify_intent("Let's build a rocket ship.") == IDEA
+    chat_client.get_response.assert_not_called()
+
+    assert await liaison._classify_intent("Rocket ship telemetry storage, thoughts") == CHIT_CHAT
+    chat_client.get_response.assert_awaited_once()
+    assert chat_client.get_response.call_args.kwargs["max_tokens"] == 8
+
+
+def test_normalize_and_parse():
+    assert normalize("  Hello\n  World ") == "hello world"
+    assert parse_intent("The intent is chit-chat.") == CHIT_CHAT
+    assert parse_intent("unsure") == QUESTION
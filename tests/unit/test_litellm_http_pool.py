@@ -0,0 +1,108 @@
+"""
+Unit tests for the shared HTTP connection pool in LiteLLMChatClient.
+"""
+
+import asyncio
+import pytest
+import httpx
+from src.clients.litellm_client import LiteLLMChatClient
+
+
+def _completion_body(text: str = "pong") -> dict:
+    return {
+        "id": "resp_1",
+        "choices": [{"message": {"role": "assistant", "content": text}}]
+    }
+
+
+@pytest.fixture
+def mock_transport():
+    """Transport that records requests and returns a canned completion."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=_completion_body())
+
+    transport = httpx.MockTransport(handler)
+    transport.requests = requests
+    return transport
+
+
+def test_http_client_is_created_once():
+    """The pooled client should be built lazily and reused."""
+    client = LiteLLMChatClient()
+    assert client._http_client is None
+
+    first = client.http_client
+    second = client.http_client
+
+    assert first is second
+    assert isinstance(first, httpx.AsyncClient)
+
+
+@pytest.mark.asyncio
+async def test_aclose_releases_owned_client():
+    """aclose() should close the owned pool and allow re-creation."""
+    client = LiteLLMChatClient()
+    http_client = client.http_client
+
+    await client.aclose()
+
+    assert http_client.is_closed
+    assert client._http_client is None
+    assert client.pool_stats() == {"in_use": 0, "idle": 0, "queued": 0}
+
+
+@pytest.mark.asyncio
+async def test_requests_share_injected_client(mock_transport):
+    """All completions should go through the same injected client."""
+    shared = httpx.AsyncClient(base_url="http://litellm", transport=mock_transport)
+    client = LiteLLMChatClient(http_client=shared)
+
+    first = await client.get_response("ping")
+    second = await client.get_response("ping again")
+
+    assert first.text == "pong"
+    assert second.text == "pong"
+    assert len(mock_transport.requests) == 2
+    assert all(r.url.path == "/chat/completions" for r in mock_transport.requests)
+    assert client.http_client is shared
+
+    # Injected clients are owned by the caller and must not be closed
+    await client.aclose()
+    assert not shared.is_closed
+    await shared.aclose()
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """Transport that emits httpcore trace events and blocks until released."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.received = asyncio.Event()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.received.set()
+        trace = request.extensions["trace"]
+        await self.release.wait()
+        await trace("connection.connect_tcp.complete", {})
+        await trace("http11.send_request_headers.started", {})
+        return httpx.Response(200, json=_completion_body())
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_track_own_requests():
+    """pool_stats() counts queued/in-use requests without reading pool internals."""
+    transport = TracingTransport()
+    shared = httpx.AsyncClient(base_url="http://litellm", transport=transport)
+    client = LiteLLMChatClient(http_client=shared)
+
+    request = asyncio.create_task(client._post_completion({"model": "m", "messages": []}))
+    await transport.received.wait()
+    assert client.pool_stats() == {"in_use": 0, "idle": 0, "queued": 1}
+
+    transport.release.set()
+    assert (await request)["id"] == "resp_1"
+    assert client.pool_stats() == {"in_use": 0, "idle": 1, "queued": 0}
+    await shared.aclose()
@@ -0,0 +1,102 @@
+"""
+Unit tests for SSE token streaming in LiteLLMChatClient.
+"""
+
+import json
+import pytest
+import httpx
+from agent_framework import ChatOptions, ChatResponse, FunctionCallContent, TextContent
+from src.clients.admission import get_admission_controller, reset_admission_controllers
+from src.clients.litellm_client import LiteLLMChatClient
+
+
+def _sse(*chunks) -> bytes:
+    lines = [f"data: {json.dumps(c)}\n\n" for c in chunks]
+    lines.append("data: [DONE]\n\n")
+    return "".join(lines).encode()
+
+
+def _client_for(body: bytes, content_type: str = "text/event-stream") -> LiteLLMChatClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, content=body, headers={"content-type": content_type})
+
+    http_client = httpx.AsyncClient(base_url="http://litellm", transport=httpx.MockTransport(handler))
+    return LiteLLMChatClient(http_client=http_client)
+
+
+@pytest.mark.asyncio
+async def test_streams_text_deltas():
+    """Each SSE text delta should become its own update."""
+    client = _client_for(_sse(
+        {"id": "r1", "choices": [{"delta": {"role": "assistant", "content": "Hel"}}]},
+        {"id": "r1", "choices": [{"delta": {"content": "lo"}}]},
+        {"id": "r1", "choices": [{"delta": {}, "finish_reason": "stop"}]},
+    ))
+
+    updates = [u async for u in client._inner_get_streaming_response(
+        messages=[], chat_options=ChatOptions()
+    )]
+
+    texts = [c.text for u in updates for c in u.contents if isinstance(c, TextContent)]
+    assert texts == ["Hel", "lo"]
+    assert ChatResponse.from_chat_response_updates(updates).text == "Hello"
+
+
+@pytest.mark.asyncio
+async def test_assembles_partial_tool_call_arguments():
+    """Tool-call argument fragments should be emitted as one complete call."""
+    client = _client_for(_sse(
+        {"id": "r2", "choices": [{"delta": {"tool_calls": [
+            {"index": 0, "id": "call_1", "type": "function", "function": {"name": "get_time", "arguments": "{\"tz\":"}}
+        ]}}]},
+        {"id": "r2", "choices": [{"delta": {"tool_calls": [
+            {"index": 0, "function": {"arguments": " \"UTC\"}"}}
+        ]}}]},
+        {"id": "r2", "choices": [{"delta": {}, "finish_reason": "tool_calls"}]},
+    ))
+
+    updates = [u async for u in client._inner_get_streaming_response(
+        messages=[], chat_options=ChatOptions()
+    )]
+
+    calls = [c for u in updates for c in u.contents if isinstance(c, FunctionCallContent)]
+    assert len(calls) == 1
+    assert calls[0].call_id == "call_1"
+    assert calls[0].name == "get_time"
+    assert calls[0].parse_arguments() == {"tz": "UTC"}
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_json_body():
+    """A non-streaming JSON answer should still be surfaced as an update."""
+    body = json.dumps({"id": "r3", "choices": [{"message": {"role": "assistant", "content": "full"}}]}).encode()
+    client = _client_for(body, content_type="application/json")
+
+    updates = [u async for u in client._inner_get_streaming_response(
+        messages=[], chat_options=ChatOptions()
+    )]
+
+    assert ChatResponse.from_chat_response_updates(updates).text == "full"
+
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_returns_admission_slot():
+    """Closing a stream mid-way should release its admission slot right away."""
+    reset_admission_controllers()
+    client = _client_for(_sse(
+        {"id": "r4", "choices": [{"delta": {"content": "one"}}]},
+        {"id": "r4", "choices": [{"delta": {"content": "two"}}]},
+    ))
+    controller = get_admission_controller(client.model_name)
+
+    stream = client._inner_get_streaming_response(messages=[], chat_options=ChatOptions())
+    first = await stream.__anext__()
+    assert first.text == "one"
+    assert controller.in_flight == 1
+
+    await stream.aclose()
+
+    assert controller.in_flight == 0
+    assert client.pool_stats()["in_use"] == 0
+    reset_admission_controllers()
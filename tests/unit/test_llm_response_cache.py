@@ -0,0 +1,149 @@
+"""
+Unit tests for the LLM response cache in front of LiteLLMChatClient.
+"""
+
+import pytest
+import httpx
+from agent_framework import ChatMessage, Role
+from src.clients.litellm_client import LiteLLMChatClient
+from src.clients.response_cache import ResponseCache, canonical_key, split_prompt
+
+
+def _completion_body(text: str = "pong") -> dict:
+    return {
+        "id": "resp_1",
+        "choices": [{"message": {"role": "assistant", "content": text}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    }
+
+
+def _client(cache: ResponseCache):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=_completion_body(f"answer {len(requests)}"))
+
+    http = httpx.AsyncClient(base_url="http://litellm", transport=httpx.MockTransport(handler))
+    return LiteLLMChatClient(http_client=http, response_cache=cache), requests
+
+
+class FakeCollection:
+    """ChromaDB collection stand-in matching on shared leading words."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def upsert(self, ids, documents, metadatas):
+        for doc_id, doc, meta in zip(ids, documents, metadatas):
+            self.rows[doc_id] = (doc, meta)
+
+    def query(self, query_texts, n_results, where, include):
+        words = set(query_texts[0].lower().split())
+        best = None
+        for doc, meta in self.rows.values():
+            if meta["context"] != where["context"]:
+                continue
+            other = set(doc.lower().split())
+            distance = 1 - len(words & other) / len(words | other)
+            if best is None or distance < best[0]:
+                best = (distance, meta)
+        if best is None:
+            return {"metadatas": [[]], "distances": [[]]}
+        return {"metadatas": [[best[1]]], "distances": [[best[0]]]}
+
+
+def test_canonical_key_ignores_key_order():
+    a = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "temperature": 0}
+    b = {"temperature": 0, "messages": [{"content": "hi", "role": "user"}], "model": "m"}
+    assert canonical_key(a) == canonical_key(b)
+    assert canonical_key(a) != canonical_key({**a, "temperature": 0.7})
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_hit_cache():
+    cache = ResponseCache(max_entries=8, ttl_seconds=60)
+    client, requests = _client(cache)
+    messages = [ChatMessage(role=Role.USER, text="classify this")]
+
+    first = await client.get_response(messages)
+    second = await client.get_response(messages)
+
+    assert len(requests) == 1
+    assert first.text == second.text == "answer 1"
+
+
+@pytest.mark.asyncio
+async def test_cache_opt_out_per_call():
+    cache = ResponseCache(max_entries=8, ttl_seconds=60)
+    client, requests = _client(cache)
+    messages = [ChatMessage(role=Role.USER, text="fresh please")]
+
+    await client.get_response(messages)
+    response = await client.get_response(messages, additional_properties={"cache": False})
+
+    assert len(requests) == 2
+    assert response.text == "answer 2"
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_lru_and_ttl(monkeypatch):
+    cache = ResponseCache(max_entries=2, ttl_seconds=10)
+    payloads = [{"model": "m", "messages": [{"role": "user", "content": str(i)}]} for i in range(3)]
+    for payload in payloads:
+        await cache.set(payload, _completion_body())
+
+    assert await cache.get(payloads[0]) is None  # evicted
+    assert await cache.get(payloads[2]) is not None
+
+    import src.clients.response_cache as module
+    now = module.time.time()
+    monkeypatch.setattr(module.time, "time", lambda: now + 11)
+    assert await cache.get(payloads[2]) is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_tier_survives_restart_and_evicts(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    payload = {"model": "m", "messages": [{"role": "user", "content": "persist"}]}
+
+    cache = ResponseCache(max_entries=4, ttl_seconds=None, persistent=True, path=path)
+    await cache.set(payload, _completion_body("stored"))
+    cache.sqlite.close()
+
+    reopened = ResponseCache(max_entries=4, ttl_seconds=None, persistent=True, path=path)
+    cached = await reopened.get(payload)
+    assert cached["choices"][0]["message"]["content"] == "stored"
+    assert len(reopened.memory) == 1  # promoted
+
+    reopened.sqlite.max_entries = 2
+    for i in range(3):
+        await reopened.set({"model": "m", "messages": [{"role": "user", "content": str(i)}]}, _completion_body())
+    (count,) = reopened.sqlite._conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()
+    assert count == 2
+    reopened.sqlite.close()
+
+
+@pytest.mark.asyncio
+async def test_semantic_tier_matches_near_duplicates():
+    cache = ResponseCache(
+        max_entries=8, ttl_seconds=None, semantic=True, similarity=0.7,
+        semantic_collection=FakeCollection()
+    )
+    base = {"model": "m", "messages": [{"role": "system", "content": "classify"}]}
+    stored = {**base, "messages": base["messages"] + [{"role": "user", "content": "please list all open projects now"}]}
+    await cache.set(stored, _completion_body("LIST_PROJECTS"))
+
+    near = {**base, "messages": base["messages"] + [{"role": "user", "content": "please list all open projects"}]}
+    other_context = {"model": "other", "messages": near["messages"]}
+    unrelated = {**base, "messages": base["messages"] + [{"role": "user", "content": "delete everything"}]}
+
+    assert (await cache.get(near))["choices"][0]["message"]["content"] == "LIST_PROJECTS"
+    assert await cache.get(other_context) is None
+    assert await cache.get(unrelated) is None
+
+
+def test_split_prompt_requires_trailing_user_text():
+    prompt, context = split_prompt({"model": "m", "messages": [{"role": "user", "content": "hi"}]})
+    assert prompt == "hi" and context
+    assert split_prompt({"model": "m", "messages": [{"role": "tool", "content": "x"}]}) == (None, "")
@@ -0,0 +1,191 @@
+"""
+Unit tests for PostgreSQLMessageStore persistence.
+"""
+
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from agent_framework import ChatMessage, FunctionCallContent, FunctionResultContent, TextContent
+from src.persistence import maf_message_store as store_module
+from src.persistence.maf_message_store import PostgreSQLMessageStore
+
+
+class FakeConn:
+    """In-memory agent_messages table understanding the store's queries."""
+
+    def __init__(self):
+        self.rows = []
+        self.inserts = 0
+        self.selects = []
+        self.execute = AsyncMock()
+
+    def add_row(self, session_id, role, content, message=None):
+        self.rows.append({
+            "id": len(self.rows) + 1,
+            "session_id": session_id,
+            "role": role,
+            "content": content,
+            "message": message
+        })
+        return self.rows[-1]["id"]
+
+    async def fetch(self, sql, session_id, *args):
+        if sql.strip().startswith("INSERT"):
+            self.inserts += 1
+            roles, contents, messages = args
+            ids = [self.add_row(session_id, *row) for row in zip(roles, contents, messages)]
+            return [{"id": i} for i in ids]
+
+        self.selects.append(args)
+        rows = [r for r in self.rows if r["session_id"] == session_id]
+        if "ORDER BY id DESC" in sql:
+            before_id, limit = args
+            rows = [r for r in reversed(rows) if before_id is None or r["id"] < before_id]
+            return rows[:limit]
+        after_id = args[0]
+        rows = [r for r in rows if r["id"] > after_id]
+        return rows[:args[1]] if len(args) > 1 else rows
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConn()
+
+    @asynccontextmanager
+    async def acquire(self, db_url=None):
+        yield self.conn
+
+
+@pytest.fixture(autouse=True)
+def skip_migrations(monkeypatch):
+    monkeypatch.setattr(store_module, "ensure_schema", AsyncMock())
+
+
+@pytest.fixture
+def pool():
+    return FakePool()
+
+
+@pytest.mark.asyncio
+async def test_add_messages_single_batch(pool):
+    """All messages should be written with one executemany call."""
+    store = PostgreSQLMessageStore("s1", db_url="postgresql://db", pool=pool)
+
+    await store.add_messages([
+        ChatMessage(role="user", text="hello"),
+        ChatMessage(role="assistant", text="hi")
+    ])
+
+    assert pool.conn.inserts == 1
+    assert [r["content"] for r in pool.conn.rows] == ["hello", "hi"]
+
+
+@pytest.mark.asyncio
+async def test_tool_contents_round_trip(pool):
+    """Tool calls, results, author and ids should survive a round trip."""
+    store = PostgreSQLMessageStore("s1", db_url="postgresql://db", pool=pool)
+    await store.add_messages([
+        ChatMessage(
+            role="assistant",
+            contents=[
+                TextContent(text="Let me check"),
+                FunctionCallContent(call_id="c1", name="read_file", arguments={"path": "a.py"})
+            ],
+            author_name="ProjectLead",
+            message_id="m1"
+        ),
+        ChatMessage(role="tool", contents=[FunctionResultContent(call_id="c1", result="print(1)")])
+    ])
+
+    fresh = PostgreSQLMessageStore("s1", db_url="postgresql://db", pool=pool)
+    call_msg, result_msg = await fresh.list_messages()
+
+    assert call_msg.author_name == "ProjectLead"
+    assert call_msg.message_id == "m1"
+    call = call_msg.contents[1]
+    assert isinstance(call, FunctionCallContent)
+    assert call.name == "read_file"
+    assert call.arguments == {"path": "a.py"}
+    assert isinstance(result_msg.contents[0], FunctionResultContent)
+    assert result_msg.contents[0].result == "print(1)"
+
+
+@pytest.mark.asyncio
+async def test_legacy_rows_fall_back_to_text(pool):
+    """Rows written before the message column existed are read from text."""
+    pool.conn.add_row("s1", "user", "old")
+    store = PostgreSQLMessageStore("s1", db_url="postgresql://db", pool=pool)
+
+    messages = await store.list_messages()
+
+    assert messages[0].text == "old"
+    assert messages[0].role.value == "user"
+
+
+@pytest.mark.asyncio
+async def test_list_messages_is_incremental(pool, monkeypatch):
+    """Later calls should only fetch rows newer than the last one seen."""
+    monkeypatch.setattr(store_module.settings, "MESSAGE_STORE_REFRESH_OVERLAP", 0)
+    store = PostgreSQLMessageStore("s1", db_url="postgresql://db", pool=pool)
+    await store.add_messages([ChatMessage(role="user", text="one")])
+    assert [m.text for m in await store.list_messages()] == ["one"]
+
+    # Own write plus a row from another writer
+    await store.add_messages([ChatMessage(role="assistant", text="two")])
+    pool.conn.add_row("s1", "user", "three")
+
+    messages = await store.list_messages()
+
+    assert [m.text for m in messages] == ["one", "two", "three"]
+    assert pool.conn.selects[-1] == (2,)  # only rows after our own write (id 2) were requested
+
+
+@pytest.mark.asyncio
+async def test_list_messages_picks_up_late_commits(pool, monkeypatch):
+    """A row committed after a higher id was read is merged in id order."""
+    monkeypatch.setattr(store_module.settings, "MESSAGE_STORE_REFRESH_OVERLAP", 2)
+    store = PostgreSQLMessageStore("s1", db_url="postgresql://db", pool=pool)
+    pool.conn.add_row("s1", "user", "one")
+    # id 2 is allocated by a transaction that has not committed yet
+    pool.conn.rows.append({"id": 3, "session_id": "s1", "role": "user", "content": "three", "message": None})
+    assert [m.text for m in await store.list_messages()] == ["one", "three"]
+
+    pool.conn.rows.insert(1, {"id": 2, "session_id": "s1", "role": "user", "content": "two", "message": None})
+    messages = await store.list_messages()
+
+    assert [m.text for m in messages] == ["one", "two", "three"]
+    assert pool.conn.selects[-1] == (1,)  # overlap of 2 below id 3
+    # Already cached rows in the overlap are not duplicated
+    assert [m.text for m in await store.list_messages()] == ["one", "two", "three"]
+
+
+@pytest.mark.asyncio
+async def test_list_recent_messages_window(pool):
+    """Windowed reads return the newest messages in chronological order."""
+    for i in range(10):
+        pool.conn.add_row("s1", "user", f"message {i}")
+    store = PostgreSQLMessageStore("s1", db_url="postgresql://db", pool=pool)
+
+    recent = await store.list_recent_messages(limit=3)
+    assert [m.text for m in recent] == ["message 7", "message 8", "message 9"]
+
+    # Each message is ~2 tokens; a 5 token budget fits two
+    budgeted = await store.list_recent_messages(max_tokens=5)
+    assert [m.text for m in budgeted] == ["message 8", "message 9"]
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_pages(pool):
+    """The async iterator should walk the session in keyset pages."""
+    for i in range(5):
+        pool.conn.add_row("s1", "user", str(i))
+    store = PostgreSQLMessageStore("s1", db_url="postgresql://db", pool=pool)
+
+    texts = [m.text async for m in store.iter_messages(batch_size=2)]
+
+    assert texts == ["0", "1", "2", "3", "4"]
+    assert [args[0] for args in pool.conn.selects] == [0, 2, 4]
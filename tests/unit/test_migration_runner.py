@@ -0,0 +1,118 @@
+"""
+Unit tests for the versioned migration runner.
+"""
+
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from src.persistence import migration_runner
+from src.persistence.migration_runner import (
+    MigrationError,
+    MigrationRunner,
+    discover_migrations,
+    ensure_schema,
+)
+
+
+class FakeConn:
+    """Connection stand-in recording executed SQL against a schema_migrations dict."""
+
+    def __init__(self, applied=None):
+        self.applied = dict(applied or {})
+        self.executed = []
+
+    async def execute(self, sql, *args):
+        self.executed.append(sql)
+        if sql.startswith("INSERT INTO schema_migrations"):
+            self.applied[args[0]] = args[1]
+
+    async def fetch(self, sql, *args):
+        return [{"version": v, "checksum": c} for v, c in self.applied.items()]
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+        self.acquired = 0
+
+    @asynccontextmanager
+    async def acquire(self, db_url=None):
+        self.acquired += 1
+        yield self.conn
+
+
+@pytest.fixture
+def migrations_dir(tmp_path):
+    (tmp_path / "2025_01_01_first.sql").write_text("CREATE TABLE a (id INT);")
+    (tmp_path / "2025_01_02_second.sql").write_text("CREATE TABLE b (id INT);")
+    return tmp_path
+
+
+def test_discover_migrations_sorted(migrations_dir):
+    migrations = discover_migrations(migrations_dir)
+    assert [m.version for m in migrations] == ["2025_01_01_first", "2025_01_02_second"]
+    assert all(len(m.checksum) == 64 for m in migrations)
+
+
+def test_repo_migrations_include_core_tables():
+    versions = [m.version for m in discover_migrations()]
+    assert "2025_11_24_core_tables" in versions
+
+
+@pytest.mark.asyncio
+async def test_applies_pending_and_skips_applied(migrations_dir):
+    first = discover_migrations(migrations_dir)[0]
+    conn = FakeConn(applied={first.version: first.checksum})
+    runner = MigrationRunner("postgresql://db", FakePool(conn), migrations_dir)
+
+    result = await runner.run()
+
+    assert result.applied == ["2025_01_02_second"]
+    assert result.skipped == ["2025_01_01_first"]
+    assert "CREATE TABLE b (id INT);" in conn.executed
+    assert "CREATE TABLE a (id INT);" not in conn.executed
+
+
+@pytest.mark.asyncio
+async def test_modified_migration_detected(migrations_dir):
+    conn = FakeConn(applied={"2025_01_01_first": "0" * 64})
+    runner = MigrationRunner("postgresql://db", FakePool(conn), migrations_dir)
+
+    result = await runner.run()
+    assert result.modified == ["2025_01_01_first"]
+
+    with pytest.raises(MigrationError):
+        await runner.run(strict=True)
+
+
+@pytest.mark.asyncio
+async def test_ensure_schema_runs_once_per_database(migrations_dir, monkeypatch):
+    migration_runner.reset_schema_cache()
+    monkeypatch.setattr(migration_runner, "MIGRATIONS_DIR", migrations_dir)
+    pool = FakePool(FakeConn())
+    run = AsyncMock(return_value=migration_runner.MigrationResult())
+    monkeypatch.setattr(MigrationRunner, "run", run)
+
+    for _ in range(3):
+        await ensure_schema("postgresql://db", pool)
+
+    assert run.await_count == 1
+    migration_runner.reset_schema_cache()
+
+
+@pytest.mark.asyncio
+async def test_ensure_schema_retries_after_failure(monkeypatch):
+    migration_runner.reset_schema_cache()
+    run = AsyncMock(side_effect=[OSError("down"), migration_runner.MigrationResult()])
+    monkeypatch.setattr(MigrationRunner, "run", run)
+
+    with pytest.raises(OSError):
+        await ensure_schema("postgresql://db", FakePool(FakeConn()))
+    await ensure_schema("postgresql://db", FakePool(FakeConn()))
+
+    assert run.await_count == 2
+    migration_runner.reset_schema_cache()
@@ -5,9 +5,10 @@ Tests for Orchestration Level Batcher workflow.
 Validates routing of StrategicPlan tasks to correct Domain Leads.
 """
 
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from agent_framework import AgentThread
+from agent_framework import AgentThread, ChatMessage, ChatMessageStore
 from src.workflows.olb_workflow import OLBWorkflow
 from src.agents.domain_leads import BaseDomainLead
 from src.models.data_contracts import StrategicPlan, TaskDefinition
@@ -110,7 +111,7 @@ class TestOLBWorkflow:
         
     @pytest.mark.asyncio
     async def test_olb_stops_on_failure(self, olb_workflow, mock_dev_dl):
-        """OLB should stop execution if a task fails."""
+        """OLB should skip tasks that depend on a failed task."""
         # Setup Dev DL to fail
         mock_dev_dl.execute_task = AsyncMock(return_value={
             "task_id": "task_fail",
@@ -131,7 +132,8 @@ class TestOLBWorkflow:
                 TaskDefinition(
                     task_id="task_next",
                     domain="QA",
-                    description="Should not run"
+                    description="Should not run",
+                    dependencies=["task_fail"]
                 )
             ]
         )
@@ -141,6 +143,184 @@ class TestOLBWorkflow:
         assert result["status"] == "Failed"
         assert result["completed"] == 0
         assert result["failed"] == 1
+        assert result["skipped"] == 1
+        assert result["skipped_details"][0]["task_id"] == "task_next"
         
         # QA DL should NOT have been called
         olb_workflow.domain_leads["QA"].execute_task.assert_not_called()
+
+
+def _sleeping_dl(name: str, delay: float, status: str = "Completed", calls: list = None):
+    """Create a mock DL whose execute_task takes ``delay`` seconds."""
+    dl = MagicMock(spec=BaseDomainLead)
+    dl.name = name
+    
+    async def execute_task(task, thread):
+        if calls is not None:
+            calls.append(("start", task.task_id))
+        await asyncio.sleep(delay)
+        if calls is not None:
+            calls.append(("end", task.task_id))
+        return {"task_id": task.task_id, "status": status}
+    
+    dl.execute_task = AsyncMock(side_effect=execute_task)
+    return dl
+
+
+class TestOLBScheduling:
+    """Tests for dependency-aware DAG scheduling."""
+    
+    @pytest.mark.asyncio
+    async def test_independent_tasks_run_concurrently(self):
+        """Independent Dev and Docs tasks should finish in max() time."""
+        olb = OLBWorkflow(domain_leads={
+            "Development": _sleeping_dl("DevDomainLead", 0.2),
+            "Docs": _sleeping_dl("DocsDomainLead", 0.2)
+        })
+        plan = StrategicPlan(
+            plan_id="plan_par",
+            target_domains=["Development", "Docs"],
+            tasks=[
+                TaskDefinition(task_id="dev", domain="Development", description="Build"),
+                TaskDefinition(task_id="docs", domain="Docs", description="Document")
+            ]
+        )
+        
+        result = await olb.execute_plan(plan, AgentThread())
+        
+        assert result["status"] == "Completed"
+        assert result["execution_time_ms"] < 350
+        assert len(result["critical_path"]) == 1
+        
+    @pytest.mark.asyncio
+    async def test_dependencies_respected(self):
+        """A task should only start after its dependencies complete."""
+        calls = []
+        olb = OLBWorkflow(domain_leads={
+            "Development": _sleeping_dl("DevDomainLead", 0.05, calls=calls),
+            "QA": _sleeping_dl("QADomainLead", 0.01, calls=calls)
+        })
+        plan = StrategicPlan(
+            plan_id="plan_dep",
+            target_domains=["Development", "QA"],
+            tasks=[
+                TaskDefinition(task_id="qa", domain="QA", description="Test", dependencies=["dev"]),
+                TaskDefinition(task_id="dev", domain="Development", description="Build")
+            ]
+        )
+        
+        result = await olb.execute_plan(plan, AgentThread())
+        
+        assert result["status"] == "Completed"
+        assert calls.index(("end", "dev")) < calls.index(("start", "qa"))
+        assert result["critical_path"] == ["dev", "qa"]
+        assert result["critical_path_ms"] >= 60
+        
+    @pytest.mark.asyncio
+    async def test_failure_only_cancels_downstream(self):
+        """Siblings of a failed task should still run."""
+        olb = OLBWorkflow(domain_leads={
+            "Development": _sleeping_dl("DevDomainLead", 0.01, status="Failed"),
+            "QA": _sleeping_dl("QADomainLead", 0.01),
+            "Docs": _sleeping_dl("DocsDomainLead", 0.01)
+        })
+        plan = StrategicPlan(
+            plan_id="plan_fail",
+            target_domains=["Development", "QA", "Docs"],
+            tasks=[
+                TaskDefinition(task_id="dev", domain="Development", description="Build"),
+                TaskDefinition(task_id="qa", domain="QA", description="Test", dependencies=["dev"]),
+                TaskDefinition(task_id="docs", domain="Docs", description="Document")
+            ]
+        )
+        
+        result = await olb.execute_plan(plan, AgentThread())
+        
+        assert result["status"] == "Failed"
+        assert result["completed"] == 1
+        assert result["failed"] == 1
+        assert [s["task_id"] for s in result["skipped_details"]] == ["qa"]
+        olb.domain_leads["QA"].execute_task.assert_not_called()
+        olb.domain_leads["Docs"].execute_task.assert_called_once()
+        
+    @pytest.mark.asyncio
+    async def test_cycle_detected(self):
+        """Tasks in a dependency cycle should fail without being executed."""
+        dev = _sleeping_dl("DevDomainLead", 0.01)
+        olb = OLBWorkflow(domain_leads={"Development": dev})
+        plan = StrategicPlan(
+            plan_id="plan_cycle",
+            target_domains=["Development"],
+            tasks=[
+                TaskDefinition(task_id="a", domain="Development", description="A", dependencies=["b"]),
+                TaskDefinition(task_id="b", domain="Development", description="B", dependencies=["a"]),
+                TaskDefinition(task_id="c", domain="Development", description="C")
+            ]
+        )
+        
+        result = await olb.execute_plan(plan, AgentThread())
+        
+        assert result["status"] == "Failed"
+        assert result["completed"] == 1
+        assert {f["task_id"] for f in result["failed_details"]} == {"a", "b"}
+        assert all("cycle" in f["error"] for f in result["failed_details"])
+        dev.execute_task.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_result_without_status_fails_task(self):
+        """A malformed Domain Lead result should fail its task, not the plan."""
+        dev = MagicMock(spec=BaseDomainLead)
+        dev.name = "DevDomainLead"
+        dev.execute_task = AsyncMock(return_value={"task_id": "dev"})
+        olb = OLBWorkflow(domain_leads={
+            "Development": dev,
+            "Docs": _sleeping_dl("DocsDomainLead", 0.01)
+        })
+        plan = StrategicPlan(
+            plan_id="plan_malformed",
+            target_domains=["Development", "Docs"],
+            tasks=[
+                TaskDefinition(task_id="dev", domain="Development", description="Build"),
+                TaskDefinition(task_id="docs", domain="Docs", description="Document"),
+                TaskDefinition(task_id="qa", domain="Docs", description="Review", dependencies=["dev"])
+            ]
+        )
+        
+        result = await olb.execute_plan(plan, AgentThread())
+        
+        assert result["status"] == "Failed"
+        assert (result["completed"], result["failed"], result["skipped"], result["pending"]) == (1, 1, 1, 0)
+        assert "without a status" in result["failed_details"][0]["error"]
+        
+    @pytest.mark.asyncio
+    async def test_dependents_see_plan_and_upstream_history(self):
+        """Each task thread starts from the plan thread plus its upstream tasks' messages."""
+        seen = {}
+        
+        async def execute_task(task, thread):
+            history = await thread.message_store.list_messages()
+            seen[task.task_id] = [m.text for m in history]
+            await thread.message_store.add_messages([ChatMessage(role="assistant", text=f"{task.task_id} done")])
+            return {"task_id": task.task_id, "status": "Completed"}
+        
+        dev = MagicMock(spec=BaseDomainLead)
+        dev.name = "DevDomainLead"
+        dev.execute_task = AsyncMock(side_effect=execute_task)
+        olb = OLBWorkflow(domain_leads={"Development": dev})
+        plan = StrategicPlan(
+            plan_id="plan_history",
+            target_domains=["Development"],
+            tasks=[
+                TaskDefinition(task_id="a", domain="Development", description="A"),
+                TaskDefinition(task_id="b", domain="Development", description="B"),
+                TaskDefinition(task_id="c", domain="Development", description="C", dependencies=["a", "b"])
+            ]
+        )
+        thread = AgentThread(message_store=ChatMessageStore([ChatMessage(role="user", text="goal")]))
+        
+        result = await olb.execute_plan(plan, thread)
+        
+        assert result["status"] == "Completed"
+        assert seen["a"] == seen["b"] == ["goal"]
+        assert seen["c"] == ["goal", "a done", "b done"]
+        assert [m.text for m in await thread.message_store.list_messages()] == ["goal"]
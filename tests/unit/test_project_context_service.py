@@ -0,0 +1,129 @@
+import asyncio
+import os
+
+import pytest
+
+from src.persistence.project_context import project_context
+from src.services.project_context_service import ProjectContextProvider, ProjectContextService
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def project(tmp_path):
+    _write(str(tmp_path / "README.md"), "# Demo\nA demo project.")
+    _write(str(tmp_path / ".meta" / "project_brief.md"), "Brief text")
+    _write(str(tmp_path / "src" / "app.py"), "print('hi')")
+    _write(str(tmp_path / "src" / "__pycache__" / "app.pyc"), "")
+    _write(str(tmp_path / ".git" / "HEAD"), "ref")
+    _write(str(tmp_path / "a" / "b" / "c" / "deep.txt"), "")
+    return tmp_path
+
+
+def _service(root, **kwargs):
+    kwargs.setdefault("refresh_interval", 3600)
+    return ProjectContextService(default_root=str(root), watch=False, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_tree_and_documents(project):
+    service = _service(project)
+    text = await service.render()
+
+    assert "Project Structure:" in text
+    assert "    src/\n        app.py" in text
+    assert "__pycache__" not in text and ".git" not in text
+    assert "deep.txt" not in text  # deeper than max_depth
+    assert "# README.md\n# Demo" in text
+    assert "# project_brief.md\nBrief text" in text
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_cached_until_refresh(project):
+    service = _service(project)
+    first = await service.get_snapshot()
+    _write(str(project / "src" / "new.py"), "")
+    _bump_mtime(str(project / "src"))
+
+    assert await service.get_snapshot() is first
+    assert "new.py" not in await service.render()
+
+    service.invalidate()
+    assert "new.py" in await service.render()
+
+
+@pytest.mark.asyncio
+async def test_refresh_is_incremental(project, monkeypatch):
+    service = _service(project, refresh_interval=0)
+    snapshot = await service.get_snapshot()
+    version = snapshot.version
+
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: listed.append(path) or real_scandir(path))
+
+    await service.get_snapshot()
+    assert listed == [] and snapshot.version == version
+
+    _write(str(project / "README.md"), "# Demo\nUpdated readme.")
+    _bump_mtime(str(project / "README.md"))
+    _write(str(project / "src" / "extra.py"), "")
+    _bump_mtime(str(project / "src"))
+    await service.get_snapshot()
+
+    assert listed == [os.path.join(str(project), "src")]
+    assert snapshot.version == version + 1
+    assert "Updated readme." in snapshot.documents["README.md"][1]
+    assert "extra.py" in snapshot.directories["src"].files
+
+
+@pytest.mark.asyncio
+async def test_render_is_size_bounded(project):
+    _write(str(project / "README.md"), "x" * 10000)
+    service = _service(project)
+
+    text = await service.render(max_chars=1000)
+
+    assert len(text) <= 1000
+    assert "Project Structure:" in text
+    assert "[... truncated]" in text
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_access_builds_once(project, monkeypatch):
+    service = _service(project)
+    builds = []
+    real_build = service._build
+    monkeypatch.setattr(service, "_build", lambda root: builds.append(root) or real_build(root))
+
+    snapshots = await asyncio.gather(*(service.get_snapshot() for _ in range(5)))
+
+    assert len(builds) == 1
+    assert all(s is snapshots[0] for s in snapshots)
+
+
+@pytest.mark.asyncio
+async def test_provider_uses_active_project(project, tmp_path_factory):
+    other = tmp_path_factory.mktemp("other")
+    _write(str(other / "README.md"), "Other project")
+    service = _service(project)
+    service.register(7, str(other))
+    provider = ProjectContextProvider(service=service, include_tree=False)
+
+    default_context = await provider.invoking([])
+    async with project_context.project_scope(7):
+        other_context = await provider.invoking([])
+
+    assert default_context.instructions.startswith("Current Project Context:")
+    assert "A demo project." in default_context.instructions
+    assert "Other project" in other_context.instructions
+    assert "Project Structure:" not in other_context.instructions
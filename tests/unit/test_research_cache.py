@@ -0,0 +1,97 @@
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.research_cache import ResearchCache, SQLiteResearchStore
+
+
+def test_mapping_interface_normalizes_descriptions():
+    cache = ResearchCache(backend="memory")
+    cache["Research  Python caching"] = "result"
+
+    assert "research python caching" in cache
+    assert cache["RESEARCH python caching "] == "result"
+    assert len(cache) == 1
+
+    del cache["research python caching"]
+    assert "research python caching" not in cache
+    with pytest.raises(KeyError):
+        cache["research python caching"]
+
+
+def test_lru_respects_entry_and_byte_limits():
+    cache = ResearchCache(backend="memory", max_entries=3, max_bytes=100)
+    for name in ("a", "b", "c"):
+        cache[name] = "x" * 10
+    cache["a"]  # Refresh "a"
+    cache["d"] = "x" * 10
+
+    assert list(cache) == ["c", "a", "d"]
+
+    cache["big"] = "y" * 90  # Evicts older entries to stay under max_bytes
+    assert "big" in cache and cache.size_bytes <= 100
+
+    cache["huge"] = "z" * 200  # Larger than the whole budget: not kept in memory
+    assert "huge" not in cache
+
+
+def test_ttl_expires_entries(monkeypatch):
+    cache = ResearchCache(backend="memory", ttl_seconds=10)
+    cache["topic"] = "result"
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+
+    assert "topic" not in cache
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_is_shared_and_persistent(tmp_path):
+    path = str(tmp_path / "research.sqlite")
+    writer = ResearchCache(backend="sqlite", path=path)
+    await writer.aset("Research caching", "persisted result")
+
+    # A second cache (another executor process) sees the result
+    reader = ResearchCache(backend="sqlite", path=path)
+    assert await reader.aget("research caching") == "persisted result"
+    assert "research caching" in reader._entries  # Promoted into memory
+
+    reader.clear()
+    assert await ResearchCache(backend="sqlite", path=path).aget("research caching") is None
+
+
+@pytest.mark.asyncio
+async def test_semantic_tier_matches_paraphrases():
+    semantic = MagicMock()
+    semantic.get = AsyncMock(return_value={"artifact": "semantic result"})
+    semantic.set = AsyncMock()
+    cache = ResearchCache(backend="memory", semantic_tier=semantic)
+
+    assert await cache.aget("How do Python caches work?") == "semantic result"
+    semantic.get.assert_awaited_once_with("how do python caches work?", "research")
+
+    await cache.aset("Python caching", "result")
+    assert semantic.set.await_args.args[2:] == ("research", {"artifact": "result"})
+
+
+@pytest.mark.asyncio
+async def test_failing_store_is_a_miss():
+    store = MagicMock()
+    store.name = "postgres"
+    store.get = AsyncMock(side_effect=ConnectionError("db down"))
+    store.set = AsyncMock(side_effect=ConnectionError("db down"))
+    cache = ResearchCache(store=store)
+
+    assert await cache.aget("topic") is None
+    await cache.aset("topic", "result")
+    assert await cache.aget("topic") == "result"
+
+
+def test_executors_share_the_process_cache():
+    from src.agents.executors.research_executor import ResearchExecutor
+
+    first = ResearchExecutor(chat_client=MagicMock())
+    second = ResearchExecutor(chat_client=MagicMock())
+    assert first._cache is second._cache
+    assert isinstance(first._cache, ResearchCache)
+    assert not isinstance(first._cache.store, SQLiteResearchStore)
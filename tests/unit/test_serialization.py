@@ -0,0 +1,98 @@
+"""
+Unit tests for the pluggable JSON serialization backends.
+"""
+
+import json
+import uuid
+import pytest
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from enum import Enum
+from src.utils import serialization
+
+INSTALLED = [name for name in ("json", "orjson", "msgspec") if serialization.set_backend(name) == name]
+serialization.set_backend("auto")
+
+
+class Opaque:
+    def __str__(self):
+        return "opaque"
+
+
+class Color(Enum):
+    RED = "red"
+
+
+@dataclass
+class Point:
+    x: float
+    when: date
+
+
+@pytest.fixture(params=INSTALLED)
+def backend(request):
+    serialization.set_backend(request.param)
+    yield request.param
+    serialization.set_backend("auto")
+
+
+def test_round_trip(backend):
+    payload = {"model": "m", "messages": [{"role": "user", "content": "héllo ✓"}], "n": 3, "x": None}
+    encoded = serialization.dumps(payload)
+    assert isinstance(encoded, bytes)
+    assert serialization.loads(encoded) == payload
+    assert serialization.loads(encoded.decode("utf-8")) == payload
+    assert serialization.loads(memoryview(encoded)) == payload
+
+
+def test_sorted_output_is_identical_across_backends(backend):
+    payload = {"b": [1, 2, {"z": True, "a": "ü"}], "a": 1.5}
+    expected = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    assert serialization.dumps(payload, sort_keys=True) == expected
+
+
+def test_unsupported_values_use_default(backend):
+    assert serialization.loads(serialization.dumps({"v": Opaque()})) == {"v": "opaque"}
+
+
+def test_native_types_match_across_backends():
+    payload = {
+        "naive": datetime(2025, 1, 2, 3, 4, 5),
+        "aware": datetime(2025, 1, 2, 3, 4, 5, 123, tzinfo=timezone(timedelta(hours=2))),
+        "day": date(2025, 1, 2),
+        "clock": time(3, 4, 5),
+        "color": Color.RED,
+        "id": uuid.UUID(int=5),
+        "point": Point(float("nan"), date(2025, 1, 1)),
+        "floats": [float("nan"), float("inf"), -float("inf"), 1.5],
+        "opaque": Opaque()
+    }
+    outputs = {}
+    for name in INSTALLED:
+        serialization.set_backend(name)
+        outputs[name] = serialization.dumps(payload)
+    serialization.set_backend("auto")
+
+    expected = serialization.loads(outputs["json"])
+    assert expected["naive"] == "2025-01-02T03:04:05"
+    assert expected["point"] == {"x": None, "when": "2025-01-01"}
+    assert expected["floats"] == [None, None, None, 1.5]
+    for name, output in outputs.items():
+        assert serialization.loads(output) == expected, name
+
+
+def test_indent_and_str_output(backend):
+    text = serialization.dumps_str([{"a": 1}], indent=True)
+    assert isinstance(text, str)
+    assert "\n  " in text
+    assert json.loads(text) == [{"a": 1}]
+
+
+def test_invalid_input_raises_json_decode_error(backend):
+    with pytest.raises(json.JSONDecodeError):
+        serialization.loads(b"{not json")
+
+
+def test_unknown_backend_falls_back_to_stdlib():
+    assert serialization.set_backend("simdjson") == "json"
+    serialization.set_backend("auto")
@@ -0,0 +1,116 @@
+"""
+Unit tests for single-flight coalescing of identical LLM calls.
+"""
+
+import asyncio
+import pytest
+import httpx
+from agent_framework import ChatMessage, Role
+from src.clients.litellm_client import LiteLLMChatClient
+from src.clients.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"value": 42}
+
+    waiters = [asyncio.create_task(flight.do("k", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert flight.in_flight == 1
+    release.set()
+
+    results = await asyncio.gather(*waiters)
+    assert calls == 1
+    assert all(r == {"value": 42} for r in results)
+    assert flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_fan_out_to_all_waiters():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    results = await asyncio.gather(
+        flight.do("k", boom), flight.do("k", boom), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    leaving = asyncio.create_task(flight.do("k", work))
+    staying = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+
+    leaving.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await staying == "done"
+    assert leaving.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_last_waiter_leaving_cancels_shared_call():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def work():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(flight.do("k", work))
+    await started.wait()
+    waiter.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_client_coalesces_identical_completions():
+    hits = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal hits
+        hits += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={
+            "id": "resp_1",
+            "choices": [{"message": {"role": "assistant", "content": "shared"}}]
+        })
+
+    http = httpx.AsyncClient(base_url="http://litellm", transport=httpx.MockTransport(handler))
+    client = LiteLLMChatClient(http_client=http)
+    client.response_cache = None  # exercise coalescing, not caching
+    messages = [ChatMessage(role=Role.USER, text="what is the project status?")]
+
+    responses = await asyncio.gather(*(client.get_response(messages) for _ in range(4)))
+    assert hits == 1
+    assert all(r.text == "shared" for r in responses)
+
+    await client.get_response(messages, additional_properties={"coalesce": False})
+    assert hits == 2
@@ -5,6 +5,7 @@ Tests for Tactical Level Batcher workflow orchestration.
 Validates parallel execution, report aggregation, and error handling.
 """
 
+import asyncio
 import pytest
 from agent_framework import AgentThread
 from src.workflows.tlb_workflow import TLBWorkflow
@@ -195,3 +196,126 @@ class TestTLBReportAggregation:
         
         assert "success_rate" in result
         assert 0.0 <= result["success_rate"] <= 1.0
+
+
+class SleepyExecutor:
+    """Executor stand-in that sleeps and tracks how many runs overlap."""
+    
+    def __init__(self, name: str, delay: float):
+        self.name = name
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        
+    async def execute_task(self, task, thread):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return ExecutorReport(
+            executor_task_id=task["task_id"],
+            executor_name=self.name,
+            status="Completed",
+            outputs={"artifact": task["description"]}
+        )
+
+
+class TestTLBConcurrency:
+    """Tests for concurrent fan-out with bounded concurrency."""
+    
+    @pytest.mark.asyncio
+    async def test_tasks_run_concurrently_and_keep_order(self):
+        """Independent subtasks should overlap and reports keep task order."""
+        executors = {
+            "coder": SleepyExecutor("CoderExecutor", 0.2),
+            "writer": SleepyExecutor("WriterExecutor", 0.05)
+        }
+        tlb = TLBWorkflow(executors=executors, concurrent=True, max_concurrency=4)
+        tasks = [
+            {"task_id": "t1", "description": "slow", "executor_type": "coder"},
+            {"task_id": "t2", "description": "fast", "executor_type": "writer"},
+            {"task_id": "t3", "description": "slow", "executor_type": "coder"}
+        ]
+        
+        result = await tlb.execute_tasks(tasks, AgentThread())
+        
+        assert [r.executor_task_id for r in result["reports"]] == ["t1", "t2", "t3"]
+        assert result["completed"] == 3
+        assert result["execution_time_ms"] < 350
+        assert all(r.execution_time_ms is not None for r in result["reports"])
+        
+    @pytest.mark.asyncio
+    async def test_per_executor_limit(self):
+        """Per-executor-type limits should cap overlapping runs."""
+        coder = SleepyExecutor("CoderExecutor", 0.05)
+        tlb = TLBWorkflow(
+            executors={"coder": coder},
+            concurrent=True,
+            max_concurrency=4,
+            executor_concurrency={"coder": 1}
+        )
+        tasks = [{"task_id": f"t{i}", "description": "x", "executor_type": "coder"} for i in range(3)]
+        
+        await tlb.execute_tasks(tasks, AgentThread())
+        
+        assert coder.max_in_flight == 1
+        
+    @pytest.mark.asyncio
+    async def test_global_limit(self):
+        """The global limit should cap in-flight subtasks across executors."""
+        coder = SleepyExecutor("CoderExecutor", 0.05)
+        tlb = TLBWorkflow(
+            executors={"coder": coder},
+            concurrent=True,
+            max_concurrency=2,
+            executor_concurrency={}
+        )
+        tasks = [{"task_id": f"t{i}", "description": "x", "executor_type": "coder"} for i in range(5)]
+        
+        await tlb.execute_tasks(tasks, AgentThread())
+        
+        assert coder.max_in_flight == 2
+        
+    @pytest.mark.asyncio
+    async def test_queued_type_does_not_block_other_types(self):
+        """Subtasks waiting on their per-type limit must not hold global slots."""
+        coder = SleepyExecutor("CoderExecutor", 0.2)
+        writer = SleepyExecutor("WriterExecutor", 0.01)
+        tlb = TLBWorkflow(
+            executors={"coder": coder, "writer": writer},
+            concurrent=True,
+            max_concurrency=4,
+            executor_concurrency={"coder": 2}
+        )
+        tasks = [{"task_id": f"c{i}", "description": "x", "executor_type": "coder"} for i in range(5)]
+        tasks += [{"task_id": f"w{i}", "description": "y", "executor_type": "writer"} for i in range(2)]
+        
+        result = await tlb.execute_tasks(tasks, AgentThread())
+        
+        assert coder.max_in_flight == 2
+        assert writer.max_in_flight == 2  # Both writers ran alongside the two coders
+        writer_reports = [r for r in result["reports"] if r.executor_task_id.startswith("w")]
+        assert all(r.execution_time_ms < 100 for r in writer_reports)
+        assert result["completed"] == 7
+        
+    @pytest.mark.asyncio
+    async def test_task_timeout(self):
+        """Subtasks exceeding the timeout should fail without blocking others."""
+        executors = {
+            "coder": SleepyExecutor("CoderExecutor", 1.0),
+            "writer": SleepyExecutor("WriterExecutor", 0.01)
+        }
+        tlb = TLBWorkflow(executors=executors, concurrent=True, task_timeout=0.1)
+        tasks = [
+            {"task_id": "slow", "description": "x", "executor_type": "coder"},
+            {"task_id": "fast", "description": "y", "executor_type": "writer"}
+        ]
+        
+        result = await tlb.execute_tasks(tasks, AgentThread())
+        
+        slow, fast = result["reports"]
+        assert slow.status == "Failed"
+        assert "Timed out" in slow.error_message
+        assert fast.status == "Completed"
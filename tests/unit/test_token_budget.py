@@ -0,0 +1,117 @@
+"""
+Unit tests for the context-window budget manager.
+"""
+
+import pytest
+from src.clients.token_budget import DUPLICATE_MARKER, ContextBudget, TokenCounter
+from src.config.settings import settings
+
+PROJECT_CONTEXT = "Project README:\n" + "This project builds a multi-agent framework. " * 10
+
+
+@pytest.fixture
+def small_window(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CONTEXT_WINDOW", 600)
+    monkeypatch.setattr(settings, "LLM_RESPONSE_TOKEN_RESERVE", 100)
+    monkeypatch.setattr(settings, "LLM_CONTEXT_SUMMARY_TOKENS", 120)
+
+
+def _tokens(budget, payload):
+    return budget.counter.count_messages(payload["messages"])
+
+
+def test_counter_caches_per_message():
+    counter = TokenCounter()
+    message = {"role": "user", "content": "hello world " * 50}
+    first = counter.count_message(message)
+    assert first > 4
+    assert counter.count_message(dict(message)) == first
+    assert len(counter._cache) == 1
+
+
+def test_payload_within_budget_is_unchanged():
+    payload = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    assert ContextBudget().fit(payload) is payload
+
+
+def test_repeated_context_blocks_are_deduplicated():
+    payload = {"model": "m", "messages": [
+        {"role": "system", "content": f"Capture user intent.\n\nCurrent Project Context:\n\n{PROJECT_CONTEXT}"},
+        {"role": "user", "content": f"Using the context below answer.\n\n{PROJECT_CONTEXT}\n\nUser Question: what is it?"},
+    ]}
+    fitted = ContextBudget().fit(payload)
+
+    user = fitted["messages"][1]["content"]
+    assert DUPLICATE_MARKER in user
+    assert "User Question: what is it?" in user
+    assert PROJECT_CONTEXT in fitted["messages"][0]["content"]
+    assert PROJECT_CONTEXT in payload["messages"][1]["content"]  # input untouched
+
+
+def test_old_turns_are_compacted_keeping_tool_pairs(small_window):
+    messages = [{"role": "system", "content": "You are helpful."}]
+    for i in range(20):
+        messages.append({"role": "user", "content": f"Question {i}: " + "details " * 30})
+        messages.append({"role": "assistant", "content": None, "tool_calls": [
+            {"id": f"c{i}", "type": "function", "function": {"name": "lookup", "arguments": "{}"}}
+        ]})
+        messages.append({"role": "tool", "tool_call_id": f"c{i}", "content": "result " * 20})
+    messages.append({"role": "user", "content": "Final question?"})
+    budget = ContextBudget()
+
+    fitted = budget.fit({"model": "m", "messages": messages})
+    out = fitted["messages"]
+
+    assert _tokens(budget, fitted) <= budget.budget_for(fitted)
+    assert out[0]["content"] == "You are helpful."
+    assert "compacted" in out[1]["content"] and "Question 0" in out[1]["content"]
+    assert out[-1]["content"] == "Final question?"
+    # Every tool result still follows its assistant tool call
+    for index, message in enumerate(out):
+        if message["role"] == "tool":
+            assert out[index - 1]["role"] in ("assistant", "tool")
+    assert out[2]["role"] != "tool"
+
+
+def test_mid_conversation_system_notes_keep_their_place(small_window):
+    messages = [{"role": "system", "content": "You are helpful."}]
+    for i in range(12):
+        if i in (2, 10):
+            messages.append({"role": "system", "content": f"Note before question {i}"})
+        messages.append({"role": "user", "content": f"Question {i}: " + "details " * 30})
+        messages.append({"role": "assistant", "content": f"Answer {i}"})
+    messages.append({"role": "user", "content": "Final question?"})
+    budget = ContextBudget()
+
+    out = budget.fit({"model": "m", "messages": messages})["messages"]
+    contents = [m["content"] for m in out]
+
+    assert contents[0] == "You are helpful."
+    assert "compacted" in contents[1]
+    assert not any(c.startswith("Note before question 2") for c in contents)  # Dropped with its turn
+    note = contents.index("Note before question 10")
+    assert contents[note + 1].startswith("Question 10:")
+
+
+def test_oversized_latest_message_is_truncated(small_window):
+    payload = {"model": "m", "messages": [
+        {"role": "system", "content": "You are helpful."},
+        {"role": "user", "content": "start " + "x" * 10000 + " end"},
+    ]}
+    budget = ContextBudget()
+    fitted = budget.fit(payload)
+
+    content = fitted["messages"][-1]["content"]
+    assert "characters truncated" in content
+    assert content.startswith("start") and content.endswith("end")
+    assert _tokens(budget, fitted) <= budget.budget_for(fitted)
+
+
+def test_budget_accounts_for_tools_and_max_tokens(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CONTEXT_WINDOW", 1000)
+    budget = ContextBudget()
+    base = {"model": "m", "messages": []}
+    tools = [{"type": "function", "function": {"name": "t", "parameters": {"description": "d" * 350}}}]
+
+    assert budget.budget_for({**base, "max_tokens": 200}) == 800
+    assert budget.budget_for({**base, "max_tokens": 200, "tools": tools}) < 700
@@ -0,0 +1,121 @@
+"""
+Unit tests for the compiled tool schema cache.
+"""
+
+import json
+import pytest
+import httpx
+from unittest.mock import patch
+from agent_framework import AIFunction, ChatMessage, Role, ai_function
+from src.clients.litellm_client import LiteLLMChatClient
+from src.clients.tool_schemas import ToolSchemaCache
+
+
+@ai_function
+def lookup(key: str) -> str:
+    """Look up a key."""
+    return key
+
+
+def plain_tool(count: int) -> int:
+    """A plain callable."""
+    return count
+
+
+def test_compile_reuses_specs_for_same_tools():
+    cache = ToolSchemaCache()
+    with patch.object(AIFunction, "to_json_schema_spec", autospec=True,
+                      side_effect=lambda self: {"type": "function", "function": {"name": self.name}}) as spec:
+        first = cache.compile([lookup, plain_tool])
+        second = cache.compile([lookup, plain_tool])
+
+    assert first is second
+    assert spec.call_count == 2
+    assert [s["function"]["name"] for s in first] == ["lookup", "plain_tool"]
+    assert json.loads(first.json_bytes) == list(first)
+
+
+def test_compile_includes_parameter_schema():
+    compiled = ToolSchemaCache().compile([lookup])
+    params = compiled[0]["function"]["parameters"]
+    assert params["properties"]["key"]["type"] == "string"
+    assert compiled[0]["function"]["description"] == "Look up a key."
+
+
+def test_changed_tool_is_recompiled():
+    cache = ToolSchemaCache()
+    first = cache.compile([lookup])
+    original = lookup.description
+    try:
+        lookup.description = "Changed."
+        second = cache.compile([lookup])
+    finally:
+        lookup.description = original
+
+    assert second is not first
+    assert second[0]["function"]["description"] == "Changed."
+    assert cache.compile(None) is None
+
+
+@pytest.mark.asyncio
+async def test_client_sends_precompiled_tools():
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "id": "resp_1",
+            "choices": [{"message": {"role": "assistant", "content": "ok"}}]
+        })
+
+    http = httpx.AsyncClient(base_url="http://litellm", transport=httpx.MockTransport(handler))
+    client = LiteLLMChatClient(http_client=http)
+    await client.get_response(
+        [ChatMessage(role=Role.USER, text="find it")],
+        tools=[lookup],
+        tool_choice="auto",
+        additional_properties={"cache": False}
+    )
+
+    tools = bodies[0]["tools"]
+    assert tools[0]["function"]["name"] == "lookup"
+    assert "key" in tools[0]["function"]["parameters"]["properties"]
+    assert bodies[0]["messages"][0]["content"] == "find it"
+
+
+def test_spec_cache_does_not_keep_dynamic_tools_alive():
+    import gc
+
+    cache = ToolSchemaCache()
+    for i in range(20):
+        def dynamic(value: int) -> int:
+            """Created per call."""
+            return value
+        cache.compile([dynamic])
+    cache._lists.clear()
+    del dynamic
+    gc.collect()
+
+    assert cache._specs == {}
+
+
+def test_registry_changes_invalidate_compiled_schemas():
+    from src import tools
+    from src.clients.tool_schemas import tool_schema_cache
+
+    @ai_function
+    def registered_tool(key: str) -> str:
+        """Temporary tool."""
+        return key
+
+    before = tool_schema_cache.compile(tools.ALL_TOOLS)
+    tools.register_tool(registered_tool)
+    try:
+        assert tool_schema_cache._lists == {}
+        after = tool_schema_cache.compile(tools.ALL_TOOLS)
+        assert after is not before
+        assert after[-1]["function"]["name"] == "registered_tool"
+    finally:
+        assert tools.unregister_tool("registered_tool")
+    assert tool_schema_cache._lists == {}
+    assert not tools.unregister_tool("registered_tool")